@@ -1,7 +1,8 @@
 from __future__ import annotations
-import os, json, sys, subprocess
+import os, json
 from typing import Optional
 from math import ceil
+from time import perf_counter
 from datetime import datetime, timezone
 from flask import Flask, render_template, request, redirect, url_for, flash, abort, session, jsonify
 from flask_login import (
@@ -9,15 +10,10 @@ from flask_login import (
 )
 from werkzeug.security import generate_password_hash, check_password_hash
 
-from core.paths import REPO
 from core.db import get_conn, ensure_app_schema
-from core import pos
+from core import backup, morph, paradigms, pos, pos_registry, retrain_queue
 from core.practice import pick_practice_batch, upsert_progress
-
-# -------------------------------
-# Basic constants (UI helpers)
-# -------------------------------
-CASES = ["NOM", "GEN", "DAT", "ACC", "INST", "LOC"]
+from core.grammar import CASES
 
 # -------------------------------
 # App bootstrap (web-only)
@@ -28,6 +24,12 @@ app.secret_key = os.environ.get("FLASK_SECRET_KEY", "dev-secret-change-me")
 # Ensure DB schema once (idempotent)
 ensure_app_schema()
 
+# Background retrain worker (one training at a time across workers via flock)
+retrain_queue.start_worker()
+
+# Scheduled online backups (only if PLT_BACKUP_INTERVAL_H > 0; one at a time across workers via flock)
+backup.start_scheduler()
+
 login_manager = LoginManager(app)
 login_manager.login_view = "login"
 
@@ -163,21 +165,32 @@ def words():
 
     where = ""
     params = []
-    if q:
-        where = "WHERE voc LIKE ? OR meaning LIKE ?"
-        params = [f"%{q}%", f"%{q}%"]
-
+    order = "voc"
+    order_params = []
+    lemmas = []
     with get_conn() as c:
+        if q:
+            where = "WHERE voc LIKE ? OR meaning LIKE ?"
+            params = [f"%{q}%", f"%{q}%"]
+            # An inflected form ("kobiety") also finds its lemma ("kobieta"), listed first
+            lemmas = [l for l in morph.lemmatize(c, q) if l != q.lower()]
+            if lemmas:
+                marks = ",".join("?" * len(lemmas))
+                where += f" OR voc IN ({marks})"
+                params += lemmas
+                order = f"(voc IN ({marks})) DESC, voc"
+                order_params = lemmas
+
         total = c.execute(f"SELECT COUNT(*) FROM words {where}", params).fetchone()[0]
         rows = c.execute(
             f"""
             SELECT id, voc, meaning, class
             FROM words
             {where}
-            ORDER BY voc
+            ORDER BY {order}
             LIMIT ? OFFSET ?
             """,
-            (*params, per_page, offset),
+            (*params, *order_params, per_page, offset),
         ).fetchall()
 
     total_pages = max(1, ceil(total / per_page)) if total else 1
@@ -185,6 +198,7 @@ def words():
         "words.html",
         words=rows,
         search_query=q,
+        lemmas=lemmas,
         page=page,
         total_pages=total_pages,
         has_prev=(page > 1),
@@ -204,29 +218,66 @@ def word_detail(voc: str):
         flash("Word not found.")
         return redirect(url_for("words", search=back_search, page=back_page))
 
-    forms_json = json.loads(row["forms"]) if row["forms"] else None
-    if isinstance(forms_json, str):
-        try:
-            forms_json = json.loads(forms_json)
-        except Exception:
-            pass
-
-    adj_forms_json = json.loads(row["adj_forms"]) if row["adj_forms"] else None
-    if isinstance(adj_forms_json, str):
-        try:
-            adj_forms_json = json.loads(adj_forms_json)
-        except Exception:
-            pass
+    # Rows imported without tables get rule-generated ones (memoized in core.paradigms)
+    forms_json, adj_forms_json, generated = paradigms.word_forms(row)
 
     return render_template(
         "word_detail.html",
         word=row,
         forms_json=forms_json,
         adj_forms_json=adj_forms_json,
+        generated=generated,
         back_page=back_page,
         back_search=back_search,
     )
 
+@app.get("/api/word/<voc>")
+def api_word(voc: str):
+    """
+    Word + declension tables as JSON. ?gender=m|f|n and ?animate=0|1 override
+    the guesses used when a table has to be generated.
+    """
+    gender = (request.args.get("gender") or "").strip().lower() or None
+    if gender not in (None, "m", "f", "n"):
+        return jsonify({"error": "gender must be m, f or n"}), 400
+    animate = request.args.get("animate")
+    animate = None if animate in (None, "") else animate.lower() in ("1", "true", "yes")
+
+    with get_conn() as c:
+        row = c.execute(
+            "SELECT id, voc, meaning, class, forms, adj_forms FROM words WHERE voc=?",
+            (voc,),
+        ).fetchone()
+    if not row:
+        return jsonify({"error": "word not found"}), 404
+    if gender is not None or animate is not None:
+        # Explicit overrides always describe a generated table, whatever is stored
+        row = {**dict(row), "forms": None, "adj_forms": None}
+    forms, adj_forms, generated = paradigms.word_forms(row, gender, animate)
+    return jsonify({
+        "id": row["id"], "voc": row["voc"], "meaning": row["meaning"], "class": row["class"],
+        "forms": forms, "adj_forms": adj_forms, "generated": sorted(generated),
+    })
+
+@app.get("/api/analyze")
+def api_analyze():
+    """
+    Candidate (lemma, gender, case, number) analyses of an inflected form,
+    best first; `known` marks lemmas present in words.
+    """
+    form = (request.args.get("form") or "").strip()
+    if not form:
+        return jsonify({"error": "Missing 'form'"}), 400
+    limit = max(1, min(request.args.get("limit", default=20, type=int) or 20, 200))
+    with get_conn() as c:
+        found = morph.analyze(form, c)
+    return jsonify({
+        "form": form,
+        "lemmas": list(dict.fromkeys(a.lemma for a in found if a.known)),
+        "analyses": [a._asdict() for a in found[:limit]],
+        "total": len(found),
+    })
+
 # -------------------------------
 # Suggestions (user submit)
 # -------------------------------
@@ -271,6 +322,7 @@ def add_suggestion():
             (current_user.id, voc or None, meaning or None,
              user_class or None, _ensure_json_text(new_forms), _ensure_json_text(new_adj_forms)),
         )
+        lemmas = morph.lemmatize(conn, voc) if voc else []
 
     # Log rich metadata for future training (JSONL)
     pos.online_update(
@@ -282,12 +334,19 @@ def add_suggestion():
     )
 
     flash("Suggestion submitted.")
+    if lemmas and voc.lower() not in lemmas:
+        flash(f"Note: “{voc}” looks like an inflected form of {', '.join(lemmas[:3])}.")
     return redirect(url_for("suggestions"))
 
 # -------------------------------
 # Suggestions admin
 # -------------------------------
-SELECT_SUGG_BY_STATUS = """
+SUGG_STATUSES = ("pending", "approved", "rejected")
+SUGG_PAGE_SIZE = 50
+
+# Keyset page over idx_sugg_status_created: newest first, ties by id, so the
+# cursor (created_at, id) of the last row shown picks up exactly after it.
+SELECT_SUGG_PAGE = """
 SELECT
   s.id, s.user_id,
   s.new_voc,
@@ -297,20 +356,51 @@ SELECT
   s.status, s.created_at, s.updated_at,
   s.reviewed_by, s.reviewed_at, s.reason
 FROM suggestions s
-WHERE s.status = ?
-ORDER BY s.created_at DESC
+WHERE s.status = ? {after}
+ORDER BY s.created_at DESC, s.id
+LIMIT ?
 """
+SUGG_AFTER = "AND s.created_at <= ? AND (s.created_at < ? OR s.id > ?)"
+
+def _sugg_cursor(row) -> str:
+    return f"{row['created_at']}|{row['id']}"
+
+def _parse_sugg_cursor(raw: str | None) -> Optional[tuple]:
+    if not raw:
+        return None
+    ts, _, sid = raw.rpartition("|")
+    if not ts or not sid.isdigit():
+        abort(400, "bad cursor")
+    return ts, ts, int(sid)
 
 @app.route("/admin/suggestions")
 @login_required
 def suggestions():
+    """One status tab at a time, SUGG_PAGE_SIZE rows per page; approved/rejected history loads only when opened."""
     if getattr(current_user, "role", "user") != "admin":
         abort(403)
+    status = request.args.get("status", "pending")
+    if status not in SUGG_STATUSES:
+        abort(400, "status must be pending, approved or rejected")
+    after = _parse_sugg_cursor(request.args.get("after"))
     with get_conn() as conn:
-        pending  = conn.execute(SELECT_SUGG_BY_STATUS, ("pending",)).fetchall()
-        approved = conn.execute(SELECT_SUGG_BY_STATUS, ("approved",)).fetchall()
-        rejected = conn.execute(SELECT_SUGG_BY_STATUS, ("rejected",)).fetchall()
-    return render_template("suggestions.html", pending=pending, approved=approved, rejected=rejected)
+        rows = conn.execute(
+            SELECT_SUGG_PAGE.format(after=SUGG_AFTER if after else ""),
+            (status, *(after or ()), SUGG_PAGE_SIZE + 1),
+        ).fetchall()
+        counts = {r["status"]: r["n"] for r in conn.execute("SELECT status, n FROM suggestion_counts")}
+    more = len(rows) > SUGG_PAGE_SIZE
+    rows = rows[:SUGG_PAGE_SIZE]
+    return render_template(
+        "suggestions.html",
+        status=status,
+        rows=rows,
+        counts={st: counts.get(st, 0) for st in SUGG_STATUSES},
+        paged=after is not None,
+        next_after=(_sugg_cursor(rows[-1]) if more else None),
+        retrain=retrain_queue.status(),
+        backups=backup.status(),
+    )
 
 @app.post("/suggestions/approve/<int:sugg_id>")
 @login_required
@@ -375,23 +465,41 @@ def approve_suggestion(sugg_id: int):
         sugg_id=sugg_id, reviewer=getattr(current_user, "username", "admin"), ts=ts
     )
 
-    # Fire retrain script; it will SKIP unless enough feedback rows exist
-    subprocess.run(
-        [
-            sys.executable, "-m", "scripts.retrain_pos",
-            "--reuse-vocab",
-            "--feedback-weight", "2.0",
-            "--require-feedback", "100",
-            "--quiet"
-        ],
-        cwd=str(REPO),
-        stdout=subprocess.DEVNULL,
-        stderr=subprocess.DEVNULL
-    )
+    # Queue a retrain; the background worker coalesces bursts and the trainer
+    # SKIPs unless enough new feedback rows exist
+    retrain_queue.enqueue(getattr(current_user, "username", "admin"))
 
     flash(f"Approved '{voc}' ({final_label}).", "success")
     return redirect(url_for("suggestions"))
 
+@app.route("/admin/retrain", methods=["GET", "POST"])
+@login_required
+def retrain_status():
+    """GET: queue status as JSON. POST: request a retrain (coalesced with others)."""
+    if getattr(current_user, "role", "user") != "admin":
+        abort(403)
+    if request.method == "POST":
+        job_id = retrain_queue.enqueue(getattr(current_user, "username", "admin"))
+        if request.is_json:
+            return jsonify({"queued": job_id, **retrain_queue.status()})
+        flash(f"Retrain queued (job #{job_id}).")
+        return redirect(url_for("suggestions"))
+    return jsonify(retrain_queue.status())
+
+@app.route("/admin/backup", methods=["GET", "POST"])
+@login_required
+def backup_status():
+    """GET: backups and job state as JSON. POST: start an online backup in the background."""
+    if getattr(current_user, "role", "user") != "admin":
+        abort(403)
+    if request.method == "POST":
+        started = backup.start_async()
+        if request.is_json:
+            return jsonify({"started": started, **backup.status()})
+        flash("Backup started." if started else "A backup is already running.")
+        return redirect(url_for("suggestions"))
+    return jsonify(backup.status())
+
 @app.post("/admin/suggestions/<int:sid>/reject")
 @login_required
 def reject_suggestion(sid: int):
@@ -462,13 +570,41 @@ def classify():
         return jsonify({"error": "Missing 'voc' or 'meaning'"}), 400
 
     try:
+        t0 = perf_counter()
         label, probs = pos.predict(voc, meaning)
+        active_us = (perf_counter() - t0) * 1e6
         prob_map = {k: float(v) for k, v in (probs or {}).items()}
         top_p = float(prob_map.get(label, 0.0))
+        pos_registry.shadow_submit(voc, meaning, label, top_p, active_us)
         return jsonify({"label": label, "prob": top_p, "probs": prob_map})
     except Exception as e:
         return jsonify({"error": f"classify failed: {e.__class__.__name__}: {e}"}), 500
 
+@app.post("/classify/live")
+@login_required
+def classify_live():
+    """
+    Incremental classify-as-you-type. Body: {"stream": str, "rev": int, "edits": [...]}
+    or {"stream": str, "voc": str, "meaning": str} to (re)start. See pos.live_classify.
+    """
+    data = request.get_json(force=True, silent=True) or {}
+    stream = str(data.get("stream") or "")[:64]
+    if not stream:
+        return jsonify({"error": "Missing 'stream'"}), 400
+    key = f"{current_user.id}:{stream}"
+
+    try:
+        if "edits" in data:
+            edits = data.get("edits")
+            if not isinstance(edits, list):
+                return jsonify({"error": "'edits' must be a list"}), 400
+            out = pos.live_classify(key, rev=data.get("rev"), edits=edits)
+        else:
+            out = pos.live_classify(key, fields={"voc": data.get("voc"), "meaning": data.get("meaning")})
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"bad edit: {e}"}), 400
+    return jsonify(out)
+
 # -------------------------------
 # Deployment
 # -------------------------------
@@ -0,0 +1,304 @@
+from __future__ import annotations
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+import fcntl
+import gzip
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+
+from . import db as _db
+from .paths import DATA_DIR
+
+# -------- tuning --------
+BACKUP_DIR = Path(os.getenv("PLT_BACKUP_DIR", str(DATA_DIR / "backups")))
+PAGES_PER_STEP = int(os.getenv("PLT_BACKUP_PAGES", "256"))      # pages per backup step (1 MiB at 4 KiB pages)
+STEP_PAUSE_S = float(os.getenv("PLT_BACKUP_PAUSE", "0.005"))     # pause between steps so writers get the DB
+MAX_RESTARTS = int(os.getenv("PLT_BACKUP_MAX_RESTARTS", "5"))    # then finish in one step (see _copy)
+KEEP = int(os.getenv("PLT_BACKUP_KEEP", "7"))                    # compressed backups kept in BACKUP_DIR
+INTERVAL_H = float(os.getenv("PLT_BACKUP_INTERVAL_H", "0"))      # scheduled backups every N hours; 0 = off
+
+PREFIX, SUFFIX = "app-", ".db.gz"
+LOCK_NAME = ".backup.lock"   # flock in the backup dir: one backup at a time across workers
+
+# =========================
+# Online copy (sqlite3 backup API)
+# =========================
+class _Restarting(Exception):
+    pass
+
+def _copy(src: sqlite3.Connection, dst: sqlite3.Connection,
+          pages: int = PAGES_PER_STEP, pause: float = STEP_PAUSE_S) -> int:
+    """
+    Copy src into dst `pages` at a time, pausing between steps. Each step is
+    a short read transaction, so under WAL writers are never waiting on us.
+    A write from another connection makes SQLite restart the copy; after
+    MAX_RESTARTS the rest is done in one step (one read snapshot, which WAL
+    writers don't wait on either). Returns the number of restarts seen.
+    """
+    restarts, last = 0, None
+
+    def progress(status: int, remaining: int, total: int) -> None:
+        nonlocal restarts, last
+        if last is not None and remaining > last:
+            restarts += 1
+            if restarts > MAX_RESTARTS:
+                raise _Restarting
+        last = remaining
+        if remaining and pause > 0:
+            time.sleep(pause)
+
+    try:
+        src.backup(dst, pages=pages, progress=progress)
+    except _Restarting:
+        src.backup(dst, pages=-1)
+    return restarts
+
+# =========================
+# Archives: gzip of a plain SQLite file
+# =========================
+def _unpack(archive: Path, into: Path) -> Path:
+    out = into / "unpacked.db"
+    opener = gzip.open if archive.suffix == ".gz" else open
+    try:
+        with opener(archive, "rb") as f, out.open("wb") as g:
+            shutil.copyfileobj(f, g, 1 << 20)
+    except (EOFError, gzip.BadGzipFile, zlib.error) as e:
+        raise ValueError(f"{archive}: corrupt or truncated archive ({e})") from None
+    return out
+
+def table_counts(conn: sqlite3.Connection) -> Dict[str, int]:
+    names = [r[0] for r in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+    )]
+    return {n: int(conn.execute(f'SELECT COUNT(*) FROM "{n}"').fetchone()[0]) for n in names}
+
+def check(path: Path, name: Optional[str] = None) -> Dict[str, int]:
+    """integrity_check a DB file; row count per table. Raises ValueError if it isn't a sound app.db."""
+    name = name or str(path)
+    conn = sqlite3.connect(str(path))
+    try:
+        try:
+            rows = [r[0] for r in conn.execute("PRAGMA integrity_check")]
+        except sqlite3.DatabaseError as e:
+            raise ValueError(f"{name}: {e}") from None
+        if rows != ["ok"]:
+            raise ValueError(f"{name}: integrity_check: {'; '.join(rows[:5])}")
+        counts = table_counts(conn)
+    finally:
+        conn.close()
+    missing = {"users", "words"} - counts.keys()
+    if missing:
+        raise ValueError(f"{name}: not an app.db (missing {', '.join(sorted(missing))})")
+    return counts
+
+def verify(archive: Path) -> Dict[str, int]:
+    """
+    Restore `archive` into a scratch DB the way restore() would, check it and
+    return its row counts per table. Raises ValueError on any mismatch.
+    """
+    archive = Path(archive)
+    with tempfile.TemporaryDirectory(prefix="plt-verify-") as tmp:
+        raw = _unpack(archive, Path(tmp))
+        counts = check(raw, str(archive))
+        scratch = Path(tmp) / "restored.db"
+        src, dst = sqlite3.connect(str(raw)), sqlite3.connect(str(scratch))
+        try:
+            src.backup(dst)
+            restored = table_counts(dst)
+        finally:
+            src.close()
+            dst.close()
+    if restored != counts:
+        raise ValueError(f"{archive}: restored copy differs ({restored} != {counts})")
+    return counts
+
+# =========================
+# Backup / restore
+# =========================
+def _stamp() -> str:
+    return datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S-%f")[:-3]   # fixed width: sorts by time
+
+def list_backups(directory: Path = BACKUP_DIR) -> List[dict]:
+    """Backups in `directory`, newest first (names sort by their UTC stamp)."""
+    out = []
+    for p in sorted(Path(directory).glob(f"{PREFIX}*{SUFFIX}"), reverse=True):
+        st = p.stat()
+        out.append({
+            "name": p.name, "bytes": st.st_size,
+            "created": datetime.fromtimestamp(st.st_mtime, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        })
+    return out
+
+def rotate(directory: Path = BACKUP_DIR, keep: int = KEEP) -> List[str]:
+    """Delete all but the `keep` newest backups; returns the removed names."""
+    if keep <= 0:
+        return []
+    old = [b["name"] for b in list_backups(directory)[keep:]]
+    for name in old:
+        (Path(directory) / name).unlink(missing_ok=True)
+    return old
+
+def backup(dest: Optional[Path] = None, db: Optional[Path] = None, keep: int = KEEP) -> dict:
+    """
+    Online, compressed, verified backup of app.db. `dest` is a directory (a
+    stamped file is written there and the directory rotated to `keep`) or a
+    file name (written as-is, no rotation).
+    """
+    db = Path(db) if db is not None else _db.DB_PATH
+    if not db.exists():
+        raise FileNotFoundError(f"no database at {db}")
+    dest = Path(dest) if dest is not None else BACKUP_DIR
+    into_dir = dest.is_dir() or not dest.suffix
+    if into_dir:
+        dest.mkdir(parents=True, exist_ok=True)
+        out = dest / f"{PREFIX}{_stamp()}{SUFFIX}"
+    else:
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        out = dest
+
+    t0 = time.monotonic()
+    with tempfile.TemporaryDirectory(prefix=".backup-", dir=out.parent) as tmp:
+        raw = Path(tmp) / "copy.db"
+        src, dst = _db.get_conn(db), sqlite3.connect(str(raw))
+        try:
+            restarts = _copy(src, dst)
+        finally:
+            dst.close()
+            src.close()
+        copied = time.monotonic() - t0
+        part = Path(tmp) / out.name
+        with raw.open("rb") as f, gzip.open(part, "wb", compresslevel=6) as g:
+            shutil.copyfileobj(f, g, 1 << 20)
+        db_bytes = raw.stat().st_size
+        os.replace(part, out)
+    try:
+        counts = verify(out)
+    except ValueError:
+        out.unlink(missing_ok=True)
+        raise
+    return {
+        "path": str(out), "bytes": out.stat().st_size, "db_bytes": db_bytes,
+        "copy_s": round(copied, 3), "total_s": round(time.monotonic() - t0, 3),
+        "restarts": restarts, "tables": counts,
+        "removed": rotate(dest, keep) if into_dir else [],
+    }
+
+def restore(archive: Path, db: Optional[Path] = None) -> Dict[str, int]:
+    """
+    Verify `archive`, then copy it over app.db through the backup API, so it
+    is safe while the app is running (other connections see the restored
+    data on their next transaction). Returns the restored row counts.
+    """
+    db = Path(db) if db is not None else _db.DB_PATH
+    archive = Path(archive)
+    counts = verify(archive)
+    db.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(prefix=".restore-", dir=db.parent) as tmp:
+        raw = _unpack(archive, Path(tmp))
+        src, dst = sqlite3.connect(str(raw)), _db.get_conn(db)
+        try:
+            src.backup(dst)
+            restored = table_counts(dst)
+        finally:
+            src.close()
+            dst.close()
+    if restored != counts:
+        raise ValueError(f"{db}: restore incomplete ({restored} != {counts})")
+    return restored
+
+# =========================
+# Admin-triggered / scheduled job (one at a time across workers via flock)
+# =========================
+_STATE: dict = {"running": False, "last": None, "error": None}
+_STATE_LOCK = threading.Lock()
+
+def run_locked(min_age_h: float = 0.0) -> Optional[dict]:
+    """
+    Back up into BACKUP_DIR unless another worker is already doing so, or the
+    newest backup is younger than `min_age_h`. Returns the result or None.
+    """
+    BACKUP_DIR.mkdir(parents=True, exist_ok=True)
+    with (BACKUP_DIR / LOCK_NAME).open("a") as lock:
+        try:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return None
+        try:
+            newest = next(iter(sorted(BACKUP_DIR.glob(f"{PREFIX}*{SUFFIX}"), reverse=True)), None)
+            if newest is not None and min_age_h > 0 and time.time() - newest.stat().st_mtime < min_age_h * 3600:
+                return None
+            with _STATE_LOCK:
+                _STATE["running"] = True
+            try:
+                res = backup(BACKUP_DIR)
+                with _STATE_LOCK:
+                    _STATE["last"], _STATE["error"] = res, None
+                return res
+            except Exception as e:
+                with _STATE_LOCK:
+                    _STATE["error"] = f"{e.__class__.__name__}: {e}"
+                raise
+            finally:
+                with _STATE_LOCK:
+                    _STATE["running"] = False
+        finally:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+def start_async() -> bool:
+    """Run one backup on a background thread; False if this process already has one running."""
+    with _STATE_LOCK:
+        if _STATE["running"]:
+            return False
+        _STATE["running"] = True   # claimed until run_locked takes over
+
+    def run() -> None:
+        try:
+            run_locked()
+        except Exception:
+            pass   # kept in _STATE["error"]
+        finally:
+            with _STATE_LOCK:
+                _STATE["running"] = False
+
+    threading.Thread(target=run, name="db-backup", daemon=True).start()
+    return True
+
+def status(limit: int = 5) -> dict:
+    with _STATE_LOCK:
+        state = dict(_STATE)
+    backups = list_backups() if BACKUP_DIR.exists() else []
+    return {
+        "dir": str(BACKUP_DIR), "keep": KEEP, "interval_h": INTERVAL_H,
+        "running": state["running"], "error": state["error"],
+        "count": len(backups), "recent": backups[:limit],
+    }
+
+def _scheduler_loop() -> None:
+    while True:
+        time.sleep(min(INTERVAL_H * 3600, 600))
+        try:
+            run_locked(min_age_h=INTERVAL_H)
+        except Exception:
+            pass   # kept in _STATE["error"]; try again next round
+
+_SCHEDULER: Optional[threading.Thread] = None
+_SCHEDULER_PID: Optional[int] = None
+_SCHEDULER_LOCK = threading.Lock()
+
+def start_scheduler() -> None:
+    """Start this process's scheduled-backup thread if PLT_BACKUP_INTERVAL_H > 0 (idempotent, fork-aware)."""
+    global _SCHEDULER, _SCHEDULER_PID
+    if INTERVAL_H <= 0:
+        return
+    with _SCHEDULER_LOCK:
+        if _SCHEDULER is not None and _SCHEDULER_PID == os.getpid() and _SCHEDULER.is_alive():
+            return
+        _SCHEDULER_PID = os.getpid()
+        _SCHEDULER = threading.Thread(target=_scheduler_loop, name="db-backup-scheduler", daemon=True)
+        _SCHEDULER.start()
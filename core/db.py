@@ -5,19 +5,20 @@ from .paths import APP_DB
 
 DB_PATH: Path = APP_DB
 
-def get_conn() -> sqlite3.Connection:
-    """Open a SQLite connection with sane defaults."""
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(DB_PATH))
+def get_conn(path: Path | None = None) -> sqlite3.Connection:
+    """Open a SQLite connection with sane defaults (app.db unless `path` is given)."""
+    path = Path(path) if path is not None else DB_PATH
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path))
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA foreign_keys = ON;")
     conn.execute("PRAGMA journal_mode = WAL;")
     conn.execute("PRAGMA synchronous = NORMAL;")
     return conn
 
-def ensure_app_schema() -> None:
+def ensure_app_schema(path: Path | None = None) -> None:
     """Create tables & indexes if missing (idempotent)."""
-    with get_conn() as conn:
+    with get_conn(path) as conn:
         conn.executescript(
             """
             CREATE TABLE IF NOT EXISTS users (
@@ -76,15 +77,148 @@ def ensure_app_schema() -> None:
             );
             CREATE INDEX IF NOT EXISTS idx_uwp_user_weight ON user_word_progress(user_id, weight DESC);
             CREATE INDEX IF NOT EXISTS idx_uwp_user_last   ON user_word_progress(user_id, last_practiced);
+
+            -- POS feedback (mirrors data/pos_feedback.jsonl; rec_hash = sha1 of the JSON line)
+            CREATE TABLE IF NOT EXISTS pos_feedback (
+              id           INTEGER PRIMARY KEY AUTOINCREMENT,
+              created_at   TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+              voc          TEXT    NOT NULL,
+              meaning      TEXT,
+              label        TEXT    NOT NULL,
+              corrected    INTEGER NOT NULL DEFAULT 0,
+              confirmed    INTEGER NOT NULL DEFAULT 0,
+              source       TEXT,
+              model_label  TEXT,
+              model_prob   REAL,
+              meta         TEXT,
+              rec_hash     TEXT    UNIQUE
+            );
+            CREATE INDEX IF NOT EXISTS idx_fb_created   ON pos_feedback(created_at);
+            CREATE INDEX IF NOT EXISTS idx_fb_confirmed ON pos_feedback(confirmed, created_at);
+            CREATE INDEX IF NOT EXISTS idx_fb_corrected ON pos_feedback(corrected, created_at);
+
+            -- One row per retrain_pos run; last_feedback_id marks the consumed feedback
+            CREATE TABLE IF NOT EXISTS training_runs (
+              id                INTEGER PRIMARY KEY AUTOINCREMENT,
+              started_at        TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+              finished_at       TIMESTAMP,
+              status            TEXT    NOT NULL DEFAULT 'running',
+              last_feedback_id  INTEGER NOT NULL DEFAULT 0,
+              base_rows         INTEGER,
+              feedback_rows     INTEGER,
+              model_version     TEXT,
+              mode              TEXT,
+              note              TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_runs_status ON training_runs(status, id);
+
+            -- Retrain requests (core.retrain_queue); bursts are coalesced into one run
+            CREATE TABLE IF NOT EXISTS retrain_jobs (
+              id            INTEGER PRIMARY KEY AUTOINCREMENT,
+              requested_at  TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+              requested_by  TEXT,
+              status        TEXT    NOT NULL DEFAULT 'pending',
+              started_at    TIMESTAMP,
+              finished_at   TIMESTAMP,
+              duration_s    REAL,
+              exit_code     INTEGER,
+              output        TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_retrain_jobs_status ON retrain_jobs(status, id);
             """
         )
+        # Columns added after a table first shipped (CREATE TABLE IF NOT EXISTS won't add them)
+        _ensure_column(conn, "training_runs", "mode", "TEXT")
+        _ensure_column(conn, "words", "forms_gen", "TEXT")   # scripts.regenerate_words_json stamp
+        _ensure_column(conn, "words", "updated_at", "TIMESTAMP")
+        _ensure_column(conn, "words", "row_version", "INTEGER NOT NULL DEFAULT 0")
+        conn.executescript(WORDS_CHANGE_TRACKING)
+        counts_new = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='trigger' AND name='trg_sugg_count_insert'"
+        ).fetchone() is None
+        conn.executescript(SUGGESTION_COUNTS)
+        if counts_new:   # first run on an existing DB: count once, the triggers keep it current after
+            conn.execute("DELETE FROM suggestion_counts")
+            conn.execute(
+                "INSERT INTO suggestion_counts (status, n) SELECT status, COUNT(*) FROM suggestions GROUP BY status"
+            )
+
+# Every insert, and every update that really changes an exported field, gives
+# the row the next table-wide row_version (and stamps updated_at), so
+# "changed since version V" is an index range scan. Stamp-only writes
+# (forms_gen) and no-op upserts leave it alone. With recursive triggers off
+# (SQLite's default) the triggers' own UPDATE doesn't re-fire them.
+WORDS_CHANGE_TRACKING = """
+CREATE INDEX IF NOT EXISTS idx_words_row_version ON words(row_version);
+
+CREATE TRIGGER IF NOT EXISTS trg_words_version_insert AFTER INSERT ON words
+BEGIN
+  UPDATE words
+  SET row_version = (SELECT COALESCE(MAX(row_version), 0) + 1 FROM words),
+      updated_at  = CURRENT_TIMESTAMP
+  WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_words_version_update
+AFTER UPDATE OF voc, meaning, class, forms, adj_forms, approved ON words
+WHEN OLD.voc IS NOT NEW.voc OR OLD.meaning IS NOT NEW.meaning OR OLD.class IS NOT NEW.class
+  OR OLD.forms IS NOT NEW.forms OR OLD.adj_forms IS NOT NEW.adj_forms OR OLD.approved IS NOT NEW.approved
+BEGIN
+  UPDATE words
+  SET row_version = (SELECT COALESCE(MAX(row_version), 0) + 1 FROM words),
+      updated_at  = CURRENT_TIMESTAMP
+  WHERE id = NEW.id;
+END;
+
+-- Last row_version an exporter (scripts.fetch) wrote out, per target
+CREATE TABLE IF NOT EXISTS sync_points (
+  name        TEXT PRIMARY KEY,
+  row_version INTEGER NOT NULL,
+  target_sig  TEXT,
+  synced_at   TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+# Per-status suggestion counts for the admin queue tabs, kept current by
+# triggers so the page never has to COUNT(*) a status with years of history.
+SUGGESTION_COUNTS = """
+CREATE TABLE IF NOT EXISTS suggestion_counts (
+  status TEXT PRIMARY KEY,
+  n      INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_sugg_count_insert AFTER INSERT ON suggestions
+BEGIN
+  INSERT INTO suggestion_counts (status, n) VALUES (NEW.status, 1)
+  ON CONFLICT(status) DO UPDATE SET n = n + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_sugg_count_delete AFTER DELETE ON suggestions
+BEGIN
+  UPDATE suggestion_counts SET n = n - 1 WHERE status = OLD.status;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_sugg_count_update AFTER UPDATE OF status ON suggestions
+WHEN OLD.status IS NOT NEW.status
+BEGIN
+  UPDATE suggestion_counts SET n = n - 1 WHERE status = OLD.status;
+  INSERT INTO suggestion_counts (status, n) VALUES (NEW.status, 1)
+  ON CONFLICT(status) DO UPDATE SET n = n + 1;
+END;
+"""
+
+def _ensure_column(conn: sqlite3.Connection, table: str, column: str, decl: str) -> None:
+    cols = {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}
+    if column not in cols:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
 
 if __name__ == "__main__":
     import argparse, sys, os, hashlib, binascii
     from pathlib import Path
 
     ap = argparse.ArgumentParser(
-        description="Initialize app.db schema. Use --fresh to delete and recreate."
+        description="Initialize app.db schema. Use --fresh to delete and recreate; "
+                    "--backup/--restore/--verify for online backups (core/backup.py)."
     )
     ap.add_argument(
         "--fresh",
@@ -101,8 +235,43 @@ if __name__ == "__main__":
         type=str,
         help="Admin password for the user (only honored with --fresh).",
     )
+    ap.add_argument(
+        "--backup",
+        nargs="?",
+        const="",
+        metavar="PATH",
+        help="Online gzip backup of app.db. PATH is a directory (stamped file, rotated to --keep; "
+             "default data/backups) or a file name.",
+    )
+    ap.add_argument("--keep", type=int, default=None, help="Backups to keep when backing up into a directory.")
+    ap.add_argument("--restore", type=Path, metavar="ARCHIVE", help="Verify ARCHIVE, then copy it over app.db.")
+    ap.add_argument("--verify", type=Path, metavar="ARCHIVE", help="Restore ARCHIVE into a scratch DB and check it.")
     args = ap.parse_args()
 
+    if args.backup is not None or args.restore or args.verify:
+        from core import backup
+
+        def _counts(c: dict) -> str:
+            return " ".join(f"{k}={v}" for k, v in c.items())
+
+        try:
+            if args.verify:
+                print(f"OK {args.verify}: {_counts(backup.verify(args.verify))}")
+            if args.backup is not None:
+                res = backup.backup(Path(args.backup) if args.backup else None,
+                                    keep=(args.keep if args.keep is not None else backup.KEEP))
+                print(f"Backup {res['path']}: {res['db_bytes']} -> {res['bytes']} bytes, "
+                      f"copy {res['copy_s']}s ({res['restarts']} restarts), total {res['total_s']}s, verified")
+                print(f"  {_counts(res['tables'])}")
+                for name in res["removed"]:
+                    print(f"  rotated out {name}")
+            if args.restore:
+                print(f"Restored {args.restore} into {DB_PATH}: {_counts(backup.restore(args.restore))}")
+        except (ValueError, OSError, sqlite3.Error) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        sys.exit(0)
+
     if args.fresh:
         # Make sure nothing else is using the DB before wiping.
         for p in [
@@ -0,0 +1,88 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Optional, Tuple
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+from scipy import sparse
+
+from .paths import DATA_DIR
+
+# -------- paths / tuning --------
+CACHE_DIR = Path(os.getenv("PLT_FEATURE_CACHE_DIR", str(DATA_DIR / "cache" / "features")))
+MAX_BYTES = int(os.getenv("PLT_FEATURE_CACHE_BYTES", str(512 << 20)))   # evict least recently used beyond this
+
+_PARTS = ("data", "indices", "indptr", "y")
+
+# =========================
+# Entries: <CACHE_DIR>/<key>/{data,indices,indptr,y}.npy + meta.json
+# =========================
+def entry_dir(key: str) -> Path:
+    return CACHE_DIR / key
+
+def get(key: str) -> Optional[Tuple[sparse.csr_matrix, np.ndarray]]:
+    """
+    (X, y) for `key`, memory-mapped read-only, or None on a miss. A hit
+    refreshes the entry's mtime, which is what eviction orders by.
+    """
+    d = entry_dir(key)
+    try:
+        meta = json.loads((d / "meta.json").read_text(encoding="utf-8"))
+        arrs = {p: np.load(d / f"{p}.npy", mmap_mode="r") for p in _PARTS}
+    except (FileNotFoundError, ValueError, OSError):
+        return None
+    X = sparse.csr_matrix((arrs["data"], arrs["indices"], arrs["indptr"]), shape=tuple(meta["shape"]), copy=False)
+    try:
+        os.utime(d)
+    except OSError:
+        pass
+    return X, arrs["y"]
+
+def put(key: str, X: sparse.csr_matrix, y: np.ndarray) -> None:
+    """Store (X, y) under `key` (written to a temp dir, then renamed), then evict to MAX_BYTES."""
+    d = entry_dir(key)
+    if d.exists():
+        return
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = CACHE_DIR / f".{key}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir()
+    try:
+        for name, a in zip(_PARTS, (X.data, X.indices, X.indptr, y)):
+            np.save(tmp / f"{name}.npy", np.ascontiguousarray(a))
+        (tmp / "meta.json").write_text(
+            json.dumps({"shape": list(X.shape), "nnz": int(X.nnz), "created": time.time()}), encoding="utf-8"
+        )
+        os.rename(tmp, d)
+    except OSError:
+        pass  # another trainer stored the same key first, or the disk is full; the cache is optional
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    evict()
+
+def _size(d: Path) -> int:
+    return sum(f.stat().st_size for f in d.iterdir() if f.is_file())
+
+def evict(max_bytes: int = MAX_BYTES) -> int:
+    """Delete least recently used entries until the cache fits in max_bytes; returns entries removed."""
+    if not CACHE_DIR.exists():
+        return 0
+    entries = []
+    for d in CACHE_DIR.iterdir():
+        if d.is_dir() and not d.name.startswith("."):
+            try:
+                entries.append((d.stat().st_mtime, _size(d), d))
+            except OSError:
+                continue
+    total = sum(size for _m, size, _d in entries)
+    removed = 0
+    for _mtime, size, d in sorted(entries):
+        if total <= max_bytes:
+            break
+        shutil.rmtree(d, ignore_errors=True)
+        total -= size
+        removed += 1
+    return removed
@@ -0,0 +1,379 @@
+from __future__ import annotations
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+import atexit
+import fcntl
+import gzip
+import hashlib
+import json
+import logging
+import lzma
+import os
+import threading
+
+from .paths import DATA_DIR
+
+log = logging.getLogger(__name__)
+
+# -------- paths / tuning --------
+FEEDBACK_PATH = DATA_DIR / "pos_feedback.jsonl"
+
+FLUSH_MAX_RECORDS = int(os.getenv("PLT_FEEDBACK_FLUSH_RECORDS", "64"))       # flush when this many are buffered
+FLUSH_INTERVAL_S = float(os.getenv("PLT_FEEDBACK_FLUSH_INTERVAL", "2"))      # ... or after this long
+SEGMENT_MAX_BYTES = int(os.getenv("PLT_FEEDBACK_SEGMENT_BYTES", str(16 << 20)))  # rotate the active file past this
+MIRROR_TO_DB = os.getenv("PLT_FEEDBACK_DB", "1") != "0"                      # also insert into app.db pos_feedback
+MAX_BUFFERED = int(os.getenv("PLT_FEEDBACK_MAX_BUFFERED", "10000"))           # drop (and count) new records beyond this
+
+ARCHIVE_DIR = DATA_DIR / "feedback_archive"   # compressed closed segments + index.json
+ARCHIVE_INDEX = ARCHIVE_DIR / "index.json"
+CODECS = {".gz": gzip.open, ".xz": lzma.open}
+
+# =========================
+# Segments
+# =========================
+def _archive_dir(path: Path) -> Path:
+    return ARCHIVE_DIR if path == FEEDBACK_PATH else path.parent / ARCHIVE_DIR.name
+
+def closed_segments(path: Path = FEEDBACK_PATH) -> List[Path]:
+    """Rotated, no-longer-written segments (pos_feedback.<stamp>-<pid>.jsonl), oldest first."""
+    return sorted(path.parent.glob(f"{path.stem}.*{path.suffix}"))
+
+def segment_paths(path: Path = FEEDBACK_PATH) -> List[Path]:
+    """
+    Archived segments, closed segments, then the active file: the order
+    records were written in (segment names start with their rotation stamp).
+    """
+    archived = [p for p in _archive_dir(path).glob(f"{path.stem}.*{path.suffix}.*") if p.suffix in CODECS]
+    done = {p.stem for p in archived}
+    # A segment whose archive exists was interrupted before its unlink; read the archive only
+    closed = [p for p in closed_segments(path) if p.name not in done]
+    older = sorted(archived + closed, key=lambda p: p.name)
+    return older + ([path] if path.exists() else [])
+
+def _open_text(p: Path):
+    opener = CODECS.get(p.suffix)
+    return opener(p, "rt", encoding="utf-8") if opener else p.open("r", encoding="utf-8")
+
+def iter_lines(path: Path = FEEDBACK_PATH, since: Optional[str] = None) -> Iterator[Tuple[str, dict]]:
+    """
+    Yield (raw_line, record) across all segments, one file open at a time;
+    malformed lines are skipped. With `since` (an ISO timestamp), archives the
+    index says end before it are skipped without being decompressed.
+    """
+    since = (_created_at(since) or since) if since else None
+    index = load_archive_index(path) if since else {}
+    for p in segment_paths(path):
+        ts_max = (index.get(p.name) or {}).get("ts_max")
+        if since and ts_max and ts_max < since:
+            continue
+        with _open_text(p) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    rec = json.loads(line)
+                except Exception:
+                    continue
+                if isinstance(rec, dict):
+                    yield line, rec
+
+def iter_records(path: Path = FEEDBACK_PATH, since: Optional[str] = None) -> Iterator[dict]:
+    """Yield feedback dicts across all segments; malformed lines are skipped."""
+    for _line, rec in iter_lines(path, since):
+        yield rec
+
+# =========================
+# Archive (compressed closed segments)
+# =========================
+def load_archive_index(path: Path = FEEDBACK_PATH) -> dict:
+    """{archive file name: {rows, ts_min, ts_max, raw_bytes, bytes, archived_at}}"""
+    try:
+        return json.loads((_archive_dir(path) / ARCHIVE_INDEX.name).read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def _save_archive_index(path: Path, index: dict) -> None:
+    dst = _archive_dir(path) / ARCHIVE_INDEX.name
+    tmp = dst.with_name(f".{dst.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(index, ensure_ascii=False, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, dst)
+
+def archive_segment(seg: Path, codec: str = ".gz", path: Path = FEEDBACK_PATH) -> Tuple[str, dict]:
+    """
+    Compress one closed segment into the archive dir, counting rows and the
+    ts range on the way; returns (archive name, index entry). The source is
+    left in place; the caller removes it once the index is saved.
+    """
+    adir = _archive_dir(path)
+    adir.mkdir(parents=True, exist_ok=True)
+    dst = adir / (seg.name + codec)
+    tmp = dst.with_name(f".{dst.name}.{os.getpid()}.tmp")
+    rows, ts_min, ts_max = 0, None, None
+    try:
+        with seg.open("rb") as src, CODECS[codec](tmp, "wb") as out:
+            for line in src:
+                out.write(line)
+                if not line.strip():
+                    continue
+                rows += 1
+                try:
+                    ts = _created_at(json.loads(line).get("ts"))
+                except Exception:
+                    ts = None
+                if ts:
+                    ts_min = ts if ts_min is None or ts < ts_min else ts_min
+                    ts_max = ts if ts_max is None or ts > ts_max else ts_max
+        with tmp.open("rb") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp, dst)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return dst.name, {
+        "rows": rows, "ts_min": ts_min, "ts_max": ts_max,
+        "raw_bytes": seg.stat().st_size, "bytes": dst.stat().st_size,
+        "archived_at": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+def archive_closed(path: Path = FEEDBACK_PATH, codec: str = ".gz", keep: int = 0) -> List[Tuple[str, dict]]:
+    """
+    Move every closed segment except the newest `keep` into the compressed
+    archive. Closed segments are never written again, so only concurrent
+    archivers need excluding (flock on the archive dir's lock file).
+    """
+    if codec not in CODECS:
+        raise ValueError(f"unknown codec {codec!r}; expected one of {sorted(CODECS)}")
+    adir = _archive_dir(path)
+    adir.mkdir(parents=True, exist_ok=True)
+    done = []
+    with (adir / ".lock").open("a") as lock:
+        fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        try:
+            segs = closed_segments(path)
+            for seg in segs[:max(0, len(segs) - keep)]:
+                name, entry = archive_segment(seg, codec, path)
+                index = load_archive_index(path)
+                index[name] = entry
+                _save_archive_index(path, index)
+                seg.unlink()
+                done.append((name, entry))
+        finally:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+    return done
+
+# =========================
+# SQLite mirror (pos_feedback table)
+# =========================
+_DB_FIELDS = ("voc", "meaning", "label", "corrected", "confirmed", "source", "model_label", "model_prob", "ts")
+
+INSERT_FEEDBACK_SQL = """
+INSERT OR IGNORE INTO pos_feedback
+  (created_at, voc, meaning, label, corrected, confirmed, source, model_label, model_prob, meta, rec_hash)
+VALUES (COALESCE(?, CURRENT_TIMESTAMP), ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+def _created_at(ts) -> str | None:
+    """'2025-01-02T03:04:05Z' or '2025-01-02 03:04:05' -> SQLite's 'YYYY-MM-DD HH:MM:SS'."""
+    s = str(ts or "").strip().replace("T", " ")
+    return s[:19] if len(s) >= 19 and s[4] == "-" and s[13] == ":" else None
+
+def db_row(line: str, rec: dict) -> tuple | None:
+    """Map one JSONL record to a pos_feedback row; None if it lacks voc/label."""
+    voc = str(rec.get("voc") or "").strip()
+    label = str(rec.get("label") or "").strip()
+    if not voc or not label:
+        return None
+    try:
+        prob = float(rec["model_prob"]) if rec.get("model_prob") is not None else None
+    except (TypeError, ValueError):
+        prob = None
+    extra = {k: v for k, v in rec.items() if k not in _DB_FIELDS}
+    return (
+        _created_at(rec.get("ts")), voc, rec.get("meaning"), label,
+        int(bool(rec.get("corrected"))), int(bool(rec.get("confirmed"))),
+        rec.get("source"), rec.get("model_label"), prob,
+        json.dumps(extra, ensure_ascii=False) if extra else None,
+        hashlib.sha1(line.strip().encode("utf-8")).hexdigest(),
+    )
+
+def insert_records(conn, pairs: Iterable[Tuple[str, dict]]) -> int:
+    """INSERT OR IGNORE (line, record) pairs; rec_hash makes re-imports idempotent."""
+    rows = [r for r in (db_row(line, rec) for line, rec in pairs) if r is not None]
+    if not rows:
+        return 0
+    return conn.executemany(INSERT_FEEDBACK_SQL, rows).rowcount
+
+# =========================
+# Writer
+# =========================
+class FeedbackWriter:
+    """
+    Buffers feedback records in memory and appends them from a background
+    thread, so request handlers never touch the file. Each flush takes an
+    exclusive flock (workers share the file), writes the whole batch, and
+    fsyncs once. When the active file passes SEGMENT_MAX_BYTES it is renamed to
+    a closed segment under the same lock. The batch is then mirrored into the
+    indexed pos_feedback table with one executemany.
+
+    A failed flush keeps the batch buffered and is retried on the next tick.
+    While the file stays unwritable the buffer is capped at `max_buffered`;
+    records past that are dropped and counted in `dropped`.
+    """
+
+    def __init__(self, path: Path = FEEDBACK_PATH, max_records: int = FLUSH_MAX_RECORDS,
+                 interval_s: float = FLUSH_INTERVAL_S, segment_bytes: int = SEGMENT_MAX_BYTES,
+                 mirror_db: bool = MIRROR_TO_DB, max_buffered: int = MAX_BUFFERED):
+        self.path = Path(path)
+        self.mirror_db = mirror_db
+        self.max_records = max(1, max_records)
+        self.interval_s = max(0.05, interval_s)
+        self.segment_bytes = segment_bytes
+        self.max_buffered = max(self.max_records, max_buffered)
+        self.mirror_failures = 0   # DB mirror errors since start (each is logged)
+        self.flush_failures = 0    # failed JSONL appends since start (each is logged, then retried)
+        self.dropped = 0           # records refused because the buffer was full
+        self._buf: List[Tuple[str, dict]] = []
+        self._cond = threading.Condition()
+        self._io_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._pid = os.getpid()
+        self._closed = False
+
+    # ---- producer side ----
+    def write(self, rec: dict) -> None:
+        line = json.dumps(rec, ensure_ascii=False)
+        with self._cond:
+            self._ensure_thread()
+            if len(self._buf) >= self.max_buffered:
+                self.dropped += 1
+                if self.dropped == 1 or self.dropped % 1000 == 0:
+                    log.warning("feedback buffer full (%d records, flushes failing); %d record(s) dropped so far",
+                                len(self._buf), self.dropped)
+                return
+            self._buf.append((line, rec))
+            if len(self._buf) >= self.max_records:
+                self._cond.notify()
+
+    def flush(self) -> int:
+        """Write everything buffered so far; returns the number of records written."""
+        with self._io_lock:
+            with self._cond:
+                batch, self._buf = self._buf, []
+            if batch:
+                try:
+                    self._append([line for line, _rec in batch])
+                except Exception:
+                    with self._cond:
+                        self._buf[:0] = batch  # retry on the next flush
+                    raise
+                if self.mirror_db:
+                    self._mirror(batch)
+            return len(batch)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        try:
+            self.flush()
+        except Exception:
+            with self._cond:
+                n = len(self._buf)
+            log.error("feedback writer closing with %d unwritten record(s) for %s", n, self.path, exc_info=True)
+
+    # ---- background side ----
+    def _ensure_thread(self) -> None:
+        # Called with _cond held. A forked worker inherits the object but not the thread.
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._thread = None
+            self._buf = []
+        if self._thread is None or not self._thread.is_alive():
+            self._closed = False
+            self._thread = threading.Thread(target=self._run, name="pos-feedback-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        failed = False
+        while True:
+            with self._cond:
+                # after a failure, wait out the interval even with a full buffer (no busy retry)
+                if (failed or len(self._buf) < self.max_records) and not self._closed:
+                    self._cond.wait(self.interval_s)
+                closed = self._closed
+            if closed:
+                return   # close() does the final flush
+            try:
+                n = self.flush()
+                if failed:
+                    log.warning("feedback flush to %s recovered; wrote %d buffered record(s)", self.path, n)
+                failed = False
+            except Exception:
+                # records stay buffered for the next tick; an I/O error must not kill the writer
+                self.flush_failures += 1
+                with self._cond:
+                    n = len(self._buf)
+                log.warning("feedback flush to %s failed (%d failure(s) so far); %d record(s) buffered, retrying",
+                            self.path, self.flush_failures, n, exc_info=not failed)   # traceback once per outage
+                failed = True
+
+    def _mirror(self, batch: List[Tuple[str, dict]]) -> None:
+        # The JSONL append already succeeded, so a DB error must not re-queue the
+        # batch; `python -m scripts.import_feedback` backfills anything missed.
+        from .db import get_conn
+        try:
+            with get_conn() as conn:
+                insert_records(conn, batch)
+        except Exception:
+            self.mirror_failures += 1
+            log.warning("pos_feedback mirror failed for %d record(s) (%d failure(s) so far); "
+                        "the JSONL has them, run `python -m scripts.import_feedback` to backfill",
+                        len(batch), self.mirror_failures, exc_info=True)
+
+    def _append(self, lines: List[str]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = "".join(line + "\n" for line in lines).encode("utf-8")
+        while True:
+            with self.path.open("ab") as f:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                try:
+                    # Another worker may have rotated the file while we waited for the lock.
+                    try:
+                        if os.fstat(f.fileno()).st_ino != os.stat(self.path).st_ino:
+                            continue
+                    except FileNotFoundError:
+                        continue
+                    size = os.fstat(f.fileno()).st_size
+                    if size > 0 and size + len(data) > self.segment_bytes:
+                        self._rotate()
+                        continue
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                    return
+                finally:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def _rotate(self) -> None:
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+        os.replace(self.path, self.path.with_name(f"{self.path.stem}.{stamp}-{os.getpid()}{self.path.suffix}"))
+
+# =========================
+# Process-wide instance
+# =========================
+_WRITER: FeedbackWriter | None = None
+_WRITER_LOCK = threading.Lock()
+
+def get_writer() -> FeedbackWriter:
+    global _WRITER
+    if _WRITER is None:
+        with _WRITER_LOCK:
+            if _WRITER is None:
+                _WRITER = FeedbackWriter()
+                atexit.register(_WRITER.close)  # gunicorn workers exit via sys.exit on graceful shutdown
+    return _WRITER
+
+def record(rec: dict) -> None:
+    """Queue one feedback record; returns immediately."""
+    get_writer().write(rec)
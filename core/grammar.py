@@ -1,5 +1,9 @@
-from typing import Dict, Optional
-from core.files import save_words_json
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+CASES = ["NOM", "GEN", "DAT", "ACC", "INST", "LOC"]  # paradigm keys 1..6, in this order
+
+# Bump whenever a rule change alters generated forms.
+GRAMMAR_VERSION = 2
 
 VOWELS = FINAL_VOWELS = "aąeęioóuy"
 EIGHT_COSSONANT = ("b", "p", "m", "n", "f", "w", "s", "z")
@@ -12,296 +16,144 @@ SOFT_SOUND_SINGLE = ("ś", "ć", "ź", "ń")  # removed plain 'l' (see note)
 SOFT_SOUND_DOUBLE = ("dź", "dzi", "si", "ci", "zi", "ni")
 SOFT_SOUND_MAP = {"ś": "si", "ć": "ci", "ź": "zi", "ń": "ni"}  # no 'l' here
 
-def _is_vowel(ch: str) -> bool:
-    return ch in VOWELS
-
-def _guess_gender(voc: str) -> str:
+def guess_gender(voc: str) -> str:
+    """'m', 'f' or 'n' from the lemma's ending (what grammar_noun assumes without a gender)."""
     if voc.endswith("a"):
         return "f"
     if voc.endswith(("o", "e", "ę", "um")):
         return "n"
     return "m"
 
-def _strip_final_vowel(voc: str) -> str:
-    if voc and voc[-1] in FINAL_VOWELS:
-        return voc[:-1]
-    return voc
-
 # =========================
-#  Nouns
+#  Rule tables
 # =========================
-
-def _singular_ins_ending(stem: str) -> str:
-    return "iem" if stem.endswith(("k", "g")) else "em"
-
-def _plural_nom_ending(stem: str) -> str:
-    if stem.endswith(("k", "g")):
-        return "i"
-    if stem.endswith(SOFT_SOUND_SINGLE):
-        return "e"
-    if stem.endswith(SOFT_SOUND_DOUBLE):
-        return "e"
-    if stem.endswith(HARD_SOUND_NOKG):
-        return "e"
-    return "i"
-
-def grammar_noun(voc: str, gender: Optional[str] = None, animate: Optional[bool] = None) -> Dict[str, Dict[int, str]]:
-    """
-    Returns:
-      {
-        "sg": {1: ..., 2: ..., 3: ..., 4: ..., 5: ..., 6: ...},
-        "pl": {1: ..., 2: ..., 3: ..., 4: ..., 5: ..., 6: ...}
-      }
-    Heuristics; irregulars are not fully covered by design.
-    """
-    voc = (voc or "").strip()
-    g = (gender or _guess_gender(voc)).lower()
-    is_anim = bool(animate) if animate is not None else False
-
-    sg: Dict[int, str] = {}
-    pl: Dict[int, str] = {}
-
+# Each form is an ordered list of rules; the first whose condition holds wins.
+#   ("voc",  suffixes, cut, add)  lemma ends with one of suffixes -> lemma[:-cut] + add
+#   ("stem", suffixes, cut, add)  same, tested on / cut from the stem
+#   ("same", part, case)          copy of an earlier form
+# A suffix of "" always matches. Rules may carry a trailing animacy flag
+# (True/False) and then only apply to that animacy. The stem is the lemma
+# minus one of the paradigm's "strip" endings.
+
+def _soft(base: str, add: str) -> list:
+    """ś/ć/ź/ń + add -> si/ci/zi/ni + add."""
+    return [(base, (c,), 1, SOFT_SOUND_MAP[c] + add) for c in SOFT_SOUND_SINGLE]
+
+def _alternation(base: str, size: int, cut: int) -> list:
+    return [(base, (k,), cut, v) for k, v in ALTERNATION.items() if len(k) == size]
+
+def _keep() -> list:
+    return [("voc", ("",), 0, "")]
+
+def _plus(add: str) -> list:
+    return [("stem", ("",), 0, add)]
+
+_PL_NOM_ENDING = [
+    ("stem", ("k", "g"), 0, "i"),
+    ("stem", SOFT_SOUND_SINGLE + SOFT_SOUND_DOUBLE + HARD_SOUND_NOKG, 0, "e"),
+    ("stem", ("",), 0, "i"),
+]
+
+def _soft_or_plus(add: str) -> list:
+    return _soft("stem", add) + _plus(add)
+
+def _acc(part: str, case_anim: int, case_inanim: int) -> list:
+    return [("same", part, case_anim, True), ("same", part, case_inanim, False)]
+
+_F_DAT_LOC = [
+    ("voc", ("ia",), 2, "ii"),
+    ("voc", ("ja",), 2, "ji"),
+    ("stem", ("l",), 0, "i"),
+    *_soft("voc", ""),
+    *_alternation("voc", 2, 2),   # -ka/-ga/-ha
+    *_alternation("voc", 3, 3),   # -cha (shadowed by -ha above; kept as in the original chain)
+    *_alternation("stem", 1, 1),  # -d/-t/-r/-ł
+    ("stem", EIGHT_COSSONANT, 0, "ie"),
+    ("stem", ("",), 0, "y"),
+]
+
+NOUN_RULES: Dict[str, dict] = {
     # FEMININE (typically -a)
-    if g == "f":
-        stem = voc[:-1] if voc.endswith("a") else voc
-
-        # Singular
-        # NOM
-        sg[1] = voc  
-        # GEN
-        if voc.endswith("ia"):
-            sg[2] = voc[:-2] + "ii"   # e.g., Austria→Austrii (sometimes -i; heuristic)
-        elif voc.endswith("ja"):
-            sg[2] = voc[:-2] + "ji"   # restauracja→restauracji
-        elif stem.endswith(SOFT_SOUND_SINGLE):  # ść
-            sg[2] = stem[:-1] + SOFT_SOUND_MAP[stem[-1]]
-        elif stem.endswith(("k", "g")):
-            sg[2] = stem + "i"
-        else:
-            sg[2] = stem + "y"
-        # DAT
-        if voc.endswith("ia"):
-            sg[3] = voc[:-2] + "ii"
-        elif voc.endswith("ja"):
-            sg[3] = voc[:-2] + "ji"
-        elif stem and stem[-1] == "l":
-            sg[3] = stem + "i"
-        elif voc and voc[-1] in SOFT_SOUND_SINGLE:
-            sg[3] = voc[:-1] + SOFT_SOUND_MAP[voc[-1]]  # e.g., -ć → -ci
-        elif len(voc) >= 2 and voc[-2:] in ALTERNATION:  # -ka/-ga/-ha
-            sg[3] = voc[:-2] + ALTERNATION[voc[-2:]]
-        elif len(voc) >= 3 and voc[-3:] in ALTERNATION:  # -cha
-            sg[3] = voc[:-3] + ALTERNATION[voc[-3:]]
-        elif stem and stem[-1] in ALTERNATION:           # -d/-t/-r/-ł (replace last)
-            sg[3] = stem[:-1] + ALTERNATION[stem[-1]]
-        elif stem and stem[-1] in EIGHT_COSSONANT:
-            sg[3] = stem + "ie"
-        else:
-            sg[3] = stem + "y"
-        # ACC
-        sg[4] = stem + "ę"
-        # INS
-        sg[5] = stem + "ą"
-        # LOC (same pattern as DAT, but write to #6)
-        if voc.endswith("ia"):
-            sg[6] = voc[:-2] + "ii"
-        elif voc.endswith("ja"):
-            sg[6] = voc[:-2] + "ji"
-        elif stem and stem[-1] == "l":
-            sg[6] = stem + "i"
-        elif voc and voc[-1] in SOFT_SOUND_SINGLE:
-            sg[6] = voc[:-1] + SOFT_SOUND_MAP[voc[-1]]
-        elif len(voc) >= 2 and voc[-2:] in ALTERNATION:
-            sg[6] = voc[:-2] + ALTERNATION[voc[-2:]]
-        elif len(voc) >= 3 and voc[-3:] in ALTERNATION:
-            sg[6] = voc[:-3] + ALTERNATION[voc[-3:]]
-        elif stem and stem[-1] in ALTERNATION:
-            sg[6] = stem[:-1] + ALTERNATION[stem[-1]]
-        elif stem and stem[-1] in EIGHT_COSSONANT:
-            sg[6] = stem + "ie"
-        else:
-            sg[6] = stem + "y"
-
-        # Plural (approximate)
-        pl_stem = stem
-        # NOM
-        if pl_stem.endswith(SOFT_SOUND_SINGLE):
-            pl[1] = pl_stem[:-1] + SOFT_SOUND_MAP[pl_stem[-1]] + "e"
-        else:
-            pl[1] = pl_stem + _plural_nom_ending(pl_stem)
-        # GEN
-        if pl_stem.endswith(SOFT_SOUND_SINGLE):
-            pl[2] = pl_stem[:-1] + SOFT_SOUND_MAP[pl_stem[-1]]
-        else:
-            pl[2] = pl_stem
-        # DAT
-        if pl_stem.endswith(SOFT_SOUND_SINGLE):
-            pl[3] = pl_stem[:-1] + SOFT_SOUND_MAP[pl_stem[-1]] + "om"
-        else:
-            pl[3] = pl_stem + "om"
-        # ACC
-        pl[4] = pl[2] if is_anim else pl[1]            
-        # INS
-        if pl_stem.endswith(SOFT_SOUND_SINGLE):
-            pl[5] = pl_stem[:-1] + SOFT_SOUND_MAP[pl_stem[-1]] + "ami"
-        else:
-            pl[5] = pl_stem + "ami"
-        # LOC
-        if pl_stem.endswith(SOFT_SOUND_SINGLE):
-            pl[6] = pl_stem[:-1] + SOFT_SOUND_MAP[pl_stem[-1]] + "ach"
-        else:
-            pl[6] = pl_stem + "ach"
+    "f": {
+        "strip": ("a",),
+        "sg": {
+            1: _keep(),
+            2: [("voc", ("ia",), 2, "ii"),   # e.g., Austria→Austrii (sometimes -i; heuristic)
+                ("voc", ("ja",), 2, "ji"),   # restauracja→restauracji
+                *_soft("stem", ""),          # ść
+                ("stem", ("k", "g"), 0, "i"),
+                ("stem", ("",), 0, "y")],
+            3: _F_DAT_LOC,
+            4: _plus("ę"),
+            5: _plus("ą"),
+            6: _F_DAT_LOC,
+        },
+        "pl": {  # approximate
+            1: _soft("stem", "e") + _PL_NOM_ENDING,
+            2: _soft_or_plus(""),
+            3: _soft_or_plus("om"),
+            4: _acc("pl", 2, 1),
+            5: _soft_or_plus("ami"),
+            6: _soft_or_plus("ach"),
+        },
+    },
     # NEUTER (often -o, -e, -ę, -um)
-    elif g == "n":
-        stem = _strip_final_vowel(voc)
-
-        # Singular
-        sg[1] = voc                        # NOM
-        sg[2] = voc if voc.endswith("um") else stem + "a"  # GEN
-        sg[3] = voc if voc.endswith("um") else stem + "u"  # DAT  (fixed)
-        sg[4] = voc                        # ACC = NOM
-        sg[5] = stem + _singular_ins_ending(stem)          # INS
-
-        # LOC
-        if voc.endswith("um"):
-            sg[6] = voc
-        elif stem:
-            # replace last char(s) for palatalizations
-            if stem[-1] in ALTERNATION:
-                sg[6] = stem[:-1] + ALTERNATION[stem[-1]]
-            elif stem.endswith(EIGHT_COSSONANT):
-                sg[6] = stem + "ie"
-            else:
-                sg[6] = stem + "u"
-        else:
-            sg[6] = "u"
-
-        # Plural
-        if voc.endswith(("o", "e", "ę")):
-            pl[1] = stem + "a"
-        elif voc.endswith("um"):
-            pl[1] = voc[:-2] + "a"
-        else:
-            pl[1] = stem + "a"
-        pl[2] = stem                            # Gen (rough)
-        pl[3] = stem + "om"                     # Dat
-        pl[4] = pl[1]                           # Acc = Nom
-        pl[5] = stem + "ami"                    # Instr
-        pl[6] = stem + "ach"                    # Loc
-
+    "n": {
+        "strip": tuple(FINAL_VOWELS),
+        "sg": {
+            1: _keep(),
+            2: [("voc", ("um",), 0, ""), *_plus("a")],
+            3: [("voc", ("um",), 0, ""), *_plus("u")],
+            4: _keep(),
+            5: [("stem", ("k", "g"), 0, "iem"), *_plus("em")],
+            6: [("voc", ("um",), 0, ""),
+                *_alternation("stem", 1, 1),  # palatalizations
+                ("stem", EIGHT_COSSONANT, 0, "ie"),
+                *_plus("u")],
+        },
+        "pl": {
+            1: [("voc", ("um",), 2, "a"), *_plus("a")],
+            2: _plus(""),      # rough
+            3: _plus("om"),
+            4: [("same", "pl", 1)],
+            5: _plus("ami"),
+            6: _plus("ach"),
+        },
+    },
     # MASCULINE (default)
-    else:
-        stem = _strip_final_vowel(voc) if voc and _is_vowel(voc[-1]) else voc
-
-        # Singular
-        # NOM
-        sg[1] = voc                              
-        # GEN
-        if stem.endswith(SOFT_SOUND_SINGLE):
-            sg[2] = stem[:-1] + SOFT_SOUND_MAP[stem[-1]] + ("a" if is_anim else "u") 
-        else:
-            sg[2] = stem + ("a" if is_anim else "u") 
-        # DAT  
-        if stem.endswith(SOFT_SOUND_SINGLE):
-            sg[3] = stem[:-1] + SOFT_SOUND_MAP[stem[-1]] + "owi" # or u
-        else:
-            sg[3] = stem + "owi" # or u
-        # ACC         
-        sg[4] = sg[2] if is_anim else sg[1]      
-        # INS
-        if stem.endswith(SOFT_SOUND_SINGLE):
-            sg[5] = stem[:-1] + SOFT_SOUND_MAP[stem[-1]] + "em"
-        else:
-            sg[5] = stem + _singular_ins_ending(stem)
-        # LOC
-        if voc and voc[-1] in SOFT_SOUND_SINGLE:
-            sg[6] = voc[:-1] + SOFT_SOUND_MAP[voc[-1]] + "e"
-        elif stem and stem[-1] in ALTERNATION:
-            sg[6] = stem[:-1] + ALTERNATION[stem[-1]]
-        elif stem and stem[-1] in EIGHT_COSSONANT:
-            sg[6] = stem + "ie"
-        else:
-            sg[6] = stem + "u"
-
-        # Plural (approximate)
-        pl_stem = stem
-        # NOM
-        if pl_stem.endswith(SOFT_SOUND_SINGLE):
-            pl[1] = pl_stem[:-1] + SOFT_SOUND_MAP[pl_stem[-1]] + "e"
-        else:
-            pl[1] = pl_stem + _plural_nom_ending(pl_stem)
-        # GEN
-        if pl_stem.endswith(SOFT_SOUND_SINGLE):
-            pl[2] = pl_stem[:-1] + SOFT_SOUND_MAP[pl_stem[-1]] + "ów"
-        else:
-            pl[2] = pl_stem + "ów"
-        # DAT
-        if pl_stem.endswith(SOFT_SOUND_SINGLE):
-            pl[3] = pl_stem[:-1] + SOFT_SOUND_MAP[pl_stem[-1]] + "om"
-        else:
-            pl[3] = pl_stem + "om"
-        # ACC
-        pl[4] = pl[2] if is_anim else pl[1]            
-        # INS
-        if pl_stem.endswith(SOFT_SOUND_SINGLE):
-            pl[5] = pl_stem[:-1] + SOFT_SOUND_MAP[pl_stem[-1]] + "ami"
-        else:
-            pl[5] = pl_stem + "ami"
-        # LOC
-        if pl_stem.endswith(SOFT_SOUND_SINGLE):
-            pl[6] = pl_stem[:-1] + SOFT_SOUND_MAP[pl_stem[-1]] + "ach"
-        else:
-            pl[6] = pl_stem + "ach"
-
-    return {"sg": sg, "pl": pl}
-
-# =========================
-#  Adjectives (masculine lemma only)
-# =========================
+    "m": {
+        "strip": tuple(VOWELS),
+        "sg": {
+            1: _keep(),
+            2: [*(r + (True,) for r in _soft_or_plus("a")),    # animate -a
+                *(r + (False,) for r in _soft_or_plus("u"))],  # inanimate -u
+            3: _soft_or_plus("owi"),  # or -u
+            4: _acc("sg", 2, 1),
+            5: _soft("stem", "em") + [("stem", ("k", "g"), 0, "iem"), *_plus("em")],
+            6: [*_soft("voc", "e"),
+                *_alternation("stem", 1, 1),
+                ("stem", EIGHT_COSSONANT, 0, "ie"),
+                *_plus("u")],
+        },
+        "pl": {  # approximate
+            1: _soft("stem", "e") + _PL_NOM_ENDING,
+            2: _soft_or_plus("ów"),
+            3: _soft_or_plus("om"),
+            4: _acc("pl", 2, 1),
+            5: _soft_or_plus("ami"),
+            6: _soft_or_plus("ach"),
+        },
+    },
+}
 
-def _adj_stem(voc: str) -> str:
-    """
-    Lemma is M.SG.NOM (usually ends with -y or -i). Strip that for the stem.
-    """
-    s = (voc or "").strip()
-    return s[:-1] if s.endswith(("y", "i")) else s
+# Adjectives (masculine lemma, usually -y/-i). "Soft" contexts take -i- endings
+# (-iego, -im, -ich, ...): stem in a soft single/double or k/g, or lemma in -i.
+_ADJ_SOFT_STEM = SOFT_SOUND_SINGLE + SOFT_SOUND_DOUBLE + ("k", "g")
 
-def _adj_soft_for_im_ym(stem: str, voc: str) -> bool:
-    """
-    Decide -im/-ym and -imi/-ymi (M/N sg INS/LOC, pl DAT/INS).
-    Soft if:
-      - stem ends with a soft single/double,
-      - or lemma ends with -i,
-      - or stem ends with k/g (treat as 'soft-ie' context).
-    """
-    if stem.endswith(SOFT_SOUND_SINGLE) or stem.endswith(SOFT_SOUND_DOUBLE):
-        return True
-    if voc.endswith("i"):
-        return True
-    if stem.endswith(("k", "g")):
-        return True
-    return False
-
-def _adj_ie_needed(stem: str, voc: str) -> bool:
-    """
-    Decide -ie vs -e (N.SG; PL non-m+o NOM) and -ich vs -ych (PL GEN/LOC).
-    True when soft singles/doubles, or lemma ends with -i/-gi/-ki/-hi/-chi, or stem ends with k/g.
-    """
-    if stem.endswith(SOFT_SOUND_SINGLE) or stem.endswith(SOFT_SOUND_DOUBLE):
-        return True
-    if voc.endswith(("i", "gi", "ki", "hi", "chi")):
-        return True
-    if stem.endswith(("k", "g")):
-        return True
-    return False
-
-def _adj_gen_dat_endings(stem: str, voc: str) -> tuple[str, str]:
-    """
-    Gen/Dat M&N.SG endings.
-    Use -iego/-iemu in 'soft-ie' contexts (incl. k/g), else -ego/-emu.
-    """
-    use_ie = _adj_ie_needed(stem, voc)
-    return ("iego" if use_ie else "ego", "iemu" if use_ie else "emu")
+def _adj(soft: str, hard: str) -> list:
+    return [("stem", _ADJ_SOFT_STEM, 0, soft),
+            ("voc", ("i", "gi", "ki", "hi", "chi"), 1, soft),
+            ("stem", ("",), 0, hard)]
 
 # Masculine-personal plural nominative alternations (heuristic)
 _MP_NOM_MAP_TWO = {
@@ -319,15 +171,226 @@ _MP_NOM_MAP_ONE = {
     "g": "dzy",   # drogi → drodzy
 }
 
-def _adj_mp_nom(stem: str, soft_ie: bool) -> str:
+ADJ_RULES: dict = {
+    "strip": ("y", "i"),
+    "sg_m": {1: _keep(), 2: _adj("iego", "ego"), 3: _adj("iemu", "emu"), 4: _acc("sg_m", 2, 1),
+             5: _adj("im", "ym"), 6: _adj("im", "ym")},
+    "sg_f": {1: _plus("a"), 2: _plus("ej"), 3: _plus("ej"), 4: _plus("ą"), 5: _plus("ą"), 6: _plus("ej")},
+    "sg_n": {1: _adj("ie", "e"), 2: _adj("iego", "ego"), 3: _adj("iemu", "emu"), 4: [("same", "sg_n", 1)],
+             5: _adj("im", "ym"), 6: _adj("im", "ym")},
+    "pl_mo": {  # męskoosobowy
+        1: [*(("stem", (k,), 2, v) for k, v in _MP_NOM_MAP_TWO.items()),
+            *(("stem", (k,), 1, v) for k, v in _MP_NOM_MAP_ONE.items()),
+            *_adj("i", "y")],
+        2: _adj("ich", "ych"), 3: _adj("im", "ym"), 4: [("same", "pl_mo", 2)],
+        5: _adj("imi", "ymi"), 6: [("same", "pl_mo", 2)],
+    },
+    "pl_nmo": {  # non-męskoosobowy
+        1: _adj("ie", "e"), 2: _adj("ich", "ych"), 3: _adj("im", "ym"), 4: [("same", "pl_nmo", 1)],
+        5: _adj("imi", "ymi"), 6: [("same", "pl_nmo", 2)],
+    },
+}
+
+# =========================
+#  Compiler: rule tables -> reversed-suffix trie
+# =========================
+# Every condition above is "the lemma ends with X" for some X (a stem test on
+# s is "ends with s, or with s + a strip ending"). The trie holds all such X
+# reversed; the longest one matching a lemma decides every condition, so each
+# trie node stores the finished paradigm as (part, case, cut, add) per
+# animacy, generated into a small function that slices the lemma once per
+# distinct cut and returns the dict literal: inflecting is a walk of a few
+# characters plus one call. Nodes keep two variants: one for a lemma that is
+# exactly the node's suffix, one for a lemma with more (rule-irrelevant)
+# characters in front.
+
+_PAD = "\x00" * 4   # stands in for "some other characters" before a suffix
+
+# Per node and animacy: ((part, ((case, cut, add), ...)), ...)
+Entries = Tuple[Tuple[str, Tuple[Tuple[int, int, str], ...]], ...]
+
+def _rule_suffixes(rules: dict, parts: List[str]) -> set:
+    out = set(rules["strip"])
+    for part in parts:
+        for chain in rules[part].values():
+            for rule in chain:
+                if rule[0] == "voc":
+                    out.update(rule[1])
+                elif rule[0] == "stem":
+                    for sfx in rule[1]:
+                        out.add(sfx)
+                        out.update(sfx + e for e in rules["strip"])
+    out.discard("")
+    return out
+
+def _interpret(rules: dict, parts: List[str], word: str, anim: bool) -> Dict[str, Dict[int, str]]:
+    """Evaluate the rule tables directly on one word (compile time only)."""
+    stem = word[:-1] if word.endswith(rules["strip"]) else word
+    out: Dict[str, Dict[int, str]] = {part: {} for part in parts}
+    for part in parts:
+        for case in range(1, 7):
+            for rule in rules[part][case]:
+                if rule[0] == "same":
+                    if len(rule) > 3 and rule[3] != anim:
+                        continue
+                    out[part][case] = out[rule[1]][rule[2]]
+                    break
+                base_name, sfxs, cut, add = rule[:4]
+                if len(rule) > 4 and rule[4] != anim:
+                    continue
+                base = word if base_name == "voc" else stem
+                if base.endswith(sfxs):
+                    out[part][case] = base[:len(base) - cut] + add
+                    break
+    return out
+
+def _entries(rules: dict, parts: List[str], suffix: str, exact: bool, anim: bool) -> Entries:
+    probe = suffix if exact else _PAD + suffix
+    forms = _interpret(rules, parts, probe, anim)
+    out = []
+    for part in parts:
+        cases = []
+        for case in range(1, 7):
+            form = forms[part][case]
+            keep = 0
+            while keep < min(len(form), len(probe)) and form[keep] == probe[keep]:
+                keep += 1
+            cut, add = len(probe) - keep, form[keep:]
+            if (not exact and cut > len(suffix)) or "\x00" in add:
+                raise AssertionError(f"rule for {part}/{case} reaches past suffix {suffix!r}")
+            cases.append((case, cut, add))
+        out.append((part, tuple(cases)))
+    return tuple(out)
+
+_FORM_FNS: Dict[str, Callable[[str], Dict[str, Dict[int, str]]]] = {}  # source -> function; many nodes share one
+
+def _codegen(entries: Entries) -> Callable[[str], Dict[str, Dict[int, str]]]:
+    cuts = sorted({cut for _part, cases in entries for _case, cut, _add in cases})
+    body = ", ".join(
+        f"{part!r}: {{" + ", ".join(f"{case}: h{cut} + {add!r}" for case, cut, add in cases) + "}"
+        for part, cases in entries
+    )
+    src = "\n".join(["def form(v):", "    n = len(v)",
+                     *(f"    h{cut} = v[:n - {cut}]" for cut in cuts),
+                     f"    return {{{body}}}"])
+    fn = _FORM_FNS.get(src)
+    if fn is None:
+        ns: dict = {}
+        exec(src, ns)
+        fn = _FORM_FNS[src] = ns["form"]
+    return fn
+
+def _compile(rules: dict, parts: List[str]) -> dict:
+    """Trie over reversed suffixes; node = {char: child, ..., None: (exact, extended) form functions by animacy}."""
+    root: dict = {}
+    for sfx in sorted(_rule_suffixes(rules, parts)):
+        node = root
+        for ch in reversed(sfx):
+            node = node.setdefault(ch, {})
+        node[None] = sfx
+
+    def fill(node: dict, sfx: str) -> None:
+        for ch, child in list(node.items()):
+            if ch is not None:
+                fill(child, ch + sfx)
+        if None in node or sfx == "":
+            node[None] = tuple(
+                {anim: _codegen(_entries(rules, parts, sfx, exact, anim)) for anim in (False, True)}
+                for exact in (True, False)
+            )
+    fill(root, "")
+    return root
+
+def _lookup(trie: dict, voc: str, anim: bool) -> Callable[[str], Dict[str, Dict[int, str]]]:
+    """Longest suffix match, then the exact/extended form function for it."""
+    node, best, depth, best_depth = trie, trie[None], 0, 0
+    for ch in reversed(voc):
+        node = node.get(ch)
+        if node is None:
+            break
+        depth += 1
+        if None in node:
+            best, best_depth = node[None], depth
+    return best[0 if best_depth == len(voc) else 1][anim]
+
+_NOUN_PARTS = ["sg", "pl"]
+_ADJ_PARTS = ["sg_m", "sg_f", "sg_n", "pl_mo", "pl_nmo"]
+_TRIES: Dict[str, dict] = {}
+
+def _tables(kind: str) -> Tuple[dict, List[str]]:
+    return (ADJ_RULES, _ADJ_PARTS) if kind == "adj" else (NOUN_RULES[kind], _NOUN_PARTS)
+
+def _trie(kind: str) -> dict:
+    """Compiled on first use (a few hundred ms for all tables), then shared."""
+    trie = _TRIES.get(kind)
+    if trie is None:
+        trie = _TRIES[kind] = _compile(*_tables(kind))
+    return trie
+
+# =========================
+#  Public view of the compiled tables (core/morph.py, scripts/bench_grammar.py)
+# =========================
+KINDS = ("m", "f", "n", "adj")   # noun genders, then adjectives
+
+def iter_rule_entries(kind: str) -> Iterator[Tuple[str, bool, bool, Entries]]:
+    """
+    (suffix, whole, animate, entries) for every node of a kind's table: how a
+    lemma ending in `suffix` (whole: the lemma is exactly `suffix`) inflects,
+    as ((part, ((case, cut, add), ...)), ...) with form = lemma[:-cut] + add.
+    The "" suffix is the fallback for lemmas no rule suffix matches.
+    """
+    rules, ps = _tables(kind)
+    for sfx in sorted(_rule_suffixes(rules, ps) | {""}):
+        for whole in (True, False):
+            if whole and not sfx:
+                continue
+            for anim in (False, True):
+                yield sfx, whole, anim, _entries(rules, ps, sfx, whole, anim)
+
+def compile_tables() -> None:
+    """Compile every table now (e.g. at worker start) instead of on first use."""
+    for kind in KINDS:
+        _trie(kind)
+
+def reset_cache() -> None:
+    """Drop the compiled tables and generated functions; the next use recompiles them."""
+    _TRIES.clear()
+    _FORM_FNS.clear()
+
+def rule_suffix_len(kind: str, lemma: str) -> int:
+    """Length of the longest rule suffix `lemma` is inflected from (0: the fallback)."""
+    node, depth, best = _trie(kind), 0, 0
+    for ch in reversed(lemma):
+        node = node.get(ch)
+        if node is None:
+            break
+        depth += 1
+        if None in node:
+            best = depth
+    return best
+
+# =========================
+#  Nouns
+# =========================
+
+def grammar_noun(voc: str, gender: Optional[str] = None, animate: Optional[bool] = None) -> Dict[str, Dict[int, str]]:
     """
-    Build M.PERS plural NOM; fall back to +i/+y when no rule applies.
+    Returns:
+      {
+        "sg": {1: ..., 2: ..., 3: ..., 4: ..., 5: ..., 6: ...},
+        "pl": {1: ..., 2: ..., 3: ..., 4: ..., 5: ..., 6: ...}
+      }
+    Heuristics; irregulars are not fully covered by design.
     """
-    if len(stem) >= 2 and stem[-2:] in _MP_NOM_MAP_TWO:
-        return stem[:-2] + _MP_NOM_MAP_TWO[stem[-2:]]
-    if stem and stem[-1] in _MP_NOM_MAP_ONE:
-        return stem[:-1] + _MP_NOM_MAP_ONE[stem[-1]]
-    return stem + ("i" if soft_ie else "y")
+    voc = (voc or "").strip()
+    g = (gender or guess_gender(voc)).lower()
+    is_anim = bool(animate) if animate is not None else False
+    trie = _trie(g if g in NOUN_RULES else "m")
+    return _lookup(trie, voc, is_anim)(voc)
+
+# =========================
+#  Adjectives (masculine lemma only)
+# =========================
 
 def grammar_adj(voc: str, animate: Optional[bool] = None) -> Dict[str, Dict[int, str]]:
     """
@@ -342,62 +405,5 @@ def grammar_adj(voc: str, animate: Optional[bool] = None) -> Dict[str, Dict[int,
     Heuristics; irregulars are not fully covered by design.
     """
     voc = (voc or "").strip()
-    stem = _adj_stem(voc)
-    soft_imym = _adj_soft_for_im_ym(stem, voc)
-    soft_ie = _adj_ie_needed(stem, voc)
     is_anim = bool(animate) if animate is not None else False
-
-    sg_m: Dict[int, str] = {}
-    sg_f: Dict[int, str] = {}
-    sg_n: Dict[int, str] = {}
-    pl_mo: Dict[int, str] = {}
-    pl_nmo: Dict[int, str] = {}
-
-    # Singular (masculine)
-    gen_suf, dat_suf = _adj_gen_dat_endings(stem, voc)
-    sg_m[1] = voc                                 # NOM
-    sg_m[2] = stem + gen_suf                      # GEN
-    sg_m[3] = stem + dat_suf                      # DAT
-    sg_m[4] = sg_m[2] if is_anim else sg_m[1]     # ACC
-    sg_m[5] = stem + ("im" if soft_imym else "ym")# INS
-    sg_m[6] = stem + ("im" if soft_imym else "ym")# LOC
-
-    # Singular (feminine)
-    sg_f[1] = stem + "a"                          # NOM
-    sg_f[2] = stem + "ej"                         # GEN
-    sg_f[3] = stem + "ej"                         # DAT
-    sg_f[4] = stem + "ą"                          # ACC
-    sg_f[5] = stem + "ą"                          # INS
-    sg_f[6] = stem + "ej"                         # LOC
-
-    # Singular (neuter)
-    sg_n[1] = stem + ("ie" if soft_ie else "e")   # NOM
-    sg_n[2] = stem + gen_suf                      # GEN
-    sg_n[3] = stem + dat_suf                      # DAT
-    sg_n[4] = sg_n[1]                             # ACC
-    sg_n[5] = stem + ("im" if soft_imym else "ym")# INS
-    sg_n[6] = stem + ("im" if soft_imym else "ym")# LOC
-
-    # Plural (męskoosobowy)
-    pl_mo[1] = _adj_mp_nom(stem, soft_ie)         # NOM
-    pl_mo[2] = stem + ("ich" if soft_ie else "ych")# GEN
-    pl_mo[3] = stem + ("im" if soft_imym else "ym")# DAT
-    pl_mo[4] = pl_mo[2]                           # ACC = GEN
-    pl_mo[5] = stem + ("imi" if soft_imym else "ymi")# INS
-    pl_mo[6] = pl_mo[2]                           # LOC = GEN
-
-    # Plural (non-męskoosobowy)
-    pl_nmo[1] = stem + ("ie" if soft_ie else "e") # NOM
-    pl_nmo[2] = stem + ("ich" if soft_ie else "ych")# GEN
-    pl_nmo[3] = stem + ("im" if soft_imym else "ym")# DAT
-    pl_nmo[4] = pl_nmo[1]                         # ACC = NOM
-    pl_nmo[5] = stem + ("imi" if soft_imym else "ymi")# INS
-    pl_nmo[6] = pl_nmo[2]                         # LOC = GEN
-
-    return {
-        "sg_m": sg_m,
-        "sg_f": sg_f,
-        "sg_n": sg_n,
-        "pl_mo": pl_mo,
-        "pl_nmo": pl_nmo,
-    }
+    return _lookup(_trie("adj"), voc, is_anim)(voc)
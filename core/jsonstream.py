@@ -0,0 +1,108 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import IO, Any, Iterator
+import json
+
+# -------- tuning --------
+CHUNK_CHARS = 1 << 16   # text read per refill; one element may span several
+
+NDJSON_SUFFIXES = (".ndjson", ".jsonl")
+_WS = " \t\r\n"
+_DELIMS = _WS + ",]"
+
+# =========================
+# Readers (stdlib only; memory is bounded by the largest element, not the file)
+# =========================
+def iter_array(fp: IO[str], chunk: int = CHUNK_CHARS) -> Iterator[Any]:
+    """Yield the elements of a top-level JSON array one at a time."""
+    dec = json.JSONDecoder()
+    buf, pos, eof = "", 0, False
+
+    def fill() -> bool:
+        nonlocal buf, pos, eof
+        if eof:
+            return False
+        data = fp.read(chunk)
+        if not data:
+            eof = True
+            return False
+        buf, pos = buf[pos:] + data, 0   # drop what was consumed
+        return True
+
+    def skip_ws() -> str:
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in _WS:
+                pos += 1
+            if pos < len(buf):
+                return buf[pos]
+            if not fill():
+                return ""
+
+    if skip_ws() != "[":
+        raise ValueError("JSON root must be a list")
+    pos += 1
+    def close() -> None:
+        nonlocal pos
+        pos += 1
+        if skip_ws():
+            raise ValueError("extra data after JSON array")
+
+    if skip_ws() == "]":
+        close()
+        return
+    while True:
+        while True:
+            try:
+                obj, end = dec.raw_decode(buf, pos)
+            except json.JSONDecodeError as e:
+                if fill():
+                    continue       # element cut off by the chunk boundary
+                raise ValueError(f"bad JSON array element: {e.msg}") from None
+            if (end == len(buf) or buf[end] not in _DELIMS) and fill():
+                continue           # a number cut by the chunk boundary ("2." + "5") decodes short
+            break
+        pos = end
+        yield obj
+        sep = skip_ws()
+        if sep == "]":
+            close()
+            return
+        if sep != ",":
+            raise ValueError(f"expected ',' or ']' in JSON array, got {sep or 'end of input'!r}")
+        pos += 1
+        skip_ws()
+
+def iter_ndjson(fp: IO[str]) -> Iterator[Any]:
+    """One JSON value per line; blank lines are skipped."""
+    for n, line in enumerate(fp, 1):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"line {n}: {e.msg}") from None
+
+def detect_format(path: Path, fp: IO[str]) -> str:
+    """'ndjson' for .ndjson/.jsonl files or input starting with '{', else 'array'."""
+    if path.suffix.lower() in NDJSON_SUFFIXES:
+        return "ndjson"
+    head = fp.read(1)
+    while head and head in _WS:
+        head = fp.read(1)
+    fp.seek(0)
+    return "ndjson" if head == "{" else "array"
+
+def iter_items(path: Path, fmt: str = "auto", encoding: str = "utf-8") -> Iterator[Any]:
+    """
+    Stream the records of a words file: a JSON array (words.json) or NDJSON
+    (one object per line). fmt is "auto", "array" or "ndjson".
+    """
+    with Path(path).open("r", encoding=encoding) as fp:
+        if fmt == "auto":
+            fmt = detect_format(Path(path), fp)
+        if fmt == "ndjson":
+            yield from iter_ndjson(fp)
+        elif fmt == "array":
+            yield from iter_array(fp)
+        else:
+            raise ValueError(f"unknown format: {fmt}")
@@ -0,0 +1,164 @@
+from __future__ import annotations
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from . import grammar
+from .grammar import CASES
+
+# =========================
+#  Inverse rules
+# =========================
+# core.grammar inflects a lemma L = X + S, S the longest rule suffix it ends
+# with, as L[:len(L) - cut] + add. So every (S, cut, add) entry reads backwards
+# as: a form ending with E = S[:len(S) - cut] + add may come from the lemma
+# form[:-len(E)] + S. Those endings go into a reversed-suffix trie; analyzing
+# a form walks it once (collecting the rules on every node passed) and keeps
+# the candidates that the forward generator maps back onto the form, so the
+# result is exactly the set of paradigms that contain it.
+
+# Adjective parts -> (number, gender); "mo"/"nmo" are the plural
+# (non-)masculine-personal genders.
+ADJ_PARTS = {"sg_m": ("sg", "m"), "sg_f": ("sg", "f"), "sg_n": ("sg", "n"),
+             "pl_mo": ("pl", "mo"), "pl_nmo": ("pl", "nmo")}
+ADJ_LEMMA_ENDINGS = ("y", "i")   # grammar_adj takes the masculine lemma
+
+class Analysis(NamedTuple):
+    form: str
+    lemma: str
+    pos: str                 # "n" | "adj" (words.class)
+    gender: str              # nouns: m/f/n; adjectives: m/f/n (sg), mo/nmo (pl)
+    case: str                # one of CASES
+    number: str              # "sg" | "pl"
+    animate: Optional[bool]  # None when the form is the same either way
+    known: bool = False      # lemma is in words with this class
+
+# (suffix S, whole, pos, gender, part, case, animate): whole means the lemma is
+# exactly S (grammar's "exact" trie variant), not X + S
+InverseRule = Tuple[str, bool, str, str, str, int, Optional[bool]]
+# Trie nodes group them by what the lemma check needs:
+# (S, whole, pos, gender) -> ((part, case, animate), ...)
+RuleGroup = Tuple[str, bool, str, str, Tuple[Tuple[str, int, Optional[bool]], ...]]
+
+def _inverse_rules(kind: str) -> Dict[str, List[InverseRule]]:
+    """ending E -> rules producing it, for one compiled table (nouns of one gender, or adjectives)."""
+    pos, gender = ("adj", "") if kind == "adj" else ("n", kind)
+    seen: Dict[Tuple[str, bool, str, str, int], set] = {}
+    for sfx, whole, anim, entries in grammar.iter_rule_entries(kind):
+        for part, cases in entries:
+            for case, cut, add in cases:
+                ending = sfx[:len(sfx) - cut] + add
+                seen.setdefault((sfx, whole, ending, part, case), set()).add(anim)
+    out: Dict[str, List[InverseRule]] = {}
+    for (sfx, whole, ending, part, case), anims in seen.items():
+        anim = None if len(anims) == 2 else next(iter(anims))
+        out.setdefault(ending, []).append((sfx, whole, pos, gender, part, case, anim))
+    return out
+
+_INV: Optional[dict] = None   # reversed-ending trie: {char: child, ..., None: (RuleGroup, ...)}
+
+def _inverse_trie() -> dict:
+    """Built on first use from all noun genders and the adjective table, then shared."""
+    global _INV
+    if _INV is None:
+        root: dict = {}
+        for kind in grammar.KINDS:
+            for ending, inv in _inverse_rules(kind).items():
+                node = root
+                for ch in reversed(ending):
+                    node = node.setdefault(ch, {})
+                node.setdefault(None, []).extend(inv)
+        _group(root)
+        _INV = root
+    return _INV
+
+def _group(node: dict) -> None:
+    for ch, child in node.items():
+        if ch is not None:
+            _group(child)
+    if None in node:
+        groups: Dict[tuple, list] = {}
+        for sfx, whole, pos, gender, part, case, anim in node[None]:
+            groups.setdefault((sfx, whole, pos, gender), []).append((part, case, anim))
+        node[None] = tuple(key + (tuple(tags),) for key, tags in groups.items())
+
+# =========================
+#  Analysis
+# =========================
+def candidates(form: str) -> List[Analysis]:
+    """
+    Every (lemma, gender, case, number) whose generated paradigm contains
+    `form`, unranked and without the words lookup. One walk over the form's
+    characters plus a forward check per candidate rule.
+    """
+    form = (form or "").strip().lower()
+    if not form:
+        return []
+    node, depth, hits = _inverse_trie(), 0, []
+    matched: Dict[Tuple[str, str], int] = {}
+    while True:
+        for sfx, whole, pos, gender, tags in node.get(None, ()):
+            lemma = form[:len(form) - depth] + sfx
+            if (lemma == sfx) if not whole else (lemma != sfx):
+                continue   # X + S needs a non-empty X; a whole-lemma rule needs exactly S
+            if pos == "adj" and not lemma.endswith(ADJ_LEMMA_ENDINGS):
+                continue
+            kind = gender or pos
+            n = matched.get((kind, lemma))
+            if n is None:
+                n = matched[(kind, lemma)] = grammar.rule_suffix_len(kind, lemma)
+            if n == len(sfx):
+                hits.extend((lemma, pos, gender, part, case, anim) for part, case, anim in tags)
+        if depth == len(form):
+            break
+        node = node.get(form[len(form) - 1 - depth])
+        if node is None:
+            break
+        depth += 1
+
+    out: Dict[tuple, Analysis] = {}
+    for lemma, pos, gender, part, case, anim in hits:
+        number, g = ADJ_PARTS[part] if pos == "adj" else (part, gender)
+        key = (lemma, pos, g, case, number)
+        prev = out.get(key)
+        if prev is not None and prev.animate != anim:
+            anim = None   # reached for both animacies through different rules
+        out[key] = Analysis(form, lemma, pos, g, CASES[case - 1], number, anim)
+    return list(out.values())
+
+def _rank_key(a: Analysis) -> tuple:
+    # Known lemma first; then noun genders the lemma's ending suggests; then
+    # the fewest characters changed between lemma and form.
+    plausible = a.pos == "adj" or grammar.guess_gender(a.lemma) == a.gender
+    keep = 0
+    while keep < min(len(a.lemma), len(a.form)) and a.lemma[keep] == a.form[keep]:
+        keep += 1
+    return (not a.known, not plausible, len(a.lemma) + len(a.form) - 2 * keep, a.lemma, a.pos, a.number)
+
+def known_lemmas(conn, lemmas: Iterable[str]) -> Dict[str, str]:
+    """voc -> class for the lemmas present in words (one indexed IN lookup)."""
+    lemmas = sorted(set(lemmas))
+    if not lemmas:
+        return {}
+    rows = conn.execute(
+        f"SELECT voc, class FROM words WHERE voc IN ({','.join('?' * len(lemmas))})", lemmas
+    ).fetchall()
+    return {r["voc"]: (r["class"] or "").strip().lower() for r in rows}
+
+def analyze(form: str, conn=None) -> List[Analysis]:
+    """
+    Candidate analyses of an inflected form, best first. With a connection,
+    candidates whose lemma is in words (with the matching class) are marked
+    known and ranked ahead of the rest.
+    """
+    found = candidates(form)
+    if conn is not None and found:
+        classes = known_lemmas(conn, (a.lemma for a in found))
+        found = [a._replace(known=(classes.get(a.lemma) == a.pos)) for a in found]
+    return sorted(found, key=_rank_key)
+
+def lemmatize(conn, form: str) -> List[str]:
+    """Lemmas in words that `form` can be an inflection of, best first (the form itself if it is a lemma)."""
+    out: List[str] = []
+    for a in analyze(form, conn):
+        if a.known and a.lemma not in out:
+            out.append(a.lemma)
+    return out
@@ -0,0 +1,115 @@
+from __future__ import annotations
+from functools import lru_cache
+from typing import Optional, Set, Tuple
+import json
+import os
+import queue
+import threading
+
+from .db import get_conn
+from .grammar import CASES, grammar_adj, grammar_noun
+
+# -------- tuning --------
+CACHE_SIZE = int(os.getenv("PLT_PARADIGM_CACHE", "4096"))         # generated paradigms kept per worker
+PERSIST = os.getenv("PLT_PERSIST_PARADIGMS", "0") == "1"          # write generated tables back to NULL rows
+PERSIST_QUEUE_MAX = 1000
+
+ADJ_GROUPS = ("sg_m", "sg_f", "sg_n", "pl_mo", "pl_nmo")
+
+# =========================
+# Stored forms
+# =========================
+def parse_forms(text) -> Optional[dict]:
+    """words.forms / adj_forms column -> dict (tolerates double-encoded JSON)."""
+    if not text:
+        return None
+    try:
+        val = json.loads(text) if isinstance(text, str) else text
+        if isinstance(val, str):
+            val = json.loads(val)
+    except Exception:
+        return None
+    return val if isinstance(val, dict) else None
+
+# =========================
+# Generated forms (same shape as regenerate_words_json writes)
+# =========================
+def _named(src: dict) -> dict:
+    return {CASES[i - 1]: (src.get(i) or "") for i in range(1, 7)}
+
+@lru_cache(maxsize=CACHE_SIZE)
+def generated(voc: str, cls: str, gender: Optional[str] = None, animate: Optional[bool] = None) -> Optional[dict]:
+    """
+    Rule-generated table for a noun ({"sg": {NOM..LOC}, "pl": {...}}) or an
+    adjective ({"sg_m": {...}, ..., "pl_nmo": {...}}); None for other classes.
+    Memoized per (voc, class, gender, animacy); callers must not mutate the result.
+    """
+    if cls == "n":
+        g = grammar_noun(voc, gender, animate)
+        return {"sg": _named(g["sg"]), "pl": _named(g["pl"])}
+    if cls == "adj":
+        g = grammar_adj(voc, animate)
+        return {key: _named(g[key]) for key in ADJ_GROUPS}
+    return None
+
+def word_forms(row, gender: Optional[str] = None,
+               animate: Optional[bool] = None) -> Tuple[Optional[dict], Optional[dict], Set[str]]:
+    """
+    (forms, adj_forms, generated_columns) for a words row. Stored tables win;
+    a missing one for a noun/adjective is generated (and, with
+    PLT_PERSIST_PARADIGMS=1, queued to be written back to the row).
+    """
+    cls = (row["class"] or "").strip().lower()
+    forms, adj_forms = parse_forms(row["forms"]), parse_forms(row["adj_forms"])
+    gen: Set[str] = set()
+    if cls == "n" and not forms:
+        forms = generated(row["voc"], cls, gender, animate)
+        gen.add("forms")
+    elif cls == "adj" and not adj_forms:
+        adj_forms = generated(row["voc"], cls, gender, animate)
+        gen.add("adj_forms")
+    if gen and PERSIST and gender is None and animate is None:
+        col = next(iter(gen))
+        persist_async(row["id"], col, forms if col == "forms" else adj_forms)
+    return forms, adj_forms, gen
+
+# =========================
+# Write-back (background thread, off the request path)
+# =========================
+_PERSIST_Q: "queue.Queue[tuple]" = queue.Queue(maxsize=PERSIST_QUEUE_MAX)
+_PERSIST_PENDING: Set[Tuple[int, str]] = set()
+_PERSIST_LOCK = threading.Lock()
+_PERSIST_THREAD: threading.Thread | None = None
+
+def _persist_worker() -> None:
+    while True:
+        word_id, col, text = _PERSIST_Q.get()
+        try:
+            with get_conn() as conn:
+                # Only fill a still-empty column; an import or admin edit may have set it meanwhile
+                conn.execute(f"UPDATE words SET {col}=? WHERE id=? AND ({col} IS NULL OR {col}='')",
+                             (text, word_id))
+        except Exception:
+            pass  # best effort; the table is regenerated on the next view anyway
+        finally:
+            with _PERSIST_LOCK:
+                _PERSIST_PENDING.discard((word_id, col))
+            _PERSIST_Q.task_done()
+
+def persist_async(word_id: int, col: str, forms: dict) -> bool:
+    """Queue a generated table for write-back; False if already queued or the queue is full."""
+    global _PERSIST_THREAD
+    if col not in ("forms", "adj_forms"):
+        raise ValueError(f"bad column: {col}")
+    with _PERSIST_LOCK:
+        if (word_id, col) in _PERSIST_PENDING:
+            return False
+        if _PERSIST_THREAD is None or not _PERSIST_THREAD.is_alive():
+            _PERSIST_THREAD = threading.Thread(target=_persist_worker, name="paradigm-persist", daemon=True)
+            _PERSIST_THREAD.start()
+        try:
+            _PERSIST_Q.put_nowait((word_id, col, json.dumps(forms, ensure_ascii=False)))
+        except queue.Full:
+            return False
+        _PERSIST_PENDING.add((word_id, col))
+    return True
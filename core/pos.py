@@ -1,17 +1,86 @@
 from __future__ import annotations
-from typing import Dict, Tuple
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Tuple
 import json
+import os
+import threading
+import time
 import numpy as np
 
-from .paths import REPO, DATA_DIR
+from .paths import REPO
+from . import feedback
 
 # -------- paths --------
 MODEL_PATH = REPO / "core" / "models" / "pos_model.npz"
 MODEL_META_PATH = MODEL_PATH.with_suffix(".meta.json")
 
+# How often (seconds) each worker stats the model files for changes; <= 0 disables polling.
+RELOAD_INTERVAL_S = float(os.getenv("PLT_POS_RELOAD_INTERVAL", "5"))
+
 # -------- caches --------
 _MODEL_CACHE: dict | None = None
 _MODEL_META: dict | None = None
+_MODEL_SIG: tuple | None = None     # file signature the cache was loaded from
+_NEXT_CHECK: float = 0.0            # monotonic deadline for the next stat()
+_RELOADING: bool = False
+_RELOAD_LOCK = threading.Lock()
+
+# =========================
+# Disk readers
+# =========================
+def _file_sig() -> tuple | None:
+    """
+    Cheap change detector: (mtime_ns, size) of the .npz plus the meta sidecar.
+    Returns None when no model file exists.
+    """
+    try:
+        st = MODEL_PATH.stat()
+    except FileNotFoundError:
+        return None
+    try:
+        ms = MODEL_META_PATH.stat()
+        meta_sig = (ms.st_mtime_ns, ms.st_size)
+    except FileNotFoundError:
+        meta_sig = None
+    return (st.st_mtime_ns, st.st_size, meta_sig)
+
+def _read_meta() -> dict:
+    if MODEL_META_PATH.exists():
+        try:
+            return json.loads(MODEL_META_PATH.read_text(encoding="utf-8"))
+        except Exception:
+            return {}
+    return {}
+
+def _read_model(path: Path = MODEL_PATH) -> dict:
+    """
+    Read a pos_model.npz into a plain dict; {} if the file is missing.
+    Expected keys:
+      - W: np.ndarray (C, F)  or (F, C)
+      - b: np.ndarray (C,) or scalar (optional)
+      - classes: array/list length C
+      - vocab: dict[str,int]  (saved via allow_pickle; may appear as 0-D object array)
+    """
+    if not path.exists():
+        return {}
+    with np.load(path, allow_pickle=True) as data:
+        cache = {k: data[k] for k in data.files}
+
+    # Unwrap vocab if saved as 0-D object ndarray
+    v = cache.get("vocab")
+    if isinstance(v, np.ndarray) and v.dtype == object and v.shape == ():
+        try:
+            cache["vocab"] = v.item()
+        except Exception:
+            cache["vocab"] = None
+    return cache
+
+def _swap(cache: dict, meta: dict, sig: tuple | None) -> None:
+    """Publish a freshly loaded model; readers see either the old or the new one."""
+    global _MODEL_CACHE, _MODEL_META, _MODEL_SIG
+    with _RELOAD_LOCK:
+        _MODEL_CACHE, _MODEL_META, _MODEL_SIG = cache, meta, sig
 
 # =========================
 # Meta helpers
@@ -20,13 +89,7 @@ def _load_meta() -> dict:
     global _MODEL_META
     if _MODEL_META is not None:
         return _MODEL_META
-    if MODEL_META_PATH.exists():
-        try:
-            _MODEL_META = json.loads(MODEL_META_PATH.read_text(encoding="utf-8"))
-        except Exception:
-            _MODEL_META = {}
-    else:
-        _MODEL_META = {}
+    _MODEL_META = _read_meta()
     return _MODEL_META
 
 def get_model_meta() -> dict:
@@ -39,34 +102,56 @@ def get_model_meta() -> dict:
 # =========================
 # Model loading
 # =========================
-def _lazy_load() -> dict:
+def _background_reload(sig: tuple | None) -> None:
+    global _RELOADING
+    try:
+        cache, meta = _read_model(), _read_meta()
+    except Exception:
+        # Unreadable file (e.g. a non-atomic writer mid-copy): keep serving the
+        # old model; the signature stays stale so the next poll retries.
+        cache = None
+    try:
+        if cache is not None:
+            _swap(cache, meta, sig)
+    finally:
+        _RELOADING = False
+
+def _maybe_reload() -> None:
     """
-    Load model once if pos_model.npz exists; else return {}.
-    Expected keys:
-      - W: np.ndarray (C, F)  or (F, C)
-      - b: np.ndarray (C,) or scalar (optional)
-      - classes: array/list length C
-      - vocab: dict[str,int]  (saved via allow_pickle; may appear as 0-D object array)
+    Stat the model files at most once per RELOAD_INTERVAL_S. On change, load the
+    new model in a daemon thread and swap it in; the caller keeps the old one.
     """
-    global _MODEL_CACHE
-    if _MODEL_CACHE is not None:
-        return _MODEL_CACHE
-    if MODEL_PATH.exists():
-        data = np.load(MODEL_PATH, allow_pickle=True)
-        cache = {k: data[k] for k in data.files}
-
-        # Unwrap vocab if saved as 0-D object ndarray
-        v = cache.get("vocab")
-        if isinstance(v, np.ndarray) and v.dtype == object and v.shape == ():
-            try:
-                cache["vocab"] = v.item()
-            except Exception:
-                cache["vocab"] = None
+    global _NEXT_CHECK, _RELOADING
+    if RELOAD_INTERVAL_S <= 0:
+        return
+    now = time.monotonic()
+    if now < _NEXT_CHECK:
+        return
+    with _RELOAD_LOCK:
+        if now < _NEXT_CHECK or _RELOADING:
+            return
+        _NEXT_CHECK = now + RELOAD_INTERVAL_S
+        sig = _file_sig()
+        if sig == _MODEL_SIG:
+            return
+        _RELOADING = True
+    threading.Thread(target=_background_reload, args=(sig,), name="pos-model-reload", daemon=True).start()
 
-        _MODEL_CACHE = cache
-        return _MODEL_CACHE
-    _MODEL_CACHE = {}
-    return _MODEL_CACHE
+def _lazy_load() -> dict:
+    """
+    Return the cached model dict ({} if no pos_model.npz). The first call loads
+    synchronously; later calls only poll for a retrained file (see _maybe_reload).
+    """
+    global _NEXT_CHECK
+    cache = _MODEL_CACHE
+    if cache is not None:
+        _maybe_reload()
+        return cache
+    sig = _file_sig()
+    cache, meta = _read_model(), _read_meta()
+    _swap(cache, meta, sig)
+    _NEXT_CHECK = time.monotonic() + RELOAD_INTERVAL_S
+    return cache
 
 # =========================
 # Math helpers
@@ -81,28 +166,51 @@ def _softmax(z: np.ndarray) -> np.ndarray:
 # =========================
 # Features
 # =========================
-def _featurize(voc: str, meaning: str, vocab: dict | None) -> np.ndarray:
+def _featurize(voc: str, meaning: str, vocab: dict | None) -> Tuple[np.ndarray, np.ndarray]:
     """
     Very small char-3gram bag. Requires vocab (dict of gram->index).
-    Returns a length-|vocab| vector. If vocab is missing, caller should NOT
-    attempt model inference (fallback to heuristic instead).
+    Returns the sparse vector as (indices, values), L2-normalized; only the few
+    dozen grams present in the input are materialized. If vocab is missing the
+    result is empty and the caller should fall back to the heuristic.
     """
     if not isinstance(vocab, dict) or not vocab:
-        return np.zeros(0, dtype=np.float32)
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
 
     s = f"{(voc or '').lower()} {(meaning or '').lower()}"
-    grams = [s[i:i + 3] for i in range(len(s) - 2)]
-    x = np.zeros(len(vocab), dtype=np.float32)
-    for g in grams:
-        idx = vocab.get(g)
+    counts: Dict[int, float] = {}
+    for i in range(len(s) - 2):
+        idx = vocab.get(s[i:i + 3])
         if idx is not None:
-            x[idx] += 1.0
+            counts[idx] = counts.get(idx, 0.0) + 1.0
+
+    idx = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+    x = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
 
     # L2 normalize to keep scales stable
     n = float(np.linalg.norm(x))
     if n > 0:
         x /= n
-    return x
+    return idx, x
+
+def _sparse_logits(W: np.ndarray, scale: np.ndarray | None, idx: np.ndarray, x: np.ndarray,
+                   C: int, F: int) -> np.ndarray | None:
+    """
+    logits = W @ x for a sparse x, touching only the columns in idx.
+    W may be float32, float16 or int8; int8 rows carry a per-class `scale`
+    (W_scale) that is applied to the C logits instead of to the matrix.
+    """
+    # Two standard layouts supported:
+    #  - scikit-learn coef_: (C, F)  -> logits = W[:, idx] @ x
+    #  - (F, C)               -> logits = x @ W[idx, :]
+    if W.shape == (C, F):
+        logits = W[:, idx].astype(np.float32) @ x
+    elif W.shape == (F, C):
+        logits = x @ W[idx, :].astype(np.float32)
+    else:
+        return None
+    if scale is not None:
+        logits = logits * np.asarray(scale, dtype=np.float32).reshape(-1)
+    return logits
 
 # =========================
 # Simple heuristic fallback
@@ -125,7 +233,10 @@ def predict(voc: str, meaning: str) -> Tuple[str, Dict[str, float]]:
     Return (label, probs_dict). Uses trained model if available, else heuristics.
     Robust to W being saved as (C,F) or (F,C). Requires vocab to run the model.
     """
-    m = _lazy_load()
+    return predict_with(_lazy_load(), voc, meaning)
+
+def predict_with(m: dict, voc: str, meaning: str) -> Tuple[str, Dict[str, float]]:
+    """predict() against an explicit model dict (e.g. a registry candidate)."""
     classes = m.get("classes")
     W = m.get("W")
     b = m.get("b")
@@ -140,43 +251,211 @@ def predict(voc: str, meaning: str) -> Tuple[str, Dict[str, float]]:
 
     # Use model path only if classes, W, and vocab are valid
     if classes is not None and isinstance(W, np.ndarray) and isinstance(vocab, dict) and len(vocab) > 0:
-        x = _featurize(voc, meaning, vocab)  # -> (F,)
-        if x.size == 0:
-            return _heuristic_pos(voc, meaning)
-
-        x = np.asarray(x, dtype=np.float32).reshape(-1)
-        W = np.asarray(W, dtype=np.float32)
+        idx, x = _featurize(voc, meaning, vocab)
         C = int(len(classes))
 
         if W.ndim != 2:
             return _heuristic_pos(voc, meaning)
 
-        # Two standard layouts supported:
-        #  - scikit-learn coef_: (C, F)  -> logits = W @ x
-        #  - (F, C)               -> logits = x @ W
-        if W.shape[0] == C and W.shape[1] == x.shape[0]:
-            logits = W @ x  # (C,)
-        elif W.shape[0] == x.shape[0] and W.shape[1] == C:
-            logits = x @ W  # (C,)
-        else:
+        logits = _sparse_logits(W, m.get("W_scale"), idx, x, C, len(vocab))
+        if logits is None:
             return _heuristic_pos(voc, meaning)
 
-        if b is not None:
-            b_arr = np.asarray(b, dtype=np.float32)
-            if b_arr.ndim == 0:
-                logits = logits + float(b_arr)
-            elif b_arr.ndim == 1 and b_arr.shape[0] == C:
-                logits = logits + b_arr
-
-        probs = _softmax(np.asarray(logits))
-        cls_list = [str(c) for c in (classes.tolist() if hasattr(classes, "tolist") else classes)]
-        out = {c: float(p) for c, p in zip(cls_list, probs)}
-        label = cls_list[int(np.argmax(probs))]
-        return label, out
+        return _finish(logits, b, classes)
 
     # No usable model → heuristic
     return _heuristic_pos(voc, meaning)
 
+def _finish(logits: np.ndarray, b, classes) -> Tuple[str, Dict[str, float]]:
+    """Add the bias, softmax, and map probabilities onto class names."""
+    C = int(len(classes))
+    if b is not None:
+        b_arr = np.asarray(b, dtype=np.float32)
+        if b_arr.ndim == 0:
+            logits = logits + float(b_arr)
+        elif b_arr.ndim == 1 and b_arr.shape[0] == C:
+            logits = logits + b_arr
+
+    probs = _softmax(np.asarray(logits))
+    cls_list = [str(c) for c in (classes.tolist() if hasattr(classes, "tolist") else classes)]
+    out = {c: float(p) for c, p in zip(cls_list, probs)}
+    label = cls_list[int(np.argmax(probs))]
+    return label, out
+
+def load_model_file(path: Path) -> dict:
+    """Load any pos_model.npz (e.g. a registry version) without touching the live cache."""
+    return _read_model(Path(path))
+
+def measure_latency(m: dict, pairs: List[Tuple[str, str]], repeat: int = 3) -> dict:
+    """Per-call predict_with() latency over (voc, meaning) pairs, in microseconds."""
+    ts: List[float] = []
+    for _ in range(max(1, repeat)):
+        for voc, meaning in pairs:
+            t0 = time.perf_counter()
+            predict_with(m, voc, meaning)
+            ts.append((time.perf_counter() - t0) * 1e6)
+    if not ts:
+        return {"p50_us": None, "p99_us": None, "n": 0}
+    a = np.asarray(ts)
+    return {"p50_us": round(float(np.percentile(a, 50)), 1),
+            "p99_us": round(float(np.percentile(a, 99)), 1), "n": int(a.size)}
+
+# =========================
+# Incremental classify-as-you-type
+# =========================
+LIVE_FIELDS = ("voc", "meaning")
+LIVE_TTL_S = 600          # idle sessions are dropped after this
+LIVE_MAX_SESSIONS = 512   # per worker; least recently used evicted first
+
+class _LiveState:
+    """
+    Per-session featurizer state: raw field text, the lowercased string the
+    model sees, in-vocab gram counts, and the running unnormalized W @ counts.
+    """
+    __slots__ = ("model", "fields", "text", "counts", "acc", "sq", "rev", "touched")
+
+    def __init__(self) -> None:
+        self.model: dict | None = None
+        self.fields: Dict[str, str] = {f: "" for f in LIVE_FIELDS}
+        self.text = ""
+        self.counts: Dict[int, int] = {}
+        self.acc: np.ndarray | None = None
+        self.sq = 0
+        self.rev = 0
+        self.touched = 0.0
+
+_LIVE: "OrderedDict[str, _LiveState]" = OrderedDict()
+_LIVE_LOCK = threading.Lock()
+
+def _live_text(fields: Dict[str, str]) -> str:
+    # Must match _featurize exactly.
+    return f"{(fields['voc'] or '').lower()} {(fields['meaning'] or '').lower()}"
+
+def _live_apply(st: _LiveState, m: dict, vocab: dict, new_text: str) -> None:
+    """
+    Update counts/acc for only the grams that overlap the changed span:
+    common prefix/suffix bound the edit, and a 3-gram is affected iff it
+    starts within two chars before the span.
+    """
+    old = st.text
+    n_old, n_new = len(old), len(new_text)
+    p = 0
+    lim = min(n_old, n_new)
+    while p < lim and old[p] == new_text[p]:
+        p += 1
+    q = 0
+    while q < lim - p and old[n_old - 1 - q] == new_text[n_new - 1 - q]:
+        q += 1
+    lo = max(0, p - 2)
+
+    delta: Dict[int, int] = {}
+    for i in range(lo, min(n_old - 2, n_old - q)):
+        j = vocab.get(old[i:i + 3])
+        if j is not None:
+            delta[j] = delta.get(j, 0) - 1
+    for i in range(lo, min(n_new - 2, n_new - q)):
+        j = vocab.get(new_text[i:i + 3])
+        if j is not None:
+            delta[j] = delta.get(j, 0) + 1
+    st.text = new_text
+
+    changed = {j: d for j, d in delta.items() if d}
+    if not changed:
+        return
+    for j, d in changed.items():
+        c = st.counts.get(j, 0)
+        nc = c + d
+        st.sq += nc * nc - c * c
+        if nc:
+            st.counts[j] = nc
+        else:
+            st.counts.pop(j, None)
+
+    C, F = int(len(m["classes"])), len(vocab)
+    if not st.counts:
+        st.acc = np.zeros(C, dtype=np.float32)
+        return
+    idx = np.fromiter(changed.keys(), dtype=np.int64, count=len(changed))
+    d = np.fromiter(changed.values(), dtype=np.float32, count=len(changed))
+    st.acc = st.acc + _sparse_logits(m["W"], None, idx, d, C, F)
+
+def _live_rebuild(st: _LiveState, m: dict, vocab: dict) -> None:
+    st.model = m
+    st.text, st.counts, st.sq = "", {}, 0
+    st.acc = np.zeros(int(len(m["classes"])), dtype=np.float32)
+    _live_apply(st, m, vocab, _live_text(st.fields))
+
+def _live_usable(m: dict) -> dict | None:
+    W, classes, vocab = m.get("W"), m.get("classes"), m.get("vocab")
+    if classes is None or not isinstance(W, np.ndarray) or W.ndim != 2:
+        return None
+    if not isinstance(vocab, dict) or not vocab:
+        return None
+    if W.shape not in ((len(classes), len(vocab)), (len(vocab), len(classes))):
+        return None
+    return vocab
+
+def live_classify(key: str, rev: int | None = None, edits: List[dict] | None = None,
+                  fields: Dict[str, str] | None = None) -> dict:
+    """
+    Session-scoped incremental predict for as-you-type suggestions.
+      - fields={"voc":..., "meaning":...} (re)starts the session at rev 1.
+      - edits=[{"field": "voc", "start": i, "end": j, "text": "..."}] splices
+        each field like JS `s.slice(0, i) + text + s.slice(j)`; `rev` must be
+        the revision the client last saw, otherwise {"resync": True} is returned
+        and the client should resend full fields (e.g. it hit another worker).
+    Returns {"rev", "label", "prob", "probs"}. Logits are W @ counts / ||counts|| + b,
+    with W @ counts maintained incrementally, so an edit costs O(changed grams).
+    """
+    now = time.monotonic()
+    m = _lazy_load()
+    vocab = _live_usable(m)
+    with _LIVE_LOCK:
+        while _LIVE:
+            k, old = next(iter(_LIVE.items()))
+            if len(_LIVE) <= LIVE_MAX_SESSIONS and now - old.touched <= LIVE_TTL_S:
+                break
+            del _LIVE[k]
+
+        st = _LIVE.get(key)
+        if fields is not None:
+            st = _LiveState()
+            st.fields = {f: str(fields.get(f) or "") for f in LIVE_FIELDS}
+            _LIVE[key] = st
+        elif st is None or rev != st.rev:
+            return {"resync": True}
+        else:
+            # All or nothing: a bad edit leaves the session text (and rev) untouched
+            new_fields = dict(st.fields)
+            for e in edits or []:
+                if not isinstance(e, dict):
+                    raise TypeError("each edit must be an object")
+                f = e.get("field")
+                if f not in LIVE_FIELDS:
+                    raise ValueError(f"unknown field {f!r}")
+                cur = new_fields[f]
+                start = max(0, min(int(e.get("start", 0)), len(cur)))
+                end = max(start, min(int(e.get("end", start)), len(cur)))
+                new_fields[f] = cur[:start] + str(e.get("text") or "") + cur[end:]
+            st.fields = new_fields
+        _LIVE.move_to_end(key)
+        st.touched = now
+        st.rev += 1
+
+        if vocab is None:
+            label, probs = _heuristic_pos(st.fields["voc"], st.fields["meaning"])
+        else:
+            if st.model is not m:  # first call, or the model was hot-reloaded
+                _live_rebuild(st, m, vocab)
+            else:
+                _live_apply(st, m, vocab, _live_text(st.fields))
+            logits = st.acc / np.float32(np.sqrt(st.sq)) if st.sq > 0 else st.acc
+            scale = m.get("W_scale")
+            if scale is not None:
+                logits = logits * np.asarray(scale, dtype=np.float32).reshape(-1)
+            label, probs = _finish(logits, m.get("b"), m["classes"])
+        return {"rev": st.rev, "label": label, "prob": float(probs.get(label, 0.0)), "probs": probs}
+
 # =========================
 # Diagnostics (for UI)
 # =========================
@@ -202,6 +481,7 @@ def model_status() -> dict:
         "has_vocab": isinstance(vocab, dict),
         "vocab_size": (len(vocab) if isinstance(vocab, dict) else None),
         "W_shape": (tuple(W.shape) if isinstance(W, np.ndarray) else None),
+        "W_dtype": (str(W.dtype) if isinstance(W, np.ndarray) else None),
         "num_classes": (int(len(classes)) if classes is not None else None),
         "model_path": str(MODEL_PATH),
         "model_version": side.get("model_version"),
@@ -213,8 +493,9 @@ def model_status() -> dict:
 # =========================
 def online_update(voc: str, label: str, meaning: str, corrected: bool = False, **meta) -> None:
     """
-    Append lightweight feedback for future retraining. Doesn’t mutate the model live.
-    File: /data/pos_feedback.jsonl (one JSON object per line).
+    Queue lightweight feedback for future retraining. Doesn’t mutate the model live.
+    File: /data/pos_feedback.jsonl (one JSON object per line), written in batches
+    by core.feedback's background writer, so this never blocks on file I/O.
     Accepts extra metadata via **meta (e.g., prob, source, confirmed, ts).
     """
     rec = {
@@ -224,17 +505,13 @@ def online_update(voc: str, label: str, meaning: str, corrected: bool = False, *
         "corrected": bool(corrected),
         **meta,
     }
-    p = DATA_DIR / "pos_feedback.jsonl"
-    p.parent.mkdir(parents=True, exist_ok=True)
-    with p.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    feedback.record(rec)
 
 # =========================
 # Reload model after retraining
 # =========================
 def reload_model() -> dict:
-    """Drop caches and reload model+meta; returns model_status()."""
-    global _MODEL_CACHE, _MODEL_META
-    _MODEL_CACHE = None
-    _MODEL_META = None
+    """Synchronously reload model+meta from disk; returns model_status()."""
+    sig = _file_sig()
+    _swap(_read_model(), _read_meta(), sig)
     return model_status()
@@ -0,0 +1,346 @@
+from __future__ import annotations
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+import fcntl
+import hashlib
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+
+from .paths import REPO, DATA_DIR
+from . import pos
+
+# -------- paths --------
+REGISTRY_DIR = Path(os.getenv("PLT_MODEL_REGISTRY", str(REPO / "core" / "models" / "registry")))
+MANIFEST_PATH = REGISTRY_DIR / "manifest.json"
+SHADOW_LOG = DATA_DIR / "pos_shadow.jsonl"
+
+MODEL_FILE = "pos_model.npz"
+META_FILE = "pos_model.meta.json"
+HISTORY_LIMIT = 20        # promotions remembered for rollback
+KEEP_UNUSED = int(os.getenv("PLT_REGISTRY_KEEP_UNUSED", "5"))  # newest versions kept that are not active/shadow/history
+SHADOW_QUEUE_MAX = 1000   # pending shadow scorings; extra requests are dropped
+
+# =========================
+# Files
+# =========================
+def atomic_write(path: Path, write) -> None:
+    """
+    Write via a temp file in the same directory, fsync, then rename into place,
+    so a worker polling for a new model never opens a half-written file.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with tmp.open("wb") as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+def _atomic_copy(src: Path, dst: Path) -> None:
+    with src.open("rb") as f:
+        atomic_write(dst, lambda out: shutil.copyfileobj(f, out))
+
+def _utc() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def file_sha1(path: Path) -> str:
+    h = hashlib.sha1()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+# =========================
+# Manifest
+# =========================
+def load_manifest() -> dict:
+    """
+    {"active": version|None, "shadow": version|None, "history": [older actives],
+     "models": {version: {model_hash, data_hash, accuracy, latency_p50_us, ...}}}
+    """
+    m: dict = {}
+    if MANIFEST_PATH.exists():
+        try:
+            m = json.loads(MANIFEST_PATH.read_text(encoding="utf-8"))
+        except Exception:
+            m = {}
+    m.setdefault("active", None)
+    m.setdefault("shadow", None)
+    m.setdefault("history", [])
+    m.setdefault("models", {})
+    return m
+
+# Every load_manifest → _save_manifest update runs under this flock, so a
+# queue-driven retrain and an admin promote/rollback can't lose each other's
+# change. Re-entrant within a process (promote may register the live model).
+_MANIFEST_RLOCK = threading.RLock()
+_MANIFEST_DEPTH = 0
+
+@contextmanager
+def _manifest_lock() -> Iterator[None]:
+    global _MANIFEST_DEPTH
+    with _MANIFEST_RLOCK:
+        if _MANIFEST_DEPTH == 0:
+            REGISTRY_DIR.mkdir(parents=True, exist_ok=True)
+            lock = (REGISTRY_DIR / ".manifest.lock").open("a")
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        _MANIFEST_DEPTH += 1
+        try:
+            yield
+        finally:
+            _MANIFEST_DEPTH -= 1
+            if _MANIFEST_DEPTH == 0:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+                lock.close()
+
+def _save_manifest(m: dict) -> None:
+    data = json.dumps(m, ensure_ascii=False, indent=2).encode("utf-8")
+    atomic_write(MANIFEST_PATH, lambda f: f.write(data))
+
+def version_dir(version: str) -> Path:
+    return REGISTRY_DIR / version
+
+def _require(m: dict, version: str) -> dict:
+    entry = m["models"].get(version)
+    if entry is None or not (version_dir(version) / MODEL_FILE).exists():
+        raise KeyError(f"unknown model version: {version}")
+    return entry
+
+# =========================
+# Register / promote / rollback
+# =========================
+def register(model_path: Path, meta_path: Path, stats: Optional[dict] = None) -> str:
+    """
+    Copy a trained model + meta into REGISTRY_DIR/<version>/ and record it in
+    the manifest. Does not change the active model; prunes unused versions.
+    """
+    meta = json.loads(Path(meta_path).read_text(encoding="utf-8")) if Path(meta_path).exists() else {}
+    model_hash = meta.get("model_hash") or file_sha1(Path(model_path))
+    version = f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}-{model_hash[:8]}"
+
+    d = version_dir(version)
+    with _manifest_lock():   # copy under the lock too, so a concurrent prune can't take the new dir
+        d.mkdir(parents=True, exist_ok=True)
+        _atomic_copy(Path(model_path), d / MODEL_FILE)
+        if Path(meta_path).exists():
+            _atomic_copy(Path(meta_path), d / META_FILE)
+        m = load_manifest()
+        m["models"][version] = {
+            "created_at": _utc(),
+            "model_version": meta.get("model_version"),
+            "model_hash": model_hash,
+            "weights_dtype": meta.get("weights_dtype", "float32"),
+            "size_bytes": (d / MODEL_FILE).stat().st_size,
+            **(stats or {}),
+        }
+        _prune(m, keep=version)
+        _save_manifest(m)
+    return version
+
+def _prune(m: dict, keep: Optional[str] = None, keep_unused: int = KEEP_UNUSED) -> List[str]:
+    """
+    Drop versions that are not active, shadow or in the rollback history,
+    beyond the `keep_unused` newest (fresh candidates waiting for review).
+    Removes their directories and manifest entries; call under _manifest_lock.
+    """
+    used = {m["active"], m["shadow"], keep, *m["history"]}
+    unused = sorted((v for v in m["models"] if v not in used), reverse=True)   # names start with a UTC stamp
+    gone = unused[max(0, keep_unused):]
+    for v in gone:
+        del m["models"][v]
+        shutil.rmtree(version_dir(v), ignore_errors=True)
+    # Directories the manifest lost track of (e.g. a crash between copy and save)
+    if REGISTRY_DIR.exists():
+        for d in REGISTRY_DIR.iterdir():
+            if d.is_dir() and d.name not in m["models"] and d.name not in used and (d / MODEL_FILE).exists():
+                shutil.rmtree(d, ignore_errors=True)
+                gone.append(d.name)
+    return gone
+
+def prune(keep_unused: int = KEEP_UNUSED) -> List[str]:
+    """Apply the retention rule now; returns the removed versions."""
+    with _manifest_lock():
+        m = load_manifest()
+        gone = _prune(m, keep_unused=keep_unused)
+        if gone:
+            _save_manifest(m)
+    return gone
+
+def _activate(version: str) -> None:
+    """Copy a registry version over core/models/pos_model.npz (workers hot-reload it)."""
+    d = version_dir(version)
+    if (d / META_FILE).exists():
+        _atomic_copy(d / META_FILE, pos.MODEL_META_PATH)
+    _atomic_copy(d / MODEL_FILE, pos.MODEL_PATH)
+
+def _adopt_unregistered_active(m: dict) -> dict:
+    """First promotion on an old tree: register the live model so rollback can reach it."""
+    if m["active"] is None and pos.MODEL_PATH.exists():
+        v = register(pos.MODEL_PATH, pos.MODEL_META_PATH, {"note": "adopted live model"})
+        m = load_manifest()
+        m["active"] = v
+    return m
+
+def promote(version: str, force: bool = False) -> dict:
+    """Make `version` the live model; one without a held-out accuracy needs force=True."""
+    with _manifest_lock():
+        m = _adopt_unregistered_active(load_manifest())
+        entry = _require(m, version)
+        if entry.get("accuracy") is None and not force:
+            raise ValueError(f"{version} has no held-out accuracy")
+        if m["active"] == version:
+            return m
+        _activate(version)
+        if m["active"]:
+            m["history"] = ([m["active"]] + m["history"])[:HISTORY_LIMIT]
+        m["active"] = version
+        if m["shadow"] == version:
+            m["shadow"] = None
+        m["models"][version]["promoted_at"] = _utc()
+        _prune(m)
+        _save_manifest(m)
+    return m
+
+def rollback() -> dict:
+    """Re-activate the most recently replaced model."""
+    with _manifest_lock():
+        m = load_manifest()
+        while m["history"]:
+            prev = m["history"].pop(0)
+            if prev in m["models"] and (version_dir(prev) / MODEL_FILE).exists():
+                _activate(prev)
+                m["active"] = prev
+                m["models"][prev]["promoted_at"] = _utc()
+                _save_manifest(m)
+                return m
+    raise LookupError("no previous model to roll back to")
+
+def set_shadow(version: Optional[str]) -> dict:
+    with _manifest_lock():
+        m = load_manifest()
+        if version is not None:
+            _require(m, version)
+        m["shadow"] = version
+        _save_manifest(m)
+    return m
+
+# =========================
+# Shadow evaluation (live /classify traffic)
+# =========================
+_SHADOW_LOCK = threading.Lock()
+_SHADOW_NEXT_CHECK = 0.0
+_SHADOW_SIG: tuple | None = None
+_SHADOW_VERSION: str | None = None     # from the manifest; cheap to read per request
+_SHADOW_MODEL: Tuple[str, dict] | None = None  # loaded lazily on the scoring thread
+_SHADOW_Q: "queue.Queue[tuple]" = queue.Queue(maxsize=SHADOW_QUEUE_MAX)
+_SHADOW_THREAD: threading.Thread | None = None
+
+def _manifest_sig() -> tuple | None:
+    try:
+        st = MANIFEST_PATH.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+def shadow_version() -> str | None:
+    """The configured shadow candidate; re-reads the manifest at most every RELOAD_INTERVAL_S."""
+    global _SHADOW_NEXT_CHECK, _SHADOW_SIG, _SHADOW_VERSION
+    now = time.monotonic()
+    if now >= _SHADOW_NEXT_CHECK:
+        with _SHADOW_LOCK:
+            if now >= _SHADOW_NEXT_CHECK:
+                _SHADOW_NEXT_CHECK = now + max(pos.RELOAD_INTERVAL_S, 0.5)
+                sig = _manifest_sig()
+                if sig != _SHADOW_SIG:
+                    _SHADOW_SIG = sig
+                    _SHADOW_VERSION = load_manifest().get("shadow")
+    return _SHADOW_VERSION
+
+def _shadow_model(version: str) -> dict:
+    global _SHADOW_MODEL
+    if _SHADOW_MODEL is None or _SHADOW_MODEL[0] != version:
+        _SHADOW_MODEL = (version, pos.load_model_file(version_dir(version) / MODEL_FILE))
+    return _SHADOW_MODEL[1]
+
+def _shadow_worker() -> None:
+    while True:
+        version, voc, meaning, label, prob, active_us = _SHADOW_Q.get()
+        try:
+            m = _shadow_model(version)
+            t0 = time.perf_counter()
+            s_label, s_probs = pos.predict_with(m, voc, meaning)
+            shadow_us = (time.perf_counter() - t0) * 1e6
+            rec = {
+                "ts": _utc(), "voc": voc, "meaning": meaning,
+                "active_hash": pos.get_model_meta().get("model_hash"), "shadow": version,
+                "active_label": label, "shadow_label": s_label, "agree": s_label == label,
+                "active_prob": round(float(prob), 4), "shadow_prob": round(float(s_probs.get(s_label, 0.0)), 4),
+                "active_us": round(active_us, 1), "shadow_us": round(shadow_us, 1),
+            }
+            SHADOW_LOG.parent.mkdir(parents=True, exist_ok=True)
+            with SHADOW_LOG.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        except Exception:
+            pass  # shadow scoring must never affect serving
+        finally:
+            _SHADOW_Q.task_done()
+
+def shadow_submit(voc: str, meaning: str, label: str, prob: float, active_us: float) -> bool:
+    """
+    Queue the candidate model on the same input, off the request path.
+    Returns False when no shadow is configured or the queue is full.
+    """
+    global _SHADOW_THREAD
+    version = shadow_version()
+    if not version:
+        return False
+    if _SHADOW_THREAD is None or not _SHADOW_THREAD.is_alive():
+        with _SHADOW_LOCK:
+            if _SHADOW_THREAD is None or not _SHADOW_THREAD.is_alive():
+                _SHADOW_THREAD = threading.Thread(target=_shadow_worker, name="pos-shadow", daemon=True)
+                _SHADOW_THREAD.start()
+    try:
+        _SHADOW_Q.put_nowait((version, voc, meaning, label, prob, active_us))
+    except queue.Full:
+        return False
+    return True
+
+def shadow_report(version: Optional[str] = None, path: Path = SHADOW_LOG) -> Dict[str, dict]:
+    """Agreement rate and latency percentiles per shadow version from the log."""
+    rows: Dict[str, List[dict]] = {}
+    if path.exists():
+        with path.open("r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    r = json.loads(line)
+                except Exception:
+                    continue
+                if version is None or r.get("shadow") == version:
+                    rows.setdefault(r.get("shadow"), []).append(r)
+
+    def pct(xs: List[float], q: float) -> float | None:
+        if not xs:
+            return None
+        xs = sorted(xs)
+        return round(xs[min(len(xs) - 1, int(q * len(xs)))], 1)
+
+    out: Dict[str, dict] = {}
+    for v, rs in rows.items():
+        a_us = [float(r.get("active_us") or 0) for r in rs]
+        s_us = [float(r.get("shadow_us") or 0) for r in rs]
+        out[v] = {
+            "n": len(rs),
+            "agreement": round(sum(1 for r in rs if r.get("agree")) / len(rs), 4),
+            "active_p50_us": pct(a_us, 0.5), "active_p99_us": pct(a_us, 0.99),
+            "shadow_p50_us": pct(s_us, 0.5), "shadow_p99_us": pct(s_us, 0.99),
+        }
+    return out
@@ -0,0 +1,167 @@
+from __future__ import annotations
+from typing import Optional
+import fcntl
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from .paths import REPO, DATA_DIR
+from .db import get_conn
+
+# -------- tuning --------
+DEBOUNCE_S = float(os.getenv("PLT_RETRAIN_DEBOUNCE", "30"))    # run once requests stop for this long
+MAX_WAIT_S = float(os.getenv("PLT_RETRAIN_MAX_WAIT", "300"))   # ... or the oldest request waited this long
+POLL_S = float(os.getenv("PLT_RETRAIN_POLL", "5"))
+TIMEOUT_S = float(os.getenv("PLT_RETRAIN_TIMEOUT", "1800"))
+WORKER_ENABLED = os.getenv("PLT_RETRAIN_WORKER", "1") != "0"
+
+LOCK_PATH = DATA_DIR / "retrain.lock"   # flock: one training at a time across all workers
+OUTPUT_TAIL = 4000                      # chars of trainer output kept per job
+
+RETRAIN_CMD = [
+    sys.executable, "-m", "scripts.retrain_pos",
+    "--reuse-vocab",
+    "--mode", "auto",
+    "--feedback-weight", "2.0",
+    "--require-feedback", "100",
+]
+
+# =========================
+# Producer side (request path)
+# =========================
+_WAKE = threading.Event()
+
+def enqueue(requested_by: Optional[str] = None) -> int:
+    """Record a retrain request; one INSERT, returns immediately."""
+    with get_conn() as conn:
+        cur = conn.execute("INSERT INTO retrain_jobs (requested_by) VALUES (?)", (requested_by,))
+        job_id = int(cur.lastrowid)
+    _WAKE.set()
+    return job_id
+
+def status(limit: int = 5) -> dict:
+    """Pending count, whether a run is in progress, and the most recent jobs."""
+    with get_conn() as conn:
+        pending = conn.execute("SELECT COUNT(*) FROM retrain_jobs WHERE status='pending'").fetchone()[0]
+        running = conn.execute("SELECT COUNT(*) FROM retrain_jobs WHERE status='running'").fetchone()[0]
+        last = conn.execute(
+            """
+            SELECT id, requested_at, requested_by, status, started_at, finished_at, duration_s, exit_code, output
+            FROM retrain_jobs WHERE status IN ('done', 'failed')
+            ORDER BY id DESC LIMIT 1
+            """
+        ).fetchone()
+        recent = conn.execute(
+            """
+            SELECT id, requested_at, requested_by, status, started_at, finished_at, duration_s, exit_code
+            FROM retrain_jobs ORDER BY id DESC LIMIT ?
+            """,
+            (limit,),
+        ).fetchall()
+    return {
+        "pending": int(pending),
+        "running": bool(running),
+        "last": (dict(last) if last else None),
+        "recent": [dict(r) for r in recent],
+        "debounce_s": DEBOUNCE_S,
+        "max_wait_s": MAX_WAIT_S,
+    }
+
+# =========================
+# Worker side (background thread, one active across workers)
+# =========================
+def _due(conn) -> Optional[int]:
+    """Highest pending id if the burst is due (quiet for DEBOUNCE_S, or MAX_WAIT_S elapsed)."""
+    row = conn.execute(
+        """
+        SELECT MAX(id) AS max_id,
+               (julianday('now') - julianday(MAX(requested_at))) * 86400.0 AS idle_s,
+               (julianday('now') - julianday(MIN(requested_at))) * 86400.0 AS waited_s
+        FROM retrain_jobs WHERE status='pending'
+        """
+    ).fetchone()
+    if row["max_id"] is None:
+        return None
+    if row["idle_s"] >= DEBOUNCE_S or row["waited_s"] >= MAX_WAIT_S:
+        return int(row["max_id"])
+    return None
+
+def _run_batch(upto_id: int) -> None:
+    with get_conn() as conn:
+        conn.execute(
+            "UPDATE retrain_jobs SET status='running', started_at=CURRENT_TIMESTAMP "
+            "WHERE status='pending' AND id <= ?",
+            (upto_id,),
+        )
+    t0 = time.monotonic()
+    try:
+        proc = subprocess.run(RETRAIN_CMD, cwd=str(REPO), capture_output=True, text=True, timeout=TIMEOUT_S)
+        code, output = proc.returncode, (proc.stdout or "") + (proc.stderr or "")
+    except subprocess.TimeoutExpired as e:
+        code, output = -1, f"timeout after {TIMEOUT_S:.0f}s\n{e.stdout or ''}"
+    except Exception as e:
+        code, output = -1, f"{e.__class__.__name__}: {e}"
+    duration = time.monotonic() - t0
+    with get_conn() as conn:
+        conn.execute(
+            """
+            UPDATE retrain_jobs
+            SET status=?, finished_at=CURRENT_TIMESTAMP, duration_s=?, exit_code=?, output=?
+            WHERE status='running' AND id <= ?
+            """,
+            ("done" if code == 0 else "failed", round(duration, 3), code, output[-OUTPUT_TAIL:], upto_id),
+        )
+
+def run_pending(force: bool = False) -> bool:
+    """
+    Run one coalesced training if requests are due and no other worker holds
+    the lock. Returns True if a training ran.
+    """
+    LOCK_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with LOCK_PATH.open("a") as lock:
+        try:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False  # another worker is training
+        try:
+            with get_conn() as conn:
+                # We hold the lock, so any 'running' rows belong to a worker that died mid-run.
+                conn.execute("UPDATE retrain_jobs SET status='pending' WHERE status='running'")
+                if force:
+                    row = conn.execute("SELECT MAX(id) FROM retrain_jobs WHERE status='pending'").fetchone()
+                    upto = row[0]
+                else:
+                    upto = _due(conn)
+            if upto is None:
+                return False
+            _run_batch(int(upto))
+            return True
+        finally:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+def _worker_loop() -> None:
+    while True:
+        _WAKE.wait(POLL_S)
+        _WAKE.clear()
+        try:
+            run_pending()
+        except Exception:
+            time.sleep(POLL_S)  # DB busy / missing table during startup; try again later
+
+_WORKER: Optional[threading.Thread] = None
+_WORKER_PID: Optional[int] = None
+_WORKER_LOCK = threading.Lock()
+
+def start_worker() -> None:
+    """Start this process's background retrain thread (idempotent, fork-aware)."""
+    global _WORKER, _WORKER_PID
+    if not WORKER_ENABLED:
+        return
+    with _WORKER_LOCK:
+        if _WORKER is not None and _WORKER_PID == os.getpid() and _WORKER.is_alive():
+            return
+        _WORKER_PID = os.getpid()
+        _WORKER = threading.Thread(target=_worker_loop, name="retrain-queue", daemon=True)
+        _WORKER.start()
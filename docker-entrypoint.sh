@@ -4,4 +4,8 @@ mkdir -p /app/databases /app/data
 if [ ! -f /app/databases/app.db ] && [ -f /app/seed/app.db ]; then
   cp /app/seed/app.db /app/databases/app.db
 fi
+# First boot (or a seed DB without words): bulk-load the lexicon snapshot
+if [ -f /app/seed/lexicon.snap ]; then
+  python -m scripts.snapshot load /app/seed/lexicon.snap --db /app/databases/app.db --if-empty
+fi
 exec "$@"
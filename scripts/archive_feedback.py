@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+import argparse, sys
+from pathlib import Path
+from core import feedback
+
+def main() -> int:
+    ap = argparse.ArgumentParser(
+        description="Compress closed pos_feedback segments into data/feedback_archive/ (gzip or xz) "
+                    "and record row counts / time ranges in its index.json."
+    )
+    ap.add_argument("--jsonl", type=Path, default=feedback.FEEDBACK_PATH)
+    ap.add_argument("--codec", choices=["gz", "xz"], default="gz")
+    ap.add_argument("--keep", type=int, default=0, help="Leave the newest N closed segments uncompressed.")
+    ap.add_argument("--list", action="store_true", help="Only print the archive index.")
+    args = ap.parse_args()
+
+    if not args.list:
+        for name, e in feedback.archive_closed(args.jsonl, codec=f".{args.codec}", keep=args.keep):
+            print(f"archived {name}: rows={e['rows']} {e['raw_bytes']} -> {e['bytes']} bytes")
+
+    index = feedback.load_archive_index(args.jsonl)
+    rows = sum(e["rows"] for e in index.values())
+    raw = sum(e["raw_bytes"] for e in index.values())
+    size = sum(e["bytes"] for e in index.values())
+    if args.list:
+        for name, e in sorted(index.items()):
+            print(f"{name}  rows={e['rows']}  {e['ts_min'] or '—'} .. {e['ts_max'] or '—'}  {e['bytes']} bytes")
+    print(f"archive: {len(index)} segments, {rows} rows, {raw} -> {size} bytes")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+import argparse, sys, time
+from pathlib import Path
+import numpy as np
+
+from core.paths import DATA_DIR
+from scripts import retrain_pos as rp
+
+def synthetic_corpus(words: Path, rows: int):
+    """words.json rows repeated up to `rows`, with a counter appended so the grams vary."""
+    base = rp.load_words_json(words)
+    if not base:
+        raise SystemExit(f"no usable rows in {words}")
+    return [(v, f"{m} {np.base_repr(i, 36).lower()}", l, 1.0)
+            for i, (v, m, l) in ((i, base[i % len(base)]) for i in range(rows))]
+
+def same(a, b) -> bool:
+    (Xa, ya), (Xb, yb) = a, b
+    return (np.array_equal(Xa.indptr, Xb.indptr) and np.array_equal(Xa.indices, Xb.indices)
+            and np.array_equal(Xa.data, Xb.data) and np.array_equal(ya, yb))
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Time retrain_pos featurization (vocab + CSR) across worker counts.")
+    ap.add_argument("--words", type=Path, default=(DATA_DIR/"words.json"))
+    ap.add_argument("--rows", type=int, default=200000)
+    ap.add_argument("--vocab-size", type=int, default=5000)
+    ap.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts (0 = one per CPU).")
+    args = ap.parse_args()
+
+    samples = synthetic_corpus(args.words, args.rows)
+    counts = [rp.resolve_workers(int(w)) for w in args.workers.split(",")]
+    if 1 not in counts:
+        counts = [1] + counts
+    rp.PARALLEL_MIN_ROWS = 0  # benchmark the pool at any size
+
+    ref = None
+    print(f"rows={len(samples)}  cpus={rp.resolve_workers(0)}")
+    print(f"{'workers':>7} {'vocab_s':>8} {'vector_s':>9} {'total_s':>8} {'speedup':>8} {'eff':>5}  identical")
+    t_serial = None
+    ok = True
+    for w in counts:
+        t0 = time.perf_counter()
+        vocab = rp.build_vocab(samples, args.vocab_size, workers=w)
+        t1 = time.perf_counter()
+        out = rp.vectorize(samples, vocab, workers=w)
+        t2 = time.perf_counter()
+        total = t2 - t0
+        if ref is None:
+            ref, t_serial = (vocab, out), total
+        match = vocab == ref[0] and list(vocab) == list(ref[0]) and same(out, ref[1])
+        ok &= match
+        speedup = t_serial / total
+        print(f"{w:>7} {t1 - t0:>8.2f} {t2 - t1:>9.2f} {total:>8.2f} {speedup:>7.2f}x {speedup / w:>5.2f}  {'yes' if match else 'NO'}")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
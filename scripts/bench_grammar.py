@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+import argparse, json, random, sys, time
+from collections import defaultdict
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+import numpy as np
+
+from core import grammar, jsonstream
+from core.grammar import CASES, GRAMMAR_VERSION, grammar_adj, grammar_noun
+from core.paths import DATA_DIR
+
+ADJ_PARTS = ("sg_m", "sg_f", "sg_n", "pl_mo", "pl_nmo")
+
+# =========================
+# Lexicon
+# =========================
+def load_lexicon(path: Path) -> Tuple[List[dict], List[dict]]:
+    """(nouns, adjectives) from words.json, with their stored tables parsed."""
+    nouns, adjs = [], []
+    for w in jsonstream.iter_items(path):
+        voc = (w.get("voc") or "").strip() if isinstance(w, dict) else ""
+        cls = str(w.get("class") or "").strip().lower() if voc else ""
+        if cls == "n":
+            nouns.append({"voc": voc, "forms": w.get("forms") if isinstance(w.get("forms"), dict) else None})
+        elif cls == "adj":
+            adjs.append({"voc": voc, "forms": w.get("adj_forms") if isinstance(w.get("adj_forms"), dict) else None})
+    return nouns, adjs
+
+def synthetic(lemmas: List[str], n: int, seed: int) -> List[str]:
+    """n lemmas: real ones behind a random 1-3 letter prefix, so endings (what the rules see) stay realistic."""
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnoprstuwyzłśżźćń"
+    return [("".join(rng.choice(letters) for _ in range(rng.randint(1, 3))) + rng.choice(lemmas)) for _ in range(n)]
+
+def ending_class(kind: str, voc: str) -> str:
+    """The rule suffix grammar inflects `voc` from (its longest match in the compiled trie), '-' for none."""
+    n = grammar.rule_suffix_len(kind, voc)
+    return f"-{voc[len(voc) - n:]}" if n else "-"
+
+# =========================
+# Throughput
+# =========================
+def throughput(fn: Callable[[str], dict], lemmas: List[str]) -> dict:
+    """ops/s from one untimed-per-call pass; p50/p99 from a second pass timing every call."""
+    t0 = time.perf_counter()
+    for v in lemmas:
+        fn(v)
+    wall = time.perf_counter() - t0
+    clock = time.perf_counter_ns
+    lat = np.empty(len(lemmas), dtype=np.int64)
+    for i, v in enumerate(lemmas):
+        t = clock()
+        fn(v)
+        lat[i] = clock() - t
+    return {
+        "n": len(lemmas),
+        "ops_s": round(len(lemmas) / wall, 1) if wall > 0 else 0.0,
+        "p50_us": round(float(np.percentile(lat, 50)) / 1e3, 2),
+        "p99_us": round(float(np.percentile(lat, 99)) / 1e3, 2),
+    }
+
+def cold_start_ms() -> float:
+    """Time to compile every rule table (what the first request in a worker pays)."""
+    grammar.reset_cache()
+    t0 = time.perf_counter()
+    grammar.compile_tables()
+    return round((time.perf_counter() - t0) * 1e3, 1)
+
+# =========================
+# Agreement with stored forms
+# =========================
+def agreement(nouns: List[dict], adjs: List[dict], min_group: int) -> dict:
+    """
+    Share of stored (non-empty) forms the engine reproduces, per "part.CASE",
+    overall and by gender (nouns: the guessed one; adjectives: "adj") and
+    ending class.
+    """
+    # key -> [agree, total]
+    overall: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+    by_gender: Dict[str, Dict[str, List[int]]] = defaultdict(lambda: defaultdict(lambda: [0, 0]))
+    by_ending: Dict[str, Dict[str, List[int]]] = defaultdict(lambda: defaultdict(lambda: [0, 0]))
+
+    def tally(group_g: str, group_e: str, key: str, ok: bool) -> None:
+        for bucket in (overall[key], by_gender[group_g][key], by_ending[group_e][key]):
+            bucket[0] += ok
+            bucket[1] += 1
+
+    for kind, words in (("noun", nouns), ("adj", adjs)):
+        for w in words:
+            stored = w["forms"]
+            if not stored:
+                continue
+            voc = w["voc"]
+            if kind == "noun":
+                g = grammar.guess_gender(voc)
+                gen, parts, group_g, trie_kind = grammar_noun(voc), ("sg", "pl"), f"n:{g}", g
+            else:
+                gen, parts, group_g, trie_kind = grammar_adj(voc), ADJ_PARTS, "adj", "adj"
+            group_e = f"{group_g} {ending_class(trie_kind, voc)}"
+            for part in parts:
+                sub = stored.get(part)
+                if not isinstance(sub, dict):
+                    continue
+                for i, case in enumerate(CASES, 1):
+                    want = (sub.get(case) or "").strip()
+                    if want:
+                        tally(group_g, group_e, f"{part}.{case}", gen[part][i] == want)
+
+    def rates(table: Dict[str, List[int]]) -> Dict[str, dict]:
+        return {k: {"rate": round(a / n, 4), "n": n} for k, (a, n) in sorted(table.items())}
+
+    def summary(groups) -> Dict[str, dict]:
+        out = {}
+        for name, table in sorted(groups.items()):
+            a, n = sum(v[0] for v in table.values()), sum(v[1] for v in table.values())
+            if n >= min_group:
+                out[name] = {"rate": round(a / n, 4), "n": n, "cases": rates(table)}
+        return out
+
+    return {"overall": rates(overall), "by_gender": summary(by_gender), "by_ending": summary(by_ending)}
+
+# =========================
+# Baseline comparison
+# =========================
+def regressions(cur: dict, base: dict, max_slowdown: float, max_drop: float) -> List[str]:
+    out = []
+    for name, b in base.get("perf", {}).items():
+        c = cur["perf"].get(name)
+        if c and b.get("ops_s") and c["ops_s"] < b["ops_s"] * (1 - max_slowdown):
+            out.append(f"perf {name}: {c['ops_s']:.0f} ops/s < baseline {b['ops_s']:.0f} - {max_slowdown:.0%}")
+    for key, b in base.get("agreement", {}).get("overall", {}).items():
+        c = cur["agreement"]["overall"].get(key)
+        if c and c["rate"] < b["rate"] - max_drop:
+            out.append(f"agreement {key}: {c['rate']:.4f} < baseline {b['rate']:.4f} - {max_drop}")
+    return out
+
+def main() -> int:
+    ap = argparse.ArgumentParser(
+        description="Benchmark grammar_noun/grammar_adj throughput and agreement with the stored forms in words.json."
+    )
+    ap.add_argument("--words", type=Path, default=(DATA_DIR/"words.json"))
+    ap.add_argument("--synthetic", type=int, default=1_000_000, help="Synthetic lemmas per kind (0 = skip).")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--min-group", type=int, default=20, help="Hide gender/ending groups with fewer forms.")
+    ap.add_argument("--show", type=int, default=15, help="Worst ending classes to print (all go to --out).")
+    ap.add_argument("--baseline", type=Path, default=(DATA_DIR/"bench_grammar_baseline.json"))
+    ap.add_argument("--save-baseline", action="store_true", help="Write this run as the new baseline.")
+    ap.add_argument("--max-slowdown", type=float, default=0.25, help="Allowed ops/s drop vs baseline (fraction).")
+    ap.add_argument("--max-agreement-drop", type=float, default=0.0, help="Allowed per-case agreement drop.")
+    ap.add_argument("--out", type=Path, default=None, help="Also write the full report as JSON.")
+    args = ap.parse_args()
+
+    nouns, adjs = load_lexicon(args.words)
+    if not nouns and not adjs:
+        print(f"No nouns or adjectives in {args.words}", file=sys.stderr)
+        return 1
+
+    report = {"grammar_version": GRAMMAR_VERSION, "lexicon": {"nouns": len(nouns), "adjs": len(adjs)},
+              "cold_start_ms": cold_start_ms(), "perf": {}}
+    sets = [("lexicon", [w["voc"] for w in nouns], [w["voc"] for w in adjs])]
+    if args.synthetic > 0:
+        sets.append(("synthetic", synthetic(sets[0][1], args.synthetic, args.seed),
+                     synthetic(sets[0][2], args.synthetic, args.seed + 1)))
+    print(f"grammar v{GRAMMAR_VERSION}  nouns={len(nouns)} adjs={len(adjs)}  cold start {report['cold_start_ms']} ms")
+    print(f"{'set':<10} {'kind':<5} {'lemmas':>9} {'ops/s':>11} {'p50us':>7} {'p99us':>7}")
+    for name, noun_set, adj_set in sets:
+        for kind, fn, lemmas in (("noun", grammar_noun, noun_set), ("adj", grammar_adj, adj_set)):
+            if not lemmas:
+                continue
+            r = report["perf"][f"{name}.{kind}"] = throughput(fn, lemmas)
+            print(f"{name:<10} {kind:<5} {r['n']:>9} {r['ops_s']:>11,.0f} {r['p50_us']:>7} {r['p99_us']:>7}")
+
+    agr = report["agreement"] = agreement(nouns, adjs, args.min_group)
+    print("\nAgreement with stored forms (per case):")
+    for key, r in agr["overall"].items():
+        print(f"  {key:<12} {r['rate']:>7.2%}  n={r['n']}")
+    for title, groups in (("gender", agr["by_gender"]), ("ending class", agr["by_ending"])):
+        print(f"\nBy {title} (groups with >= {args.min_group} forms):")
+        ranked = sorted(groups.items(), key=lambda kv: kv[1]["rate"])
+        for g, r in (ranked if title == "gender" else ranked[:args.show]):
+            worst = min(r["cases"].items(), key=lambda kv: kv[1]["rate"])
+            print(f"  {g:<16} {r['rate']:>7.2%}  n={r['n']:<6} worst {worst[0]} {worst[1]['rate']:.2%}")
+
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\nBaseline saved: {args.baseline}")
+        return 0
+    try:
+        base = json.loads(args.baseline.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        print(f"\nNo baseline at {args.baseline} (run with --save-baseline to create one).")
+        return 0
+    bad = regressions(report, base, args.max_slowdown, args.max_agreement_drop)
+    for msg in bad:
+        print(f"REGRESSION {msg}", file=sys.stderr)
+    if not bad:
+        print(f"\nNo regressions vs {args.baseline}.")
+    return 1 if bad else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,16 @@
 #!/usr/bin/env python3
-import argparse, json, sqlite3
+import argparse, json, os, sqlite3
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, IO, Iterator, List, Optional, Tuple
+from core import jsonstream
+from core.db import ensure_app_schema
 from core.paths import APP_DB, DATA_DIR
 
+FIELDS = ("meaning", "class", "forms", "adj_forms")
+
 def conn_open(p: Path) -> sqlite3.Connection:
     c = sqlite3.connect(str(p)); c.row_factory = sqlite3.Row; return c
 
-def read_json(p: Path, enc: str) -> List[Dict[str, Any]]:
-    if not p.exists(): return []
-    with p.open("r", encoding=enc) as f:
-        data = json.load(f)
-    if not isinstance(data, list): raise ValueError("words.json root must be a list")
-    return data
-
 def to_obj(s: Optional[str]):
     if s is None or str(s).strip()=="":
         return None
@@ -22,41 +19,209 @@ def to_obj(s: Optional[str]):
     except Exception:
         return s
 
+def to_entry(r: sqlite3.Row) -> Dict[str, Any]:
+    return {
+        "voc": (r["voc"] or "").strip(),
+        "meaning": to_obj(r["meaning"]),
+        "class":   to_obj(r["class"]),
+        "forms":   to_obj(r["forms"]),
+        "adj_forms": to_obj(r["adj_forms"]),
+    }
+
+def sort_key(entry: Dict[str, Any]) -> str:
+    return (entry.get("voc") or "").lower()
+
+# =========================
+# Sync points: export only rows whose row_version moved past the last one
+# written to this file (see WORDS_CHANGE_TRACKING in core/db.py)
+# =========================
+def file_sig(p: Path) -> Optional[str]:
+    """size:mtime_ns of the JSON; a mismatch means it changed outside fetch (checkout, hand edit)."""
+    try:
+        st = p.stat()
+    except FileNotFoundError:
+        return None
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+def last_sync(conn: sqlite3.Connection, name: str, sig: Optional[str]) -> Optional[int]:
+    """row_version of the last export to `name`, or None if it can't be trusted (full export)."""
+    row = conn.execute("SELECT row_version, target_sig FROM sync_points WHERE name=?", (name,)).fetchone()
+    if row is None or sig is None or row["target_sig"] != sig:
+        return None
+    return int(row["row_version"])
+
+def record_sync(conn: sqlite3.Connection, name: str, version: int, sig: Optional[str]) -> None:
+    with conn:
+        conn.execute(
+            """
+            INSERT INTO sync_points (name, row_version, target_sig, synced_at)
+            VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(name) DO UPDATE SET
+              row_version = excluded.row_version,
+              target_sig  = excluded.target_sig,
+              synced_at   = excluded.synced_at
+            """,
+            (name, version, sig),
+        )
+
+def changed_rows(conn: sqlite3.Connection, since: Optional[int]) -> Tuple[List[Dict[str, Any]], int]:
+    """(entries changed after `since` sorted like words.json, highest row_version seen)."""
+    # sqlite3 opens no transaction for SELECTs (and `with conn:` doesn't either),
+    # so BEGIN one explicitly: both reads then see the same snapshot.
+    conn.execute("BEGIN")
+    try:
+        top = int(conn.execute("SELECT COALESCE(MAX(row_version), 0) FROM words").fetchone()[0])
+        rows = conn.execute(
+            "SELECT voc, meaning, class, forms, adj_forms FROM words WHERE row_version > ? AND row_version <= ?",
+            (-1 if since is None else since, top),
+        ).fetchall()
+    finally:
+        conn.rollback()   # read-only; just ends the snapshot
+    entries = [e for e in map(to_entry, rows) if e["voc"]]
+    entries.sort(key=sort_key)
+    return entries, top
+
+# =========================
+# Streaming merge: JSON elements flow through one at a time; changed rows
+# replace their entry, new ones are slotted in by voc order. That needs the
+# JSON sorted by sort_key with unique vocs (as fetch writes it); scan_json
+# checks this and main falls back to rebuild() when it doesn't hold.
+# =========================
+def merge(current: Iterator[Any], changed: List[Dict[str, Any]], existing: set,
+          stats: Dict[str, Any]) -> Iterator[Any]:
+    """`changed` is sorted by sort_key; `existing` holds the vocs already in the JSON (sorted, unique)."""
+    by_voc = {e["voc"]: e for e in changed}
+    pending = [e for e in changed if e["voc"] not in existing]   # new entries, in order
+    i = 0
+    seen = set()
+    for x in current:
+        voc = (x.get("voc") or "").strip() if isinstance(x, dict) else ""
+        if voc:
+            # entries not in the JSON yet that sort before this one
+            while i < len(pending) and sort_key(pending[i]) < sort_key(x):
+                e = pending[i]; i += 1
+                if e["voc"] not in seen:
+                    seen.add(e["voc"])
+                    stats["added"].append(e["voc"])
+                    yield e
+            new = by_voc.get(voc)
+            if new is not None and voc not in seen:
+                seen.add(voc)
+                diff = [f for f in FIELDS if x.get(f) != new.get(f)]
+                if diff:
+                    stats["updated"].append((voc, diff))
+                    yield new
+                    continue
+                stats["unchanged"] += 1
+        yield x
+    for e in pending[i:]:
+        if e["voc"] not in seen:
+            seen.add(e["voc"])
+            stats["added"].append(e["voc"])
+            yield e
+
+def rebuild(current: Iterator[Any], changed: List[Dict[str, Any]], stats: Dict[str, Any]) -> Iterator[Any]:
+    """Whole-file merge for a JSON merge() can't stream: dedupe by voc (last wins, DB over JSON), sort."""
+    by_voc: Dict[str, Dict[str, Any]] = {}
+    for x in current:
+        voc = (x.get("voc") or "").strip() if isinstance(x, dict) else ""
+        if voc:
+            by_voc[voc] = x
+    for e in changed:
+        old = by_voc.get(e["voc"])
+        if old is None:
+            stats["added"].append(e["voc"])
+        else:
+            diff = [f for f in FIELDS if old.get(f) != e.get(f)]
+            if not diff:
+                stats["unchanged"] += 1
+                continue
+            stats["updated"].append((e["voc"], diff))
+        by_voc[e["voc"]] = e
+    return iter(sorted(by_voc.values(), key=sort_key))
+
+def scan_json(p: Path, enc: str) -> Tuple[set, bool]:
+    """
+    (vocs already in the JSON, whether merge() can stream it: vocs unique and
+    in sort_key order). A changed row that isn't in sort position still replaces, not duplicates.
+    """
+    vocs: set = set()
+    if not p.exists():
+        return vocs, True
+    ok, last = True, ""
+    for x in jsonstream.iter_items(p, "array", enc):
+        voc = (x.get("voc") or "").strip() if isinstance(x, dict) else ""
+        if not voc:
+            continue
+        key = sort_key(x)
+        if voc in vocs or key < last:
+            ok = False
+        vocs.add(voc)
+        last = max(last, key)
+    return vocs, ok
+
+def write_array(f: IO[str], items: Iterator[Any]) -> int:
+    """Same bytes as json.dump(list, f, ensure_ascii=False, indent=2), one element at a time."""
+    n = 0
+    for x in items:
+        body = json.dumps(x, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+        f.write(("[\n  " if n == 0 else ",\n  ") + body)
+        n += 1
+    f.write("\n]" if n else "[]")
+    return n
+
 def main():
-    ap = argparse.ArgumentParser(description="Fetch ALL rows from app.db into words.json (merge by voc).")
+    ap = argparse.ArgumentParser(description="Fetch rows changed in app.db since the last fetch into words.json (merge by voc).")
     ap.add_argument("--db", type=Path, default=APP_DB)
     ap.add_argument("--json", type=Path, default=(DATA_DIR / "words.json"))
     ap.add_argument("--encoding", default="utf-8")
-    ap.add_argument("--dry-run", action="store_true")
+    ap.add_argument("--full", action="store_true", help="Ignore the sync point and merge every row.")
+    ap.add_argument("--dry-run", action="store_true", help="Show what would change; write nothing.")
+    ap.add_argument("--show", type=int, default=20, help="Changed entries to list in the summary.")
     args = ap.parse_args()
 
+    ensure_app_schema(args.db)
     conn = conn_open(args.db)
-    rows = conn.execute("SELECT voc, meaning, class, forms, adj_forms FROM words").fetchall()
-    current = read_json(args.json, args.encoding)
-
-    by_voc: Dict[str, Dict[str, Any]] = { (x.get("voc") or "").strip(): x for x in current if (x.get("voc") or "").strip() }
-    for r in rows:
-        voc = (r["voc"] or "").strip()
-        if not voc: continue
-        by_voc[voc] = {
-            "voc": voc,
-            "meaning": to_obj(r["meaning"]),
-            "class":   to_obj(r["class"]),
-            "forms":   to_obj(r["forms"]),
-            "adj_forms": to_obj(r["adj_forms"]),
-        }
-
-    merged = list(by_voc.values())
-    merged.sort(key=lambda x: (x.get("voc") or "").lower())
-
-    if args.dry_run:
-        print(f"[DRY-RUN] db_rows={len(rows)} json_before={len(current)} json_after={len(merged)}")
-        return
-
-    args.json.parent.mkdir(parents=True, exist_ok=True)
-    with args.json.open("w", encoding=args.encoding) as f:
-        json.dump(merged, f, ensure_ascii=False, indent=2)
-    print(f"Updated {args.json}: db_rows={len(rows)} total_entries={len(merged)}")
+    name = f"fetch:{args.json.resolve()}"
+    since = None if args.full else last_sync(conn, name, file_sig(args.json))
+    changed, top = changed_rows(conn, since)
+    scope = "all rows" if since is None else f"rows after version {since}"
+
+    stats: Dict[str, Any] = {"added": [], "updated": [], "unchanged": 0}
+    written, total, streamed = False, None, True
+    if changed:
+        existing, streamed = scan_json(args.json, args.encoding)
+        current = jsonstream.iter_items(args.json, "array", args.encoding) if args.json.exists() else iter(())
+        if not streamed:
+            print(f"{args.json}: not sorted by voc or has duplicate vocs; rewriting it whole")
+        tmp = args.json.with_name(f".{args.json.name}.{os.getpid()}.tmp")
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            with (open(os.devnull, "w", encoding=args.encoding) if args.dry_run
+                  else tmp.open("w", encoding=args.encoding)) as f:
+                items = merge(current, changed, existing, stats) if streamed else rebuild(current, changed, stats)
+                total = write_array(f, items)
+            if (stats["added"] or stats["updated"] or not streamed) and not args.dry_run:
+                os.replace(tmp, args.json)
+                written = True
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    added, updated = stats["added"], stats["updated"]
+    prefix = "[DRY-RUN] " if args.dry_run else ""
+    print(f"{prefix}{args.json}: {scope}: db_changed={len(changed)} added={len(added)} "
+          f"updated={len(updated)} unchanged={stats['unchanged']}"
+          + (f" total_entries={total}" if total is not None else "")
+          + ("" if written or args.dry_run else " (no write)"))
+    for voc in added[:args.show]:
+        print(f"  + {voc}")
+    for voc, fields in updated[:max(0, args.show - len(added))]:
+        print(f"  ~ {voc}: {', '.join(fields)}")
+    if len(added) + len(updated) > args.show:
+        print(f"  ... {len(added) + len(updated) - args.show} more")
+
+    if not args.dry_run:
+        record_sync(conn, name, top, file_sig(args.json))
 
 if __name__ == "__main__":
     main()
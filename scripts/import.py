@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
-import argparse, json, sqlite3
+import argparse, json, sqlite3, sys, time
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from core import jsonstream
 from core.paths import APP_DB, DATA_DIR
 
 def conn_open(p: Path) -> sqlite3.Connection:
@@ -10,11 +11,9 @@ def conn_open(p: Path) -> sqlite3.Connection:
     c.row_factory = sqlite3.Row
     return c
 
-def load_words_json(p: Path, encoding: str) -> List[Dict[str, Any]]:
-    with p.open("r", encoding=encoding) as f:
-        data = json.load(f)
-    if not isinstance(data, list): raise ValueError("JSON root must be a list")
-    return data
+def load_words_json(p: Path, encoding: str, fmt: str = "auto") -> Iterator[Dict[str, Any]]:
+    """Stream word objects from a JSON array or NDJSON file (see core.jsonstream)."""
+    return jsonstream.iter_items(p, fmt, encoding)
 
 def to_text(v: Any) -> Optional[str]:
     if v is None: return None
@@ -25,59 +24,112 @@ def norm(obj: Dict[str, Any]) -> Tuple[str, Optional[str], Optional[str], Option
     if not voc: raise ValueError("Missing 'voc'")
     return voc, to_text(obj.get("meaning")), to_text(obj.get("class")), to_text(obj.get("forms")), to_text(obj.get("adj_forms"))
 
+# =========================
+# Set-based import: stage everything with executemany, then count and upsert
+# with one statement each, all in one transaction.
+# =========================
+STAGE_CHUNK = 5000   # rows per executemany call (and per progress line)
+
+def _chunks(rows: Iterable[tuple], size: int) -> Iterator[List[tuple]]:
+    chunk: List[tuple] = []
+    for r in rows:
+        chunk.append(r)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def stage(conn: sqlite3.Connection, items: Iterable[Dict[str, Any]], counts: Dict[str, int], progress: bool) -> None:
+    """Normalize items into TEMP import_stage (voc unique; a later duplicate replaces an earlier one)."""
+    conn.execute("DROP TABLE IF EXISTS temp.import_stage")
+    conn.execute(
+        """
+        CREATE TEMP TABLE import_stage (
+          voc TEXT PRIMARY KEY, meaning TEXT, class TEXT, forms TEXT, adj_forms TEXT
+        )
+        """
+    )
+
+    def rows() -> Iterator[tuple]:
+        for obj in items:
+            counts["total"] += 1
+            try:
+                yield norm(obj)
+            except Exception:
+                counts["errors"] += 1
+
+    t0 = time.perf_counter()
+    for chunk in _chunks(rows(), STAGE_CHUNK):
+        conn.executemany("INSERT OR REPLACE INTO import_stage VALUES (?,?,?,?,?)", chunk)
+        if progress and counts["total"] >= STAGE_CHUNK:
+            print(f"  staged {counts['total']} items ({time.perf_counter() - t0:.1f}s)", file=sys.stderr, flush=True)
+    staged = conn.execute("SELECT COUNT(*) FROM import_stage").fetchone()[0]
+    counts["duplicates"] = counts["total"] - counts["errors"] - staged
+
+def classify(conn: sqlite3.Connection, counts: Dict[str, int]) -> None:
+    """inserted / updated_unapproved / skipped_approved for the staged rows, in one join."""
+    row = conn.execute(
+        """
+        SELECT COALESCE(SUM(w.id IS NULL), 0)                         AS inserted,
+               COALESCE(SUM(w.id IS NOT NULL AND w.approved = 0), 0)  AS updated,
+               COALESCE(SUM(w.id IS NOT NULL AND w.approved != 0), 0) AS skipped
+        FROM import_stage s LEFT JOIN words w ON w.voc = s.voc
+        """
+    ).fetchone()
+    counts["inserted"], counts["updated_unapproved"], counts["skipped_approved"] = row[0], row[1], row[2]
+
+# Updates only when the target row is unapproved ("WHERE true" keeps SQLite
+# from reading ON CONFLICT as a join constraint of the SELECT).
+UPSERT_SQL = """
+INSERT INTO words (voc, meaning, class, forms, adj_forms, approved)
+SELECT voc, meaning, class, forms, adj_forms, 0 FROM import_stage WHERE true
+ON CONFLICT(voc) DO UPDATE SET
+  meaning   = excluded.meaning,
+  class     = excluded.class,
+  forms     = excluded.forms,
+  adj_forms = excluded.adj_forms
+WHERE words.approved = 0;
+"""
+
 def main():
     ap = argparse.ArgumentParser(description="Import words.json into app.db; never overwrite approved rows.")
     ap.add_argument("--db", type=Path, default=APP_DB)
     ap.add_argument("--json", type=Path, default=(DATA_DIR / "words.json"))
     ap.add_argument("--encoding", default="utf-8")
+    ap.add_argument("--format", choices=["auto", "array", "ndjson"], default="auto",
+                    help="JSON array (words.json) or one object per line; auto goes by suffix/first char.")
     ap.add_argument("--dry-run", action="store_true")
+    ap.add_argument("--quiet", action="store_true", help="No progress lines on stderr.")
     args = ap.parse_args()
 
-    items = load_words_json(args.json, args.encoding)
+    t0 = time.perf_counter()
+    items = load_words_json(args.json, args.encoding, args.format)
     conn  = conn_open(args.db)
+    counts = {"total": 0, "inserted": 0, "updated_unapproved": 0, "skipped_approved": 0,
+              "duplicates": 0, "errors": 0}
 
-    # Single concise upsert: updates only when target row is unapproved.
-    sql = """
-    INSERT INTO words (voc, meaning, class, forms, adj_forms, approved)
-    VALUES (?, ?, ?, ?, ?, 0)
-    ON CONFLICT(voc) DO UPDATE SET
-      meaning   = excluded.meaning,
-      class     = excluded.class,
-      forms     = excluded.forms,
-      adj_forms = excluded.adj_forms
-    WHERE words.approved = 0;
-    """
-
-    total = inserted = updated = skipped = errors = 0
-    for obj in items:
-        total += 1
-        try:
-            rec = norm(obj)
-        except Exception:
-            errors += 1
-            continue
-
+    # One transaction: staging, counting and the upsert see the same snapshot,
+    # and a failure (including a malformed element late in the file) leaves
+    # words untouched.
+    try:
+        stage(conn, items, counts, progress=not args.quiet)
+        classify(conn, counts)
         if args.dry_run:
-            row = conn.execute("SELECT approved FROM words WHERE voc=?", (rec[0],)).fetchone()
-            if row is None: inserted += 1
-            elif int(row["approved"] or 0) == 0: updated += 1
-            else: skipped += 1
-            continue
-
-        # Pre-check for accurate counters but keep the write path compact.
-        row = conn.execute("SELECT approved FROM words WHERE voc=?", (rec[0],)).fetchone()
-        try:
-            conn.execute(sql, (*rec,))  # approved forced to 0 for inserts
-            if row is None: inserted += 1
-            elif int(row["approved"] or 0) == 0: updated += 1
-            else: skipped += 1
-        except Exception:
-            errors += 1
-
-    if not args.dry_run:
-        conn.commit()
-
-    print(f"total={total} inserted={inserted} updated_unapproved={updated} skipped_approved={skipped} errors={errors}")
+            conn.rollback()
+        else:
+            conn.execute(UPSERT_SQL)
+            conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.execute("DROP TABLE IF EXISTS temp.import_stage")
+        conn.close()
+
+    print(("[DRY-RUN] " if args.dry_run else "")
+          + " ".join(f"{k}={v}" for k, v in counts.items())
+          + f" ({time.perf_counter() - t0:.1f}s)")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+import argparse
+from pathlib import Path
+from core.paths import APP_DB
+from core.db import ensure_app_schema, get_conn
+from core import feedback
+
+def main():
+    ap = argparse.ArgumentParser(
+        description="Import pos_feedback.jsonl (rotated and archived segments too) into app.db pos_feedback. "
+                    "Idempotent: rows already present (same line hash) are skipped."
+    )
+    ap.add_argument("--db", type=Path, default=APP_DB)
+    ap.add_argument("--jsonl", type=Path, default=feedback.FEEDBACK_PATH)
+    ap.add_argument("--batch", type=int, default=1000)
+    ap.add_argument("--since", help="Skip archived segments that end before this timestamp (YYYY-MM-DD[ HH:MM:SS]).")
+    args = ap.parse_args()
+
+    ensure_app_schema(args.db)
+    total = inserted = 0
+    batch = []
+    with get_conn(args.db) as conn:
+        for pair in feedback.iter_lines(args.jsonl, since=args.since):
+            total += 1
+            batch.append(pair)
+            if len(batch) >= args.batch:
+                inserted += feedback.insert_records(conn, batch)
+                batch = []
+        inserted += feedback.insert_records(conn, batch)
+
+    print(f"read={total} inserted={inserted} skipped={total - inserted}")
+
+if __name__ == "__main__":
+    main()
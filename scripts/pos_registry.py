@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+import argparse, json, sys
+from core import pos_registry as reg
+
+def cmd_list(args) -> int:
+    m = reg.load_manifest()
+    print(f"{'version':<28} {'acc':>7} {'p50us':>7} {'p99us':>7} {'dtype':>8} {'size':>9}  data_hash")
+    for v, e in sorted(m["models"].items()):
+        flag = "*" if v == m["active"] else ("~" if v == m["shadow"] else " ")
+        acc = e.get("accuracy")
+        print(f"{flag}{v:<27} {acc if acc is not None else '—':>7} {e.get('latency_p50_us') or '—':>7} "
+              f"{e.get('latency_p99_us') or '—':>7} {e.get('weights_dtype') or '—':>8} "
+              f"{e.get('size_bytes') or 0:>9}  {(e.get('data_hash') or '—')[:12]}")
+    print("(* active, ~ shadow)")
+    return 0
+
+def cmd_promote(args) -> int:
+    try:
+        m = reg.promote(args.version, force=args.force)
+    except ValueError as e:
+        print(f"Refusing: {e}; use --force to promote it anyway", file=sys.stderr)
+        return 1
+    print(f"Active: {m['active']}")
+    return 0
+
+def cmd_rollback(args) -> int:
+    m = reg.rollback()
+    print(f"Rolled back; active: {m['active']}")
+    return 0
+
+def cmd_prune(args) -> int:
+    gone = reg.prune(args.keep_unused)
+    print(f"Removed {len(gone)} version(s)" + (": " + ", ".join(gone) if gone else ""))
+    return 0
+
+def cmd_shadow(args) -> int:
+    if not args.off and not args.version:
+        print(f"Shadow: {reg.load_manifest()['shadow'] or '(none)'}")
+        return 0
+    m = reg.set_shadow(None if args.off else args.version)
+    print(f"Shadow: {m['shadow'] or '(none)'}")
+    return 0
+
+def cmd_report(args) -> int:
+    print(json.dumps(reg.shadow_report(args.version), ensure_ascii=False, indent=2))
+    return 0
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="POS model registry: list, promote, rollback, shadow evaluation.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    sub.add_parser("list", help="Show registered versions with accuracy/latency.").set_defaults(fn=cmd_list)
+
+    p = sub.add_parser("promote", help="Make a version the live model (workers hot-reload it).")
+    p.add_argument("version")
+    p.add_argument("--force", action="store_true", help="Promote even without a held-out accuracy.")
+    p.set_defaults(fn=cmd_promote)
+
+    sub.add_parser("rollback", help="Re-activate the previously active version.").set_defaults(fn=cmd_rollback)
+
+    p = sub.add_parser("prune", help="Delete versions that are not active, shadow or in the rollback history.")
+    p.add_argument("--keep-unused", type=int, default=reg.KEEP_UNUSED,
+                   help="Newest unused versions to keep (e.g. candidates awaiting review).")
+    p.set_defaults(fn=cmd_prune)
+
+    p = sub.add_parser("shadow", help="Score live /classify traffic with a candidate, without serving it.")
+    p.add_argument("version", nargs="?")
+    p.add_argument("--off", action="store_true")
+    p.set_defaults(fn=cmd_shadow)
+
+    p = sub.add_parser("shadow-report", help="Agreement and latency of shadow vs active from pos_shadow.jsonl.")
+    p.add_argument("--version")
+    p.set_defaults(fn=cmd_report)
+
+    args = ap.parse_args()
+    try:
+        return args.fn(args)
+    except (KeyError, LookupError) as e:
+        print(f"error: {e.args[0] if e.args else e}", file=sys.stderr)
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
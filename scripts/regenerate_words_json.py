@@ -1,5 +1,16 @@
-from core.files import load_words, save_words_json, JSON_WORDS_PATH, CASES
-from core.grammar import grammar_noun, grammar_adj
+#!/usr/bin/env python3
+import argparse, hashlib, json, os, sys, time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from core.db import ensure_app_schema, get_conn
+from core.grammar import CASES, GRAMMAR_VERSION, grammar_noun, grammar_adj
+from core.paths import APP_DB, DATA_DIR
+
+JSON_WORDS_PATH = DATA_DIR / "words.json"
+JSON_STAMPS_PATH = DATA_DIR / "cache" / "regen_words.json"   # voc -> stamp, for --target json
 
 def ensure_named_forms(word: dict) -> dict:
     """
@@ -21,6 +32,8 @@ def ensure_named_forms(word: dict) -> dict:
         }
         return word
 
+    forms.setdefault("sg", {})
+    forms.setdefault("pl", {})
     missing = []
     for name in CASES:
         if forms.get("sg", {}).get(name) is None:
@@ -83,14 +96,205 @@ def ensure_adj_forms(word: dict) -> dict:
     word["adj_forms"] = buckets
     return word
 
-def main():
-    words = load_words()
+# =========================
+# Stamps: skip words already regenerated by this grammar version
+# =========================
+# A stamp is the grammar version plus a hash of the word as last written.
+# Editing the word (new forms, class change) or bumping GRAMMAR_VERSION
+# changes it, so only those words are regenerated again.
+
+def _loads(v: Any) -> Any:
+    if isinstance(v, str) and v.strip():
+        try:
+            v = json.loads(v)
+            if isinstance(v, str):
+                v = json.loads(v)   # double-encoded rows
+        except ValueError:
+            return v
+    return v or None
+
+def stamp(word: dict) -> str:
+    body = json.dumps([word.get("voc"), str(word.get("class") or "").strip().lower(),
+                       word.get("forms"), word.get("adj_forms")],
+                      ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return f"g{GRAMMAR_VERSION}:{hashlib.sha1(body.encode('utf-8')).hexdigest()[:16]}"
+
+def regenerable(word: dict) -> bool:
+    return str(word.get("class", "")).strip().lower().strip(".") in ("n", "adj", "adjective")
+
+# =========================
+# Regeneration (process pool over blocks of words)
+# =========================
+PARALLEL_MIN_WORDS = 2000   # below this the pool's startup costs more than it saves
+
+Item = Tuple[Any, dict]                       # (key, word); key = row id or list index
+Result = Tuple[Any, dict, bool, str]          # (key, word, changed, stamp)
+
+def _regen_block(items: List[Item]) -> List[Result]:
+    out = []
+    for key, word in items:
+        before = json.dumps([word.get("forms"), word.get("adj_forms")], sort_keys=True, ensure_ascii=False)
+        word = ensure_adj_forms(ensure_named_forms(word))
+        after = json.dumps([word.get("forms"), word.get("adj_forms")], sort_keys=True, ensure_ascii=False)
+        out.append((key, word, before != after, stamp(word)))
+    return out
+
+def _blocks(items: Iterable[Item], size: int) -> Iterator[List[Item]]:
+    block: List[Item] = []
+    for it in items:
+        block.append(it)
+        if len(block) >= size:
+            yield block
+            block = []
+    if block:
+        yield block
+
+def regenerate(items: Iterable[Item], workers: int, block: int = 500) -> Iterator[Result]:
+    """
+    Regenerated words, a block at a time; keeps at most 2 blocks per worker in
+    flight so a large lexicon streams through without being held in memory.
+    """
+    if workers <= 1:
+        for b in _blocks(items, block):
+            yield from _regen_block(b)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        inflight: deque = deque()
+        for b in _blocks(items, block):
+            inflight.append(ex.submit(_regen_block, b))
+            if len(inflight) >= workers * 2:
+                yield from inflight.popleft().result()
+        while inflight:
+            yield from inflight.popleft().result()
+
+def resolve_workers(n: int, total: int) -> int:
+    n = n if n > 0 else (os.cpu_count() or 1)
+    return 1 if total < PARALLEL_MIN_WORDS else n
+
+# =========================
+# Targets
+# =========================
+def run_db(args) -> Dict[str, int]:
+    """Regenerate app.db rows in place; writes are batched, one transaction per --batch rows."""
+    ensure_app_schema(args.db)
+    conn = get_conn(args.db)
+    counts = {"words": 0, "skipped": 0, "regenerated": 0, "changed": 0, "conflicts": 0}
+
+    total = conn.execute("SELECT COUNT(*) FROM words").fetchone()[0]
+    workers = resolve_workers(args.workers, total)
+    counts["workers"] = workers
+
+    def pending() -> Iterator[Item]:
+        # Keyset pages, so writes from the batches below never disturb an open cursor
+        last = 0
+        while True:
+            rows = conn.execute(
+                "SELECT id, voc, class, forms, adj_forms, forms_gen FROM words WHERE id > ? ORDER BY id LIMIT ?",
+                (last, args.batch * 4),
+            ).fetchall()
+            if not rows:
+                return
+            for r in rows:
+                counts["words"] += 1
+                word = {"voc": r["voc"], "class": r["class"],
+                        "forms": _loads(r["forms"]), "adj_forms": _loads(r["adj_forms"])}
+                if not regenerable(word):
+                    continue
+                if not args.force and r["forms_gen"] == stamp(word):
+                    counts["skipped"] += 1
+                    continue
+                yield (r["id"], (r["forms"], r["adj_forms"])), word
+            last = rows[-1]["id"]
+
+    def flush(batch: List[Result]) -> None:
+        if args.dry_run or not batch:
+            return
+        # The forms guard leaves rows edited meanwhile (e.g. an approval) for the next run
+        guard = "WHERE id=? AND forms IS ? AND adj_forms IS ?"
+        upd = [(_dumps(w.get("forms")), _dumps(w.get("adj_forms")), gen, rid, old_f, old_a)
+               for (rid, (old_f, old_a)), w, changed, gen in batch if changed]
+        stamp_only = [(gen, rid, old_f, old_a) for (rid, (old_f, old_a)), _w, changed, gen in batch if not changed]
+        with conn:
+            done = conn.executemany(f"UPDATE words SET forms=?, adj_forms=?, forms_gen=? {guard}", upd).rowcount
+            done += conn.executemany(f"UPDATE words SET forms_gen=? {guard}", stamp_only).rowcount
+        counts["conflicts"] += len(batch) - done
+
+    batch: List[Result] = []
+    for res in regenerate(pending(), workers, block=max(1, args.batch // max(1, workers))):
+        counts["regenerated"] += 1
+        counts["changed"] += res[2]
+        batch.append(res)
+        if len(batch) >= args.batch:
+            flush(batch)
+            batch = []
+    flush(batch)
+    conn.close()
+    return counts
+
+def _dumps(v: Any) -> Optional[str]:
+    return json.dumps(v, ensure_ascii=False) if v else None
+
+def run_json(args) -> Dict[str, int]:
+    """Regenerate words.json; the file is only rewritten if some word changed."""
+    with args.json.open("r", encoding="utf-8") as f:
+        words = json.load(f)
+    if not isinstance(words, list):
+        raise ValueError("words.json root must be a list")
+    try:
+        stamps = json.loads(args.stamps.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        stamps = {}
+
+    counts = {"words": len(words), "skipped": 0, "regenerated": 0, "changed": 0}
+    todo: List[Item] = []
     for i, w in enumerate(words):
-        w = ensure_named_forms(w)
-        w = ensure_adj_forms(w)
-        words[i] = w
-    save_words_json(words)
-    print(f"Regenerated {JSON_WORDS_PATH} with named forms (nouns + adjectives).")
+        if not isinstance(w, dict) or not regenerable(w):
+            continue
+        if not args.force and stamps.get(w.get("voc")) == stamp(w):
+            counts["skipped"] += 1
+            continue
+        todo.append((i, w))
+    workers = resolve_workers(args.workers, len(todo))
+    counts["workers"] = workers
+
+    for i, word, changed, gen in regenerate(todo, workers, block=max(1, args.batch // max(1, workers))):
+        words[i] = word
+        stamps[word.get("voc")] = gen
+        counts["regenerated"] += 1
+        counts["changed"] += changed
+
+    if not args.dry_run:
+        if counts["changed"]:
+            tmp = args.json.with_suffix(".json.tmp")
+            with tmp.open("w", encoding="utf-8") as f:
+                json.dump(words, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, args.json)
+        args.stamps.parent.mkdir(parents=True, exist_ok=True)
+        args.stamps.write_text(json.dumps(stamps, ensure_ascii=False), encoding="utf-8")
+    return counts
+
+def main() -> int:
+    ap = argparse.ArgumentParser(
+        description="Fill in noun/adjective forms from core/grammar.py (only words changed since the last run)."
+    )
+    ap.add_argument("--target", choices=["json", "db"], default="json",
+                    help="Regenerate data/words.json (default) or the words table in app.db.")
+    ap.add_argument("--json", type=Path, default=JSON_WORDS_PATH)
+    ap.add_argument("--stamps", type=Path, default=JSON_STAMPS_PATH, help="Stamp file for --target json.")
+    ap.add_argument("--db", type=Path, default=APP_DB)
+    ap.add_argument("--workers", type=int, default=0, help="Processes (0 = one per CPU; serial for small runs).")
+    ap.add_argument("--batch", type=int, default=500, help="Rows per write transaction (db) / pool task.")
+    ap.add_argument("--force", action="store_true", help="Ignore stamps and regenerate every noun/adjective.")
+    ap.add_argument("--dry-run", action="store_true")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    counts = run_db(args) if args.target == "db" else run_json(args)
+    where = args.db if args.target == "db" else args.json
+    print(f"{'[DRY-RUN] ' if args.dry_run else ''}{where}: "
+          + " ".join(f"{k}={v}" for k, v in counts.items())
+          + f" grammar=v{GRAMMAR_VERSION} ({time.perf_counter() - t0:.1f}s)")
+    return 0
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
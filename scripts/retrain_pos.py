@@ -1,23 +1,42 @@
-import argparse, json, hashlib, sys
+import argparse, json, hashlib, math, os, resource, sys, tempfile
+from array import array
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Dict, List, Tuple
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
+from scipy import sparse
 from sklearn.linear_model import LogisticRegression
 
-from core.paths import DATA_DIR, REPO
+from core.paths import APP_DB, DATA_DIR
+from core.db import ensure_app_schema, get_conn
+from core import feature_cache, feedback, jsonstream, pos, pos_registry
+from core.pos_registry import atomic_write
 
-# Where core/pos.py will load from
-MODEL_PATH = REPO / "core" / "models" / "pos_model.npz"
-META_PATH  = MODEL_PATH.with_suffix(".meta.json")
+# Where core/pos.py will load from (promoted registry versions are copied here)
+MODEL_PATH = pos.MODEL_PATH
+META_PATH  = pos.MODEL_META_PATH
 
 CLASSES = ["n","v","adj","adv","pron","prep","aux","ph","other"]  # fixed order
 
-def load_words_json(p: Path) -> List[Tuple[str,str,str]]:
+# Relative weight per feedback source, multiplied by --feedback-weight.
+# admin_approve rows are reviewer-confirmed; auto_server rows carry the
+# model's own prediction, so they count least.
+SOURCE_WEIGHTS = {"admin_approve": 1.0, "manual": 0.5, "auto_server": 0.25}
+DEFAULT_SOURCE_WEIGHT = 0.5
+
+# (voc, meaning, label, weight); words.json rows have weight 1.0
+Sample = Tuple[str,str,str,float]
+# (voc, meaning, label, source, confirmed, created_at) as read from feedback
+FeedbackRow = Tuple[str,str,str,str | None,bool,str | None]
+
+def load_words_json(p: Path, fmt: str = "auto") -> List[Tuple[str,str,str]]:
+    """(voc, meaning, class) rows, streamed so the forms tables are never all in memory at once."""
     if not p.exists(): return []
-    data = json.loads(p.read_text(encoding="utf-8"))
     out = []
-    for obj in data:
+    for obj in jsonstream.iter_items(p, fmt):
+        if not isinstance(obj, dict): continue
         voc = (obj.get("voc") or "").strip()
         meaning = (obj.get("meaning") or "").strip()
         label = (obj.get("class") or "").strip()
@@ -25,48 +44,279 @@ def load_words_json(p: Path) -> List[Tuple[str,str,str]]:
             out.append((voc, meaning, label))
     return out
 
-def load_feedback_jsonl(p: Path) -> List[Tuple[str,str,str]]:
-    if not p.exists(): return []
+def load_feedback_jsonl(p: Path) -> List[FeedbackRow]:
+    """Read the active feedback file plus its rotated segments (see core.feedback)."""
+    out = []
+    for obj in feedback.iter_records(p):
+        voc = (obj.get("voc") or "").strip()
+        meaning = (obj.get("meaning") or "").strip()
+        label = (obj.get("label") or "").strip()
+        if voc and meaning and label in CLASSES:
+            out.append((voc, meaning, label, obj.get("source"), bool(obj.get("confirmed")), obj.get("ts")))
+    return out
+
+def max_feedback_id(conn) -> int:
+    return int(conn.execute("SELECT COALESCE(MAX(id), 0) FROM pos_feedback").fetchone()[0])
+
+def last_consumed_feedback_id(conn) -> int:
+    row = conn.execute(
+        "SELECT last_feedback_id FROM training_runs WHERE status='ok' ORDER BY id DESC LIMIT 1"
+    ).fetchone()
+    return int(row[0]) if row else 0
+
+def count_new_feedback(conn, after_id: int, upto_id: int) -> int:
+    """Single COUNT over the primary-key range (after_id, upto_id]."""
+    return int(conn.execute(
+        "SELECT COUNT(*) FROM pos_feedback WHERE id > ? AND id <= ?", (after_id, upto_id)
+    ).fetchone()[0])
+
+def load_feedback_db(conn, upto_id: int, after_id: int = 0) -> List[FeedbackRow]:
+    """Only the columns training needs, for ids in (after_id, upto_id]."""
+    out = []
+    rows = conn.execute(
+        f"SELECT voc, meaning, label, source, confirmed, created_at FROM pos_feedback "
+        f"WHERE id > ? AND id <= ? AND label IN ({','.join('?' * len(CLASSES))}) ORDER BY id",
+        (after_id, upto_id, *CLASSES),
+    )
+    for voc, meaning, label, source, confirmed, created_at in rows:
+        voc = (voc or "").strip()
+        meaning = (meaning or "").strip()
+        if voc and meaning:
+            out.append((voc, meaning, label, source, bool(confirmed), created_at))
+    return out
+
+def parse_source_weights(specs: List[str]) -> Dict[str,float]:
+    """['manual=0.8', 'auto_server=0'] -> SOURCE_WEIGHTS with those entries overridden."""
+    weights = dict(SOURCE_WEIGHTS)
+    for spec in specs or []:
+        name, sep, val = spec.partition("=")
+        if not sep or not name.strip():
+            raise ValueError(f"--source-weight expects SOURCE=WEIGHT, got {spec!r}")
+        weights[name.strip()] = float(val)
+    return weights
+
+def weigh_feedback(rows: List[FeedbackRow], scale: float, source_weights: Dict[str,float],
+                   half_life_days: float = 0.0, now: datetime | None = None) -> List[Sample]:
+    """
+    Per-row training weight: scale * source weight, halved every half_life_days
+    of age when that is > 0. Rows with weight 0 are dropped.
+    """
+    now = now or datetime.now(timezone.utc).replace(tzinfo=None)
     out = []
-    with p.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line: continue
+    for voc, meaning, label, source, confirmed, created_at in rows:
+        key = source or ("admin_approve" if confirmed else None)
+        w = scale * source_weights.get(key, DEFAULT_SOURCE_WEIGHT)
+        if half_life_days > 0 and created_at:
             try:
-                obj = json.loads(line)
-            except Exception:
-                continue
-            voc = (obj.get("voc") or "").strip()
-            meaning = (obj.get("meaning") or "").strip()
-            label = (obj.get("label") or "").strip()
-            if voc and meaning and label in CLASSES:
-                out.append((voc, meaning, label))
+                age = (now - datetime.fromisoformat(str(created_at)[:19])).total_seconds() / 86400.0
+                w *= 0.5 ** (max(age, 0.0) / half_life_days)
+            except ValueError:
+                pass
+        if w > 0:
+            out.append((voc, meaning, label, w))
     return out
 
+def incremental_runs_since_full(conn) -> int:
+    """Successful incremental runs after the most recent successful full one."""
+    return int(conn.execute(
+        """
+        SELECT COUNT(*) FROM training_runs
+        WHERE status='ok' AND mode='incremental'
+          AND id > COALESCE((SELECT MAX(id) FROM training_runs WHERE status='ok' AND mode='full'), 0)
+        """
+    ).fetchone()[0])
+
+def start_run(conn, base_rows: int, feedback_rows: int, mode: str = "full") -> int:
+    cur = conn.execute(
+        "INSERT INTO training_runs (status, base_rows, feedback_rows, mode) VALUES ('running', ?, ?, ?)",
+        (base_rows, feedback_rows, mode),
+    )
+    conn.commit()
+    return int(cur.lastrowid)
+
+def finish_run(conn, run_id: int, status: str, last_feedback_id: int = 0,
+               model_version: str | None = None, note: str | None = None) -> None:
+    conn.execute(
+        """
+        UPDATE training_runs
+        SET status=?, finished_at=CURRENT_TIMESTAMP, last_feedback_id=?, model_version=?, note=?
+        WHERE id=?
+        """,
+        (status, last_feedback_id, model_version, note, run_id),
+    )
+    conn.commit()
+
 def char_3grams(text: str) -> List[str]:
     s = text.lower()
     return [s[i:i+3] for i in range(len(s)-2)] if len(s) >= 3 else []
 
-def build_vocab(samples: List[Tuple[str,str,str]], size: int) -> Dict[str,int]:
+# =========================
+# Featurization (serial or sharded over a process pool)
+# =========================
+PARALLEL_MIN_ROWS = 20000   # below this, pool start-up costs more than it saves
+SHARDS_PER_WORKER = 4       # smaller shards even out uneven row lengths
+
+_POOL_VOCAB: Dict[str,int] | None = None
+
+def _pool_init(vocab: Dict[str,int] | None) -> None:
+    global _POOL_VOCAB
+    _POOL_VOCAB = vocab
+
+def _count_grams(samples: List[Sample]) -> Counter:
     freq = Counter()
-    for voc, meaning, _ in samples:
+    for voc, meaning, *_ in samples:
         freq.update(char_3grams(f"{voc} {meaning}"))
-    most = freq.most_common(size)
-    return {g:i for i,(g,_c) in enumerate(most)}
+    return freq
 
-def vectorize(samples: List[Tuple[str,str,str]], vocab: Dict[str,int]) -> Tuple[np.ndarray, np.ndarray]:
-    F = len(vocab)
-    X = np.zeros((len(samples), F), dtype=np.float32)
+def _vectorize_block(samples: List[Sample], vocab: Dict[str,int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """(indptr, indices, data, y) for one contiguous block of rows; indptr starts at 0."""
+    indptr = array("q", [0])
+    indices = array("i")
+    data = array("f")
     y = np.zeros((len(samples),), dtype=np.int64)
     label2idx = {c:i for i,c in enumerate(CLASSES)}
-    for i,(voc, meaning, label) in enumerate(samples):
+    for i,(voc, meaning, label, *_) in enumerate(samples):
+        counts: Dict[int,float] = {}
         for g in char_3grams(f"{voc} {meaning}"):
             j = vocab.get(g)
-            if j is not None: X[i, j] += 1.0
-        n = float(np.linalg.norm(X[i])); 
-        if n > 0: X[i] /= n
+            if j is not None: counts[j] = counts.get(j, 0.0) + 1.0
+        n = math.sqrt(sum(v * v for v in counts.values()))
+        for j in sorted(counts):
+            indices.append(j)
+            data.append(counts[j] / n)
+        indptr.append(len(indices))
         y[i] = label2idx[label]
-    return X, y
+    return (np.frombuffer(indptr, dtype=np.int64), np.frombuffer(indices, dtype=np.int32),
+            np.frombuffer(data, dtype=np.float32), y)
+
+def _pool_vectorize(samples: List[Sample]):
+    return _vectorize_block(samples, _POOL_VOCAB)
+
+def _shards(samples: List[Sample], workers: int) -> List[List[Sample]]:
+    n = max(1, math.ceil(len(samples) / (workers * SHARDS_PER_WORKER)))
+    return [[s[:3] for s in samples[i:i+n]] for i in range(0, len(samples), n)]
+
+def _parallel(samples: List[Sample], workers: int) -> bool:
+    return workers > 1 and len(samples) >= PARALLEL_MIN_ROWS
+
+def resolve_workers(workers: int) -> int:
+    """--workers 0 means one per CPU."""
+    return max(1, workers if workers > 0 else (os.cpu_count() or 1))
+
+def build_vocab(samples: List[Sample], size: int, workers: int = 1) -> Dict[str,int]:
+    if _parallel(samples, workers):
+        # Merging shard counters in shard order reproduces the serial first-seen
+        # order, so most_common() breaks count ties exactly as the serial loop does
+        freq = Counter()
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            for part in ex.map(_count_grams, _shards(samples, workers)):
+                freq.update(part)
+    else:
+        freq = _count_grams(samples)
+    most = freq.most_common(size)
+    return {g:i for i,(g,_c) in enumerate(most)}
+
+def vectorize(samples: List[Sample], vocab: Dict[str,int], workers: int = 1) -> Tuple[sparse.csr_matrix, np.ndarray]:
+    """
+    L2-normalized trigram counts as a CSR matrix, built row by row: only the
+    few dozen nonzeros per sample are ever stored (a dense row is F floats).
+    With workers > 1, contiguous shards are vectorized in a process pool and
+    their blocks concatenated in order; the result is identical.
+    """
+    if _parallel(samples, workers):
+        with ProcessPoolExecutor(max_workers=workers, initializer=_pool_init, initargs=(vocab,)) as ex:
+            blocks = list(ex.map(_pool_vectorize, _shards(samples, workers)))
+    else:
+        blocks = [_vectorize_block(samples, vocab)]
+
+    offsets = np.cumsum([0] + [len(b[1]) for b in blocks[:-1]])
+    indptr = np.concatenate([blocks[0][0][:1]] + [b[0][1:] + off for b, off in zip(blocks, offsets)])
+    X = sparse.csr_matrix(
+        (np.concatenate([b[2] for b in blocks]), np.concatenate([b[1] for b in blocks]), indptr),
+        shape=(len(samples), len(vocab)),
+    )
+    return X, np.concatenate([b[3] for b in blocks])
+
+# =========================
+# Feature cache (base corpus rarely changes; see core.feature_cache)
+# =========================
+FEATURIZER_VERSION = "char3-l2-v1"  # bump whenever vectorize() output changes
+
+def feature_key(samples: List[Sample], vocab: Dict[str,int]) -> str:
+    """Content address: featurizer version + vocab (in index order) + rows and labels (not weights)."""
+    h = hashlib.sha1(FEATURIZER_VERSION.encode("utf-8"))
+    for g in sorted(vocab, key=vocab.__getitem__):
+        h.update(g.encode("utf-8") + b"\0")
+    h.update(b"\1")
+    for voc, meaning, label, *_ in samples:
+        h.update(f"{voc}\t{meaning}\t{label}\n".encode("utf-8"))
+    return h.hexdigest()
+
+def featurize(base: List[Sample], extra: List[Sample], vocab: Dict[str,int], workers: int = 1,
+              use_cache: bool = True, quiet: bool = True) -> Tuple[sparse.csr_matrix, np.ndarray]:
+    """
+    vectorize(base + extra), with the base rows' matrix taken from (or stored
+    in) the feature cache; only `extra` (the feedback delta) is vectorized on a hit.
+    `base` should be the whole words.json corpus: per-run subsets (held-out
+    splits, replay samples) would only fill the cache with entries never read again.
+    """
+    if not use_cache or not base:
+        return vectorize(base + extra, vocab, workers=workers)
+    key = feature_key(base, vocab)
+    hit = feature_cache.get(key)
+    if hit is None:
+        Xb, yb = vectorize(base, vocab, workers=workers)
+        feature_cache.put(key, Xb, yb)
+    else:
+        Xb, yb = hit
+    if not quiet:
+        print(f"Feature cache {'hit' if hit is not None else 'miss'}: {len(base)} base rows ({key[:12]})")
+    return _stack(Xb, yb, extra, vocab, workers)
+
+def _stack(Xb: sparse.csr_matrix, yb: np.ndarray, extra: List[Sample], vocab: Dict[str,int],
+           workers: int = 1) -> Tuple[sparse.csr_matrix, np.ndarray]:
+    """Base rows' (X, y) followed by `extra` vectorized now."""
+    if not extra:
+        return Xb, np.asarray(yb)
+    Xe, ye = vectorize(extra, vocab, workers=workers)
+    return sparse.vstack([Xb, Xe], format="csr"), np.concatenate([yb, ye])
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far (ru_maxrss is KiB on Linux, bytes on macOS)."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1 << 20) if sys.platform == "darwin" else rss / 1024
+
+def load_current_model() -> dict | None:
+    """
+    The live model as float32 (C, F) weights in CLASSES order, for warm
+    starts; None if there is no usable model file.
+    """
+    if not MODEL_PATH.exists(): return None
+    m = pos.load_model_file(MODEL_PATH)
+    W, b, vocab = m.get("W"), m.get("b"), m.get("vocab")
+    if W is None or b is None or not isinstance(vocab, dict) or W.ndim != 2:
+        return None
+    W = dequantize(W, m.get("W_scale"))
+    if W.shape != (len(m["classes"]), len(vocab)):
+        return None
+    W_full = np.zeros((len(CLASSES), len(vocab)), dtype=np.float32)
+    b_full = np.zeros((len(CLASSES),), dtype=np.float32)
+    for row, name in enumerate(str(c) for c in m["classes"]):
+        if name in CLASSES:
+            W_full[CLASSES.index(name)] = W[row]
+            b_full[CLASSES.index(name)] = b[row]
+    return {"W": W_full, "b": b_full, "vocab": vocab}
+
+def replay_sample(base: List[Tuple[str,str,str]], n: int, seed: int) -> List[Sample]:
+    """
+    Up to n random words.json rows, each weighted len(base)/n so the replayed
+    sample carries the same total weight as the full base set.
+    """
+    if n <= 0 or not base: return []
+    if n >= len(base): return [(v, m, l, 1.0) for v, m, l in base]
+    pick = np.random.default_rng(seed).choice(len(base), size=n, replace=False)
+    w = len(base) / n
+    return [(*base[i], w) for i in sorted(pick.tolist())]
 
 def reuse_existing_vocab() -> Dict[str,int] | None:
     if not MODEL_PATH.exists(): return None
@@ -78,69 +328,293 @@ def reuse_existing_vocab() -> Dict[str,int] | None:
             return voc
     return None
 
-def save_model(W: np.ndarray, b: np.ndarray, classes: List[str], vocab: Dict[str,int]) -> None:
-    MODEL_PATH.parent.mkdir(parents=True, exist_ok=True)
-    np.savez(MODEL_PATH, W=W.astype(np.float32), b=b.astype(np.float32), classes=np.array(classes), vocab=vocab)
-    h = hashlib.sha1(); h.update(W.astype(np.float32).tobytes()); h.update(b.astype(np.float32).tobytes())
-    META_PATH.write_text(json.dumps({"model_version": "pos-lr-3gram", "model_hash": h.hexdigest()},
-                                    ensure_ascii=False, indent=2), encoding="utf-8")
+def quantize_weights(W: np.ndarray, mode: str) -> Tuple[np.ndarray, np.ndarray | None]:
+    """
+    Return (W_stored, W_scale). "int8" uses one symmetric scale per class row
+    (max|w| / 127); core.pos applies it to the C logits, never to the matrix.
+    """
+    W = W.astype(np.float32)
+    if mode == "float16":
+        return W.astype(np.float16), None
+    if mode == "int8":
+        scale = np.abs(W).max(axis=1) / 127.0
+        scale[scale == 0] = 1.0
+        Wq = np.clip(np.rint(W / scale[:, None]), -127, 127).astype(np.int8)
+        return Wq, scale.astype(np.float32)
+    return W, None
 
-def main():
-    ap = argparse.ArgumentParser(description="Train/retrain POS model. Saves to core/models/pos_model.npz.")
-    ap.add_argument("--words", type=Path, default=(DATA_DIR/"words.json"))
-    ap.add_argument("--feedback", type=Path, default=(DATA_DIR/"pos_feedback.jsonl"))
-    ap.add_argument("--vocab-size", type=int, default=5000)
-    ap.add_argument("--reuse-vocab", action="store_true")
-    ap.add_argument("--feedback-weight", type=float, default=2.0)
-    ap.add_argument("--require-feedback", type=int, default=-1)
-    ap.add_argument("--quiet", action="store_true")
-    args = ap.parse_args()
+def dequantize(W: np.ndarray, scale: np.ndarray | None) -> np.ndarray:
+    W = W.astype(np.float32)
+    return W * scale[:, None] if scale is not None else W
 
-    base = load_words_json(args.words)
-    fb = load_feedback_jsonl(args.feedback)
-    if not args.quiet:
-        print(f"base rows: {len(base)}  |  feedback rows: {len(fb)}")
+def accuracy(W: np.ndarray, b: np.ndarray, X: sparse.csr_matrix, y: np.ndarray) -> float:
+    if len(y) == 0: return float("nan")
+    pred = np.argmax(np.asarray(X @ W.T) + b, axis=1)
+    return float(np.mean(pred == y))
+
+def holdout_mask(n: int, frac: float, seed: int) -> np.ndarray:
+    """Deterministic shuffle split of n rows; True marks a held-out row."""
+    mask = np.zeros(n, dtype=bool)
+    if frac <= 0 or n < 2: return mask
+    order = np.random.default_rng(seed).permutation(n)
+    mask[order[:min(n - 1, max(1, int(round(n * frac))))]] = True
+    return mask
+
+def split_holdout(samples: List[Sample], frac: float, seed: int) -> Tuple[List, List]:
+    """Deterministic shuffle split; returns (train, held_out)."""
+    mask = holdout_mask(len(samples), frac, seed)
+    return [s for s, h in zip(samples, mask) if not h], [s for s, h in zip(samples, mask) if h]
 
-    if args.require_feedback >= 0 and len(fb) < args.require_feedback:
-        if not args.quiet:
-            print(f"SKIP: feedback rows {len(fb)} < require-feedback {args.require_feedback}")
-        return 0
+def data_hash(samples: List[Sample]) -> str:
+    h = hashlib.sha1()
+    for voc, meaning, label, w in samples:
+        h.update(f"{voc}\t{meaning}\t{label}\t{w:.6g}\n".encode("utf-8"))
+    return h.hexdigest()
 
-    if fb and args.feedback_weight > 1.0:
-        k = max(1, int(round(args.feedback_weight)))
-        fb = fb * k
+def save_model(W: np.ndarray, b: np.ndarray, classes: List[str], vocab: Dict[str,int],
+               quantize: str = "none", model_path: Path = MODEL_PATH, meta_path: Path = META_PATH,
+               train_mode: str = "full") -> None:
+    Wq, scale = quantize_weights(W, quantize)
+    b = b.astype(np.float32)
+    arrays = {"W": Wq, "b": b, "classes": np.array(classes), "vocab": vocab}
+    h = hashlib.sha1(); h.update(Wq.tobytes()); h.update(b.tobytes())
+    if scale is not None:
+        arrays["W_scale"] = scale
+        h.update(scale.tobytes())
+    meta = {"model_version": "pos-lr-3gram", "model_hash": h.hexdigest(), "weights_dtype": str(Wq.dtype),
+            "train_mode": train_mode}
+    atomic_write(model_path, lambda f: np.savez(f, **arrays))
+    atomic_write(meta_path, lambda f: f.write(json.dumps(meta, ensure_ascii=False, indent=2).encode("utf-8")))
+
+def train(args, base: List[Sample], fb: List[Sample], init: dict | None = None) -> Tuple[int, str | None, bool]:
+    """
+    Fit, evaluate, register (and unless --candidate or unscored, promote).
+    With `init` (see load_current_model) the solver warm-starts from its W/b
+    and keeps its vocab. Returns (exit_code, version, promoted).
+    """
+    mode = "incremental" if init is not None else "full"
+    corpus, base_mask = base, holdout_mask(len(base), args.holdout, args.seed)
+    base = [s for s, h in zip(corpus, base_mask) if not h]
+    base_ho = [s for s, h in zip(corpus, base_mask) if h]
+    fb, fb_ho = split_holdout(fb, args.holdout, args.seed)
+    held = base_ho + fb_ho
 
     samples = base + fb
     if not samples:
         print("No data to train.", file=sys.stderr)
-        return 1
+        return 1, None, False
 
-    vocab = reuse_existing_vocab() if args.reuse_vocab else None
+    vocab = init["vocab"] if init is not None else (reuse_existing_vocab() if args.reuse_vocab else None)
     if vocab is None:
-        vocab = build_vocab(samples, size=args.vocab_size)
+        vocab = build_vocab(samples, size=args.vocab_size, workers=args.workers)
         if not args.quiet: print(f"Built new vocab: {len(vocab)}")
     else:
         if not args.quiet: print(f"Reused vocab: {len(vocab)}")
 
-    X, y = vectorize(samples, vocab)
+    # Only a full run's base (all of words.json) goes through the feature cache;
+    # both splits are sliced from it. Replay samples are vectorized directly.
+    if init is None:
+        Xc, yc = featurize(corpus, [], vocab, args.workers, args.feature_cache, args.quiet)
+        Xb, yb, Xbh, ybh = Xc[~base_mask], yc[~base_mask], Xc[base_mask], yc[base_mask]
+    else:
+        (Xb, yb), (Xbh, ybh) = vectorize(base, vocab, args.workers), vectorize(base_ho, vocab, args.workers)
+    X, y = _stack(Xb, yb, fb, vocab, args.workers)
+    w = np.fromiter((s[3] for s in samples), dtype=np.float64, count=len(samples))
     if not args.quiet:
-        print(f"Vectorized: X={X.shape}, y={y.shape}, nnz={int(np.count_nonzero(X))}")
+        print(f"Vectorized: X={X.shape}, y={y.shape}, nnz={X.nnz} "
+              f"({(X.data.nbytes + X.indices.nbytes + X.indptr.nbytes) / (1 << 20):.1f} MiB CSR)")
 
-    clf = LogisticRegression(multi_class="multinomial", solver="lbfgs", max_iter=1000)
-    clf.fit(X, y)
+    # lbfgs fits a multinomial (softmax) model for >2 classes; `multi_class` was removed in sklearn 1.8
+    clf = LogisticRegression(solver="lbfgs", C=args.C, max_iter=1000)
+    present = np.unique(y)
+    if init is not None and len(present) > 2:
+        # sklearn reuses coef_/intercept_ as the starting point when warm_start is set;
+        # rows must match the classes present in y, in sorted order
+        clf.set_params(warm_start=True, max_iter=args.incremental_max_iter)
+        clf.coef_ = init["W"][present].astype(np.float64)
+        clf.intercept_ = init["b"][present].astype(np.float64)
+    clf.fit(X, y, sample_weight=w)
+    if not args.quiet:
+        print(f"Fit ({mode}): {int(np.max(clf.n_iter_))} iterations")
 
     F = X.shape[1]
-    W_full = np.zeros((len(CLASSES), F), dtype=np.float32)
-    b_full = np.zeros((len(CLASSES),), dtype=np.float32)
+    # Classes absent from an incremental batch keep their previous weights
+    W_full = init["W"].copy() if init is not None else np.zeros((len(CLASSES), F), dtype=np.float32)
+    b_full = init["b"].copy() if init is not None else np.zeros((len(CLASSES),), dtype=np.float32)
     for row_idx, class_idx in enumerate(clf.classes_):
         W_full[class_idx, :] = clf.coef_[row_idx]
         b_full[class_idx] = clf.intercept_[row_idx]
 
-    save_model(W_full, b_full, CLASSES, vocab)
+    acc = None
+    if held:
+        Xh, yh = _stack(Xbh, ybh, fb_ho, vocab, args.workers)
+        acc = accuracy(W_full, b_full, Xh, yh)
+        if not args.quiet: print(f"Held-out accuracy (float32): {acc:.4f}  n={len(held)}")
+        if args.quantize != "none":
+            acc_q = accuracy(dequantize(*quantize_weights(W_full, args.quantize)), b_full, Xh, yh)
+            if not args.quiet: print(f"Held-out accuracy ({args.quantize}): {acc_q:.4f}")
+            if acc - acc_q > args.max_accuracy_drop:
+                print(f"REFUSE: {args.quantize} drops held-out accuracy by {acc - acc_q:.4f} "
+                      f"> {args.max_accuracy_drop}", file=sys.stderr)
+                return 2, None, False
+            acc = acc_q
+
+    with tempfile.TemporaryDirectory(prefix="pos-train-") as tmp:
+        model_path = Path(tmp) / pos_registry.MODEL_FILE
+        meta_path = Path(tmp) / pos_registry.META_FILE
+        save_model(W_full, b_full, CLASSES, vocab, quantize=args.quantize, model_path=model_path, meta_path=meta_path,
+                   train_mode=mode)
+        probe = [(v, m) for v, m, *_ in (held or samples)[:200]]
+        lat = pos.measure_latency(pos.load_model_file(model_path), probe)
+        version = pos_registry.register(model_path, meta_path, {
+            "data_hash": data_hash(samples),
+            "train_rows": len(samples),
+            "holdout_rows": len(held),
+            "train_mode": mode,
+            "accuracy": (round(acc, 4) if acc is not None else None),
+            "latency_p50_us": lat["p50_us"],
+            "latency_p99_us": lat["p99_us"],
+        })
+    if not args.quiet:
+        print(f"Registered {version}: acc={acc} p50={lat['p50_us']}us p99={lat['p99_us']}us")
+
+    if args.candidate or acc is None:
+        if acc is None:
+            print(f"NOT PROMOTED: {version} has no held-out accuracy (--holdout 0); "
+                  f"promote by hand with: python -m scripts.pos_registry promote --force {version}", file=sys.stderr)
+        elif not args.quiet:
+            print(f"Candidate only; promote with: python -m scripts.pos_registry promote {version}")
+        return 0, version, False
+    pos_registry.promote(version)
     if not args.quiet:
         nz = int(np.count_nonzero(W_full))
         print(f"Saved model: {MODEL_PATH}  W.nonzero={nz}")
-    return 0
+    return 0, version, True
+
+def choose_mode(args, conn, new: int | None) -> Tuple[str, str]:
+    """('full'|'incremental', reason) for --mode; incremental falls back to full when it can't apply."""
+    if args.mode == "full":
+        return "full", "requested"
+    if conn is None:
+        why = "JSONL feedback has no consumed-rows checkpoint"
+    elif not new:
+        why = "no new feedback since the last run"
+    elif load_current_model() is None:
+        why = "no usable current model to start from"
+    elif args.mode == "auto" and incremental_runs_since_full(conn) >= args.full_every:
+        why = f"{args.full_every} incremental runs since the last full retrain"
+    else:
+        return "incremental", "warm start from the current model"
+    return "full", why
+
+def main():
+    ap = argparse.ArgumentParser(description="Train/retrain POS model. Saves to core/models/pos_model.npz.")
+    ap.add_argument("--words", type=Path, default=(DATA_DIR/"words.json"))
+    ap.add_argument("--feedback-source", choices=["db", "jsonl"], default="db",
+                    help="Read feedback from app.db pos_feedback (default) or the JSONL log.")
+    ap.add_argument("--db", type=Path, default=APP_DB)
+    ap.add_argument("--feedback", type=Path, default=(DATA_DIR/"pos_feedback.jsonl"))
+    ap.add_argument("--vocab-size", type=int, default=5000)
+    ap.add_argument("--C", type=float, default=1.0,
+                    help="Inverse L2 regularization strength (pick with scripts.tune_pos).")
+    ap.add_argument("--reuse-vocab", action="store_true")
+    ap.add_argument("--feedback-weight", type=float, default=2.0,
+                    help="Sample weight of a feedback row relative to a words.json row (scaled per source).")
+    ap.add_argument("--source-weight", action="append", default=[], metavar="SOURCE=WEIGHT",
+                    help="Override a per-source multiplier (defaults: "
+                         + ", ".join(f"{k}={v}" for k, v in SOURCE_WEIGHTS.items())
+                         + f", other={DEFAULT_SOURCE_WEIGHT}). Repeatable.")
+    ap.add_argument("--half-life-days", type=float, default=0.0,
+                    help="Halve a feedback row's weight for every this many days of age (0 = no decay).")
+    ap.add_argument("--require-feedback", type=int, default=-1)
+    ap.add_argument("--quantize", choices=["none", "float16", "int8"], default="none",
+                    help="Store W as float16 or per-class-scaled int8 (default: float32).")
+    ap.add_argument("--holdout", type=float, default=0.1,
+                    help="Fraction of rows held out for accuracy (default 0.1). With 0 the model has no "
+                         "accuracy and is registered as a candidate only.")
+    ap.add_argument("--max-accuracy-drop", type=float, default=0.01,
+                    help="Refuse to save a quantized model that loses more held-out accuracy than this.")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--candidate", action="store_true",
+                    help="Register the model in the registry without promoting it (e.g. for shadow mode).")
+    ap.add_argument("--mode", choices=["full", "incremental", "auto"], default="full",
+                    help="full: refit on everything. incremental: warm-start from the live model on new feedback "
+                         "plus --replay words.json rows (keeps the current vocab). auto: incremental, but a full "
+                         "retrain every --full-every runs to correct drift.")
+    ap.add_argument("--replay", type=int, default=1000,
+                    help="words.json rows replayed in incremental mode (weighted to stand in for the full set).")
+    ap.add_argument("--full-every", type=int, default=10,
+                    help="In auto mode, do a full retrain after this many incremental ones.")
+    ap.add_argument("--incremental-max-iter", type=int, default=200)
+    ap.add_argument("--workers", type=int, default=1,
+                    help=f"Processes for vocab counting/vectorization on corpora of {PARALLEL_MIN_ROWS}+ rows "
+                         "(0 = one per CPU). Output is identical to --workers 1.")
+    ap.add_argument("--no-feature-cache", dest="feature_cache", action="store_false",
+                    help="Always re-vectorize words.json instead of reusing the cached matrix.")
+    ap.add_argument("--quiet", action="store_true")
+    args = ap.parse_args()
+    args.workers = resolve_workers(args.workers)
+    if args.quantize != "none" and args.holdout <= 0:
+        args.holdout = 0.1
+    try:
+        source_weights = parse_source_weights(args.source_weight)
+    except ValueError as e:
+        ap.error(str(e))
+
+    base = load_words_json(args.words)
+    conn, upto = None, 0
+    if args.feedback_source == "db":
+        ensure_app_schema(args.db)
+        conn = get_conn(args.db)
+        upto = max_feedback_id(conn)  # snapshot: rows arriving mid-run count toward the next one
+        new = count_new_feedback(conn, last_consumed_feedback_id(conn), upto)
+    else:
+        new = None
+    if not args.quiet:
+        print(f"base rows: {len(base)}  |  new feedback rows: {new if new is not None else 'n/a'}")
+
+    if args.require_feedback >= 0:
+        if new is None:
+            new = len(load_feedback_jsonl(args.feedback))
+        if new < args.require_feedback:
+            if not args.quiet:
+                print(f"SKIP: feedback rows {new} < require-feedback {args.require_feedback}")
+            return 0
+
+    mode, why = choose_mode(args, conn, new)
+    if not args.quiet:
+        print(f"mode: {mode} ({why})")
+    init = None
+    if mode == "incremental":
+        init = load_current_model()
+        fb_rows = load_feedback_db(conn, upto, after_id=last_consumed_feedback_id(conn))
+        base_w = replay_sample(base, args.replay, args.seed)
+    else:
+        fb_rows = load_feedback_db(conn, upto) if conn is not None else load_feedback_jsonl(args.feedback)
+        base_w = [(voc, meaning, label, 1.0) for voc, meaning, label in base]
+    fb = weigh_feedback(fb_rows, args.feedback_weight, source_weights, args.half_life_days)
+    if not args.quiet:
+        print(f"feedback rows: {len(fb_rows)}  (weighted: {len(fb)}, total weight {sum(s[3] for s in fb):.1f})")
+
+    run_id = start_run(conn, len(base_w), len(fb), mode) if conn is not None else None
+    try:
+        rc, version, promoted = train(args, base_w, fb, init)
+    except BaseException as e:
+        if conn is not None: finish_run(conn, run_id, "failed", note=f"{e.__class__.__name__}: {e}")
+        raise
+    if not args.quiet:
+        print(f"Peak memory (RSS): {peak_rss_mb():.1f} MiB")
+    if conn is not None:
+        if rc == 0 and not promoted:
+            # The live model hasn't seen this feedback: keep the checkpoint where
+            # it was (only 'ok' runs count), so --require-feedback still sees it.
+            status = "candidate" if args.candidate else "unscored"
+            finish_run(conn, run_id, status, last_feedback_id=last_consumed_feedback_id(conn),
+                       model_version=version, note=f"trained on feedback ids <= {upto}, not promoted")
+        else:
+            status = {0: "ok", 2: "refused"}.get(rc, "failed")
+            finish_run(conn, run_id, status, last_feedback_id=upto, model_version=version)
+    return rc
 
 
 if __name__ == "__main__":
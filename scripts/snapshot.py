@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+import argparse, hashlib, importlib, json, lzma, sqlite3, struct, sys, time, zlib
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from core import jsonstream
+from core.db import ensure_app_schema, get_conn
+from core.grammar import GRAMMAR_VERSION
+from core.paths import APP_DB, DATA_DIR
+
+# =========================
+# Bundle format
+# =========================
+#   MAGIC | uint32 header length | header (JSON) | compressed payload
+# The payload is a compact JSON array of rows in COLUMNS order, sorted by voc,
+# with forms/adj_forms kept as the TEXT stored in the DB. The header carries
+# the format version, codec, row count and the SHA-256 of the uncompressed
+# payload; a DB loaded from it re-serializes to the same bytes, which is how
+# `load` and `verify --db` check it.
+MAGIC = b"PLTSNAP\x00"
+FORMAT_VERSION = 1
+COLUMNS = ("voc", "meaning", "class", "forms", "adj_forms", "approved", "forms_gen")
+CODECS = {
+    "zlib": (lambda b: zlib.compress(b, 9), zlib.decompress),
+    "xz": (lambda b: lzma.compress(b, preset=6), lzma.decompress),
+}
+DEFAULT_PATH = DATA_DIR / "lexicon.snap"
+
+def _payload(rows: List[tuple]) -> bytes:
+    return json.dumps(rows, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def write_bundle(path: Path, rows: List[tuple], codec: str, source: str) -> dict:
+    rows = sorted(rows, key=lambda r: r[0])
+    raw = _payload(rows)
+    header = {
+        "format": FORMAT_VERSION, "codec": codec, "columns": list(COLUMNS), "rows": len(rows),
+        "sha256": hashlib.sha256(raw).hexdigest(), "raw_bytes": len(raw),
+        "grammar_version": GRAMMAR_VERSION, "source": source,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    hb = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    body = CODECS[codec][0](raw)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    with tmp.open("wb") as f:
+        f.write(MAGIC + struct.pack("<I", len(hb)) + hb + body)
+    tmp.replace(path)
+    return header
+
+def read_header(path: Path) -> Tuple[dict, int]:
+    with path.open("rb") as f:
+        head = f.read(len(MAGIC) + 4)
+        if len(head) < len(MAGIC) + 4 or head[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path}: not a lexicon snapshot")
+        (n,) = struct.unpack("<I", head[len(MAGIC):])
+        header = json.loads(f.read(n).decode("utf-8"))
+    if header.get("format") != FORMAT_VERSION:
+        raise ValueError(f"{path}: snapshot format {header.get('format')} (this tool reads {FORMAT_VERSION})")
+    if header.get("columns") != list(COLUMNS):
+        raise ValueError(f"{path}: unexpected columns {header.get('columns')}")
+    return header, len(MAGIC) + 4 + n
+
+def read_bundle(path: Path) -> Tuple[dict, List[list]]:
+    """Header and rows; raises ValueError if the payload doesn't match its checksum."""
+    header, offset = read_header(path)
+    with path.open("rb") as f:
+        f.seek(offset)
+        raw = CODECS[header["codec"]][1](f.read())
+    if hashlib.sha256(raw).hexdigest() != header["sha256"]:
+        raise ValueError(f"{path}: checksum mismatch (corrupt or truncated snapshot)")
+    rows = json.loads(raw)
+    if len(rows) != header["rows"]:
+        raise ValueError(f"{path}: {len(rows)} rows, header says {header['rows']}")
+    return header, rows
+
+# =========================
+# Sources
+# =========================
+def rows_from_db(conn: sqlite3.Connection) -> List[tuple]:
+    return [tuple(r) for r in conn.execute(f"SELECT {', '.join(COLUMNS)} FROM words ORDER BY voc")]
+
+def rows_from_json(path: Path) -> List[tuple]:
+    """words.json (or NDJSON) rows normalized exactly as scripts/import.py stores them."""
+    norm = importlib.import_module("scripts.import").norm
+    by_voc: Dict[str, tuple] = {}
+    for obj in jsonstream.iter_items(path):
+        try:
+            rec = norm(obj)
+        except Exception:
+            continue
+        by_voc[rec[0]] = (*rec, 0, None)   # later duplicates win, as in import
+    return list(by_voc.values())
+
+def db_checksum(conn: sqlite3.Connection) -> Tuple[int, str]:
+    rows = rows_from_db(conn)
+    return len(rows), hashlib.sha256(_payload(rows)).hexdigest()
+
+# =========================
+# Load: bulk insert, then indexes and triggers
+# =========================
+# Only into an empty words table (a fresh node). Secondary indexes and the
+# row_version insert trigger are dropped for the insert and rebuilt once
+# afterwards, so the insert only maintains the voc UNIQUE index; row_version
+# is assigned in bulk (1..n) instead of by a MAX() lookup per row.
+_WORDS_INDEXES = ("idx_words_class", "idx_words_row_version")
+
+def load(db: Path, rows: List[list]) -> None:
+    ensure_app_schema(db)
+    conn = get_conn(db)
+    try:
+        have = conn.execute("SELECT COUNT(*) FROM words").fetchone()[0]
+        if have:
+            raise ValueError(f"{db}: words already has {have} rows; snapshots load into an empty table")
+        # Explicit BEGIN: sqlite3 doesn't open a transaction before DDL, so
+        # without it the drops would commit on their own and survive a failed insert.
+        conn.execute("BEGIN")
+        try:
+            for idx in _WORDS_INDEXES:
+                conn.execute(f"DROP INDEX IF EXISTS {idx}")
+            conn.execute("DROP TRIGGER IF EXISTS trg_words_version_insert")
+            conn.executemany(
+                f"INSERT INTO words ({', '.join(COLUMNS)}, row_version, updated_at) "
+                f"VALUES ({', '.join('?' * len(COLUMNS))}, ?, CURRENT_TIMESTAMP)",
+                ((*r, i) for i, r in enumerate(rows, 1)),
+            )
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+    finally:
+        conn.close()
+        ensure_app_schema(db)   # rebuilds the dropped indexes and trigger (a no-op after a rollback)
+
+def check_db(db: Path, header: dict) -> List[str]:
+    problems = []
+    with get_conn(db) as conn:
+        ok = conn.execute("PRAGMA quick_check").fetchone()[0]
+        if ok != "ok":
+            problems.append(f"quick_check: {ok}")
+        n, digest = db_checksum(conn)
+    if n != header["rows"]:
+        problems.append(f"words has {n} rows, snapshot {header['rows']}")
+    elif digest != header["sha256"]:
+        problems.append("words content differs from the snapshot")
+    return problems
+
+# =========================
+# CLI
+# =========================
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Create, load and verify compressed, checksummed snapshots of the words table.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    c = sub.add_parser("create", help="Write a snapshot of app.db (or of a words JSON file).")
+    c.add_argument("--db", type=Path, default=APP_DB)
+    c.add_argument("--from-json", type=Path, default=None, help="Build from words.json/NDJSON instead of the DB.")
+    c.add_argument("--out", type=Path, default=DEFAULT_PATH)
+    c.add_argument("--codec", choices=sorted(CODECS), default="zlib")
+
+    l = sub.add_parser("load", help="Bulk-load a snapshot into app.db's words table, then verify it.")
+    l.add_argument("snapshot", type=Path, nargs="?", default=DEFAULT_PATH)
+    l.add_argument("--db", type=Path, default=APP_DB)
+    l.add_argument("--if-empty", action="store_true", help="Do nothing (exit 0) if words already has rows.")
+
+    v = sub.add_parser("verify", help="Check a snapshot's checksum, and optionally that a DB matches it.")
+    v.add_argument("snapshot", type=Path, nargs="?", default=DEFAULT_PATH)
+    v.add_argument("--db", type=Path, default=None)
+
+    i = sub.add_parser("info", help="Print a snapshot's header.")
+    i.add_argument("snapshot", type=Path, nargs="?", default=DEFAULT_PATH)
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    try:
+        if args.cmd == "create":
+            if args.from_json:
+                rows, source = rows_from_json(args.from_json), str(args.from_json)
+            else:
+                with get_conn(args.db) as conn:
+                    rows, source = rows_from_db(conn), str(args.db)
+            h = write_bundle(args.out, rows, args.codec, source)
+            print(f"Wrote {args.out}: rows={h['rows']} {h['raw_bytes']} -> {args.out.stat().st_size} bytes "
+                  f"({h['codec']}) sha256={h['sha256'][:12]} ({time.perf_counter() - t0:.2f}s)")
+        elif args.cmd == "load":
+            if args.if_empty and args.db.exists():
+                with get_conn(args.db) as conn:
+                    table = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='words'").fetchone()
+                    if table and conn.execute("SELECT 1 FROM words LIMIT 1").fetchone():
+                        print(f"{args.db}: words not empty; snapshot not loaded")
+                        return 0
+            header, rows = read_bundle(args.snapshot)
+            load(args.db, rows)
+            problems = check_db(args.db, header)
+            for p in problems:
+                print(f"VERIFY FAILED {p}", file=sys.stderr)
+            if problems:
+                return 1
+            print(f"Loaded {header['rows']} words from {args.snapshot} into {args.db} "
+                  f"(verified, {time.perf_counter() - t0:.2f}s)")
+        elif args.cmd == "verify":
+            header, _rows = read_bundle(args.snapshot)
+            problems = check_db(args.db, header) if args.db else []
+            for p in problems:
+                print(f"VERIFY FAILED {p}", file=sys.stderr)
+            if problems:
+                return 1
+            print(f"OK {args.snapshot}: rows={header['rows']} sha256={header['sha256'][:12]}"
+                  + (f", matches {args.db}" if args.db else ""))
+        else:
+            header, _offset = read_header(args.snapshot)
+            print(json.dumps(header, ensure_ascii=False, indent=2))
+    except (ValueError, OSError, lzma.LZMAError, zlib.error) as e:
+        print(f"snapshot {args.cmd}: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
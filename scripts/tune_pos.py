@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+import argparse, json, math, sys, time, zlib
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from pathlib import Path
+from typing import Dict, List, Tuple
+import numpy as np
+from scipy import sparse
+from sklearn.linear_model import LogisticRegression
+
+from core.paths import DATA_DIR
+from scripts import retrain_pos as rp
+
+# =========================
+# Feature configurations
+# =========================
+# A config is (ngram_lo, ngram_hi, hashing, n_features). core.pos serves only
+# char 3-grams through a vocab dict, i.e. (3, 3, False, F); the rest are
+# reported for comparison and flagged as not servable.
+
+def parse_ngrams(spec: str) -> Tuple[int, int]:
+    lo, _, hi = spec.partition("-")
+    lo, hi = int(lo), int(hi or lo)
+    if not 1 <= lo <= hi:
+        raise ValueError(f"bad n-gram range: {spec!r}")
+    return lo, hi
+
+def grams(text: str, lo: int, hi: int) -> List[str]:
+    s = text.lower()
+    return [s[i:i+n] for n in range(lo, hi + 1) for i in range(len(s) - n + 1)]
+
+def gram_hash(g: str, F: int) -> int:
+    return zlib.crc32(g.encode("utf-8")) % F
+
+def servable(cfg) -> bool:
+    lo, hi, hashing, _F = cfg
+    return (lo, hi, hashing) == (3, 3, False)
+
+def build_features(samples, cfg) -> Tuple[sparse.csr_matrix, Dict[str,int] | None]:
+    """L2-normalized gram counts for one config; the 3-gram vocab config goes through retrain_pos (and its cache)."""
+    lo, hi, hashing, F = cfg
+    if servable(cfg):
+        vocab = rp.build_vocab(samples, F)
+        X, _y = rp.featurize(samples, [], vocab)
+        return X, vocab
+
+    vocab = None
+    if not hashing:
+        freq = Counter()
+        for voc, meaning, *_ in samples:
+            freq.update(grams(f"{voc} {meaning}", lo, hi))
+        vocab = {g: i for i, (g, _c) in enumerate(freq.most_common(F))}
+        F = len(vocab)
+
+    indptr, indices, data = [0], [], []
+    for voc, meaning, *_ in samples:
+        counts: Dict[int, float] = {}
+        for g in grams(f"{voc} {meaning}", lo, hi):
+            j = gram_hash(g, F) if hashing else vocab.get(g)
+            if j is not None: counts[j] = counts.get(j, 0.0) + 1.0
+        n = math.sqrt(sum(v * v for v in counts.values()))
+        for j in sorted(counts):
+            indices.append(j)
+            data.append(counts[j] / n)
+        indptr.append(len(indices))
+    X = sparse.csr_matrix((np.asarray(data, dtype=np.float32), np.asarray(indices, dtype=np.int32),
+                           np.asarray(indptr, dtype=np.int64)), shape=(len(samples), F))
+    return X, vocab
+
+def model_size_bytes(cfg, F: int, vocab: Dict[str,int] | None) -> int:
+    """float32 W (C x F) + b, plus the vocab's grams if the config needs one."""
+    size = 4 * len(rp.CLASSES) * (F + 1)
+    if vocab:
+        size += sum(len(g.encode("utf-8")) + 8 for g in vocab)
+    return size
+
+def predict_latency(cfg, vocab, W, b, pairs, repeat: int = 3) -> Tuple[float, float]:
+    """
+    p50/p99 microseconds of one prediction: the same steps as core.pos.predict
+    (grams -> vocab/hash lookup -> L2 normalize -> gather W columns -> softmax).
+    """
+    lo, hi, hashing, F = cfg
+    ts = []
+    for _ in range(repeat):
+        for voc, meaning in pairs:
+            t0 = time.perf_counter()
+            counts: Dict[int, float] = {}
+            for g in grams(f"{voc} {meaning}", lo, hi):
+                j = gram_hash(g, F) if hashing else vocab.get(g)
+                if j is not None: counts[j] = counts.get(j, 0.0) + 1.0
+            idx = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+            x = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+            n = float(np.linalg.norm(x))
+            if n > 0: x /= n
+            z = W[:, idx] @ x + b
+            p = np.exp(z - z.max()); p /= p.sum()
+            ts.append((time.perf_counter() - t0) * 1e6)
+    a = np.asarray(ts)
+    return round(float(np.percentile(a, 50)), 1), round(float(np.percentile(a, 99)), 1)
+
+# =========================
+# Cross-validation on a process pool
+# =========================
+# Feature matrices are built once per config in the parent and handed to each
+# worker once through the pool initializer; tasks only carry (config, C, fold).
+_SHARED: dict = {}
+
+def _pool_init(shared: dict) -> None:
+    global _SHARED
+    _SHARED = shared
+
+def _fit_fold(task) -> Tuple[int, float, int, float, float, np.ndarray | None, np.ndarray | None]:
+    feat_id, C, fold, keep = task
+    X, y, folds = _SHARED["X"][feat_id], _SHARED["y"], _SHARED["folds"]
+    test = folds[fold]
+    train = np.concatenate([f for k, f in enumerate(folds) if k != fold])
+    t0 = time.perf_counter()
+    clf = LogisticRegression(solver="lbfgs", C=C, max_iter=1000)
+    clf.fit(X[train], y[train])
+    fit_s = time.perf_counter() - t0
+    acc = float(np.mean(clf.predict(X[test]) == y[test]))
+    if not keep:
+        return feat_id, C, fold, acc, fit_s, None, None
+    W = np.zeros((len(rp.CLASSES), X.shape[1]), dtype=np.float32)
+    b = np.zeros((len(rp.CLASSES),), dtype=np.float32)
+    W[clf.classes_] = clf.coef_
+    b[clf.classes_] = clf.intercept_
+    return feat_id, C, fold, acc, fit_s, W, b
+
+def kfold(n: int, k: int, seed: int) -> List[np.ndarray]:
+    order = np.random.default_rng(seed).permutation(n)
+    return [np.sort(f) for f in np.array_split(order, k)]
+
+def main() -> int:
+    ap = argparse.ArgumentParser(
+        description="k-fold CV sweep for the POS model over C, vocab size, n-gram range and feature hashing."
+    )
+    ap.add_argument("--words", type=Path, default=(DATA_DIR/"words.json"))
+    ap.add_argument("--folds", type=int, default=5)
+    ap.add_argument("--C", default="0.25,1,4", help="Comma-separated inverse regularization strengths.")
+    ap.add_argument("--vocab-sizes", default="2000,5000,10000", help="Vocab size, or hash buckets when hashing.")
+    ap.add_argument("--ngrams", default="3-3,2-4", help="Comma-separated char n-gram ranges (lo-hi).")
+    ap.add_argument("--hashing", default="off,on", help="Feature hashing: off, on, or off,on.")
+    ap.add_argument("--latency-budget-us", type=float, default=None,
+                    help="Recommend the most accurate servable config whose predicted p99 fits this budget.")
+    ap.add_argument("--workers", type=int, default=0, help="Processes for fold fits (0 = one per CPU).")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", type=Path, default=(DATA_DIR/"tune_pos_report.json"))
+    args = ap.parse_args()
+
+    try:
+        Cs = [float(c) for c in args.C.split(",")]
+        sizes = [int(v) for v in args.vocab_sizes.split(",")]
+        ngrams = [parse_ngrams(g) for g in args.ngrams.split(",")]
+        hashing = [{"off": False, "on": True}[h.strip()] for h in args.hashing.split(",")]
+    except (ValueError, KeyError) as e:
+        ap.error(f"bad grid: {e}")
+    workers = rp.resolve_workers(args.workers)
+
+    base = rp.load_words_json(args.words)
+    if len(base) < args.folds:
+        print(f"Not enough rows for {args.folds}-fold CV: {len(base)}", file=sys.stderr)
+        return 1
+    samples = [(v, m, l, 1.0) for v, m, l in base]
+    label2idx = {c: i for i, c in enumerate(rp.CLASSES)}
+    y = np.array([label2idx[l] for _v, _m, l, _w in samples], dtype=np.int64)
+    folds = kfold(len(samples), args.folds, args.seed)
+
+    # Vocabs are picked on all rows (unsupervised), so fold scores share them
+    configs = [(lo, hi, h, F) for (lo, hi), h, F in product(ngrams, hashing, sizes)]
+    mats, vocabs = [], []
+    t0 = time.perf_counter()
+    for cfg in configs:
+        X, vocab = build_features(samples, cfg)
+        mats.append(X)
+        vocabs.append(vocab)
+    print(f"rows={len(samples)} configs={len(configs)} x C={len(Cs)} x folds={args.folds} "
+          f"(features built in {time.perf_counter() - t0:.1f}s, workers={workers})")
+
+    tasks = [(fid, C, k, k == 0) for fid in range(len(configs)) for C in Cs for k in range(args.folds)]
+    shared = {"X": mats, "y": y, "folds": folds}
+    results: Dict[Tuple[int, float], dict] = {}
+    if workers > 1:
+        ex = ProcessPoolExecutor(max_workers=workers, initializer=_pool_init, initargs=(shared,))
+        outs = ex.map(_fit_fold, tasks, chunksize=max(1, len(tasks) // (workers * 4)))
+    else:
+        ex = None
+        _pool_init(shared)
+        outs = map(_fit_fold, tasks)
+    try:
+        for fid, C, fold, acc, fit_s, W, b in outs:
+            r = results.setdefault((fid, C), {"accs": [], "fit_s": 0.0})
+            r["accs"].append(acc)
+            r["fit_s"] += fit_s
+            if W is not None:
+                r["W"], r["b"] = W, b
+    finally:
+        if ex is not None: ex.shutdown()
+
+    probe = [(v, m) for v, m, *_ in samples[:200]]
+    rows = []
+    for (fid, C), r in results.items():
+        cfg = configs[fid]
+        lo, hi, h, _F = cfg
+        F = mats[fid].shape[1]
+        p50, p99 = predict_latency(cfg, vocabs[fid], r["W"], r["b"], probe)
+        rows.append({
+            "ngram": f"{lo}-{hi}", "hashing": h, "features": F, "C": C,
+            "acc_mean": round(float(np.mean(r["accs"])), 4), "acc_std": round(float(np.std(r["accs"])), 4),
+            "size_bytes": model_size_bytes(cfg, F, vocabs[fid]),
+            "p50_us": p50, "p99_us": p99,
+            "fit_s": round(r["fit_s"] / len(r["accs"]), 3),
+            "servable": servable(cfg),
+        })
+    rows.sort(key=lambda r: (-r["acc_mean"], r["p99_us"]))
+
+    print(f"{'ngram':>5} {'hash':>4} {'feat':>6} {'C':>5} {'acc':>7} {'±':>6} {'size_kb':>8} "
+          f"{'p50us':>6} {'p99us':>6} {'fit_s':>6}  servable")
+    for r in rows:
+        print(f"{r['ngram']:>5} {('on' if r['hashing'] else 'off'):>4} {r['features']:>6} {r['C']:>5g} "
+              f"{r['acc_mean']:>7.4f} {r['acc_std']:>6.4f} {r['size_bytes'] / 1024:>8.0f} "
+              f"{r['p50_us']:>6} {r['p99_us']:>6} {r['fit_s']:>6}  {'yes' if r['servable'] else 'no'}")
+
+    pick = None
+    if args.latency_budget_us is not None:
+        fits = [r for r in rows if r["servable"] and r["p99_us"] <= args.latency_budget_us]
+        pick = fits[0] if fits else None
+        if pick:
+            print(f"Best servable within p99 <= {args.latency_budget_us:g}us: "
+                  f"--vocab-size {pick['features']} --C {pick['C']:g}  (acc {pick['acc_mean']})")
+        else:
+            print(f"No servable config fits p99 <= {args.latency_budget_us:g}us")
+
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    args.out.write_text(json.dumps({
+        "rows": len(samples), "folds": args.folds, "seed": args.seed,
+        "latency_budget_us": args.latency_budget_us, "recommended": pick, "results": rows,
+    }, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"Report: {args.out}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,12 @@
+import os, sys, tempfile
+from pathlib import Path
+
+# Keep tests off the real databases/ and data/ (core.paths reads these at import)
+_TMP = tempfile.mkdtemp(prefix="plt-tests-")
+os.environ.setdefault("PLT_DB_DIR", str(Path(_TMP) / "databases"))
+os.environ.setdefault("PLT_DATA_DIR", str(Path(_TMP) / "data"))
+os.environ.setdefault("PLT_RETRAIN_WORKER", "0")
+
+REPO = Path(__file__).resolve().parents[1]
+if str(REPO) not in sys.path:
+    sys.path.insert(0, str(REPO))
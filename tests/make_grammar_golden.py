@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Regenerate tests/fixtures/grammar_golden.json.gz from the hand-written
+grammar_noun/grammar_adj that predate the compiled rule tables, over every
+lemma in data/words.json:
+
+    python -m tests.make_grammar_golden
+
+The baseline is tests/grammar_baseline.py, a frozen copy of those functions,
+so this needs no git history. Only rerun it when the lexicon gains lemmas or a
+rule change is meant to alter generated forms (and bump GRAMMAR_VERSION); the
+fixture is what test_grammar_golden holds the compiled engine to.
+"""
+import argparse, gzip, json, sys, types
+from pathlib import Path
+
+from core import jsonstream
+from core.paths import REPO
+from tests import grammar_baseline
+
+BASELINE_REV = "552efcb"   # the commit grammar_baseline.py was copied from (recorded in the fixture)
+FIXTURE = Path(__file__).resolve().parent / "fixtures" / "grammar_golden.json.gz"
+NOUN_GENDERS = (None, "m", "f", "n")
+ANIMACY = (False, True)
+
+def lemmas(words: Path) -> list:
+    seen = {(w.get("voc") or "").strip() for w in jsonstream.iter_items(words) if isinstance(w, dict)}
+    seen.discard("")
+    return sorted(seen)
+
+def rows(forms: dict) -> dict:
+    """{part: {1..6: form}} -> {part: [NOM..LOC]} (JSON keys can't be ints)."""
+    return {part: [cases[i] for i in range(1, 7)] for part, cases in forms.items()}
+
+def build(g: types.ModuleType, vocs: list) -> list:
+    cases = []
+    for voc in vocs:
+        for gender in NOUN_GENDERS:
+            for anim in ANIMACY:
+                cases.append([voc, "noun", gender, anim, rows(g.grammar_noun(voc, gender, anim))])
+        for anim in ANIMACY:
+            cases.append([voc, "adj", None, anim, rows(g.grammar_adj(voc, anim))])
+    return cases
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Regenerate the grammar golden fixture from the baseline engine.")
+    ap.add_argument("--words", type=Path, default=REPO / "data" / "words.json")
+    ap.add_argument("--out", type=Path, default=FIXTURE)
+    args = ap.parse_args()
+
+    vocs = lemmas(args.words)
+    cases = build(grammar_baseline, vocs)
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    data = json.dumps({"baseline": BASELINE_REV, "lemmas": len(vocs), "cases": cases},
+                      ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    with gzip.GzipFile(args.out, "wb", compresslevel=9, mtime=0) as f:
+        f.write(data)
+    print(f"Wrote {args.out}: {len(vocs)} lemmas, {len(cases)} cases, {args.out.stat().st_size} bytes")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
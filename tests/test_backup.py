@@ -0,0 +1,61 @@
+"""
+core.backup round trip: an online backup of a populated app.db restores the
+rows deleted after it was taken, and damaged archives are refused.
+"""
+from pathlib import Path
+
+import pytest
+
+from core import backup
+from core.db import ensure_app_schema, get_conn
+
+N_WORDS = 200
+
+@pytest.fixture
+def db(tmp_path: Path) -> Path:
+    path = tmp_path / "app.db"
+    ensure_app_schema(path)
+    with get_conn(path) as conn:
+        conn.execute("INSERT INTO users (username, password_hash) VALUES ('ala', 'x')")
+        conn.executemany(
+            "INSERT INTO words (voc, meaning, class) VALUES (?, ?, 'n')",
+            ((f"slowo{i:03d}", f"word {i}") for i in range(N_WORDS)),
+        )
+    return path
+
+def _count(db: Path, table: str) -> int:
+    with get_conn(db) as conn:
+        return int(conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0])
+
+def test_backup_then_restore(db, tmp_path):
+    res = backup.backup(tmp_path / "backups", db=db)
+    archive = Path(res["path"])
+    assert archive.name.startswith(backup.PREFIX) and archive.name.endswith(backup.SUFFIX)
+    assert res["tables"]["words"] == N_WORDS and res["tables"]["users"] == 1
+    assert backup.verify(archive) == res["tables"]
+
+    with get_conn(db) as conn:
+        conn.execute("DELETE FROM words WHERE voc >= 'slowo050'")
+        conn.execute("DELETE FROM users")
+    assert _count(db, "words") == 50
+
+    restored = backup.restore(archive, db=db)
+    assert restored == res["tables"]
+    assert _count(db, "words") == N_WORDS
+    assert _count(db, "users") == 1
+
+def test_truncated_archive_is_refused(db, tmp_path):
+    archive = Path(backup.backup(tmp_path / "backups", db=db)["path"])
+    broken = tmp_path / "broken.db.gz"
+    broken.write_bytes(archive.read_bytes()[: archive.stat().st_size // 2])
+
+    with pytest.raises(ValueError):
+        backup.verify(broken)
+    with pytest.raises(ValueError):
+        backup.restore(broken, db=db)
+    assert _count(db, "words") == N_WORDS   # the live DB is untouched
+
+def test_rotation_keeps_newest(db, tmp_path):
+    out = tmp_path / "backups"
+    names = [Path(backup.backup(out, db=db, keep=2)["path"]).name for _ in range(3)]
+    assert [b["name"] for b in backup.list_backups(out)] == names[:0:-1]
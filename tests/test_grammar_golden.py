@@ -0,0 +1,42 @@
+"""
+The compiled grammar engine (rule tables -> suffix trie -> generated form
+functions) must reproduce the original hand-written grammar_noun/grammar_adj
+exactly. The fixture holds the original's output for every words.json lemma;
+see tests/make_grammar_golden.py.
+"""
+import gzip, json
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+from core import grammar
+from core.grammar import grammar_adj, grammar_noun
+
+FIXTURE = Path(__file__).resolve().parent / "fixtures" / "grammar_golden.json.gz"
+
+@pytest.fixture(scope="module")
+def golden() -> dict:
+    with gzip.open(FIXTURE, "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+def _rows(forms: dict) -> dict:
+    return {part: [cases[i] for i in range(1, 7)] for part, cases in forms.items()}
+
+def test_fixture_covers_lexicon(golden):
+    kinds = Counter((kind, gender) for _voc, kind, gender, _anim, _forms in golden["cases"])
+    assert golden["lemmas"] > 1000
+    for key in (("noun", None), ("noun", "m"), ("noun", "f"), ("noun", "n"), ("adj", None)):
+        assert kinds[key] == 2 * golden["lemmas"]
+
+@pytest.mark.parametrize("cache", ["warm", "recompiled"])
+def test_compiled_engine_matches_baseline(golden, cache):
+    if cache == "recompiled":
+        grammar.reset_cache()
+        grammar.compile_tables()
+    mismatches = []
+    for voc, kind, gender, anim, want in golden["cases"]:
+        got = _rows(grammar_noun(voc, gender, anim) if kind == "noun" else grammar_adj(voc, anim))
+        if got != want:
+            mismatches.append((voc, kind, gender, anim))
+    assert not mismatches, f"{len(mismatches)} of {len(golden['cases'])} differ, e.g. {mismatches[:5]}"